@@ -1,7 +1,6 @@
-from flask import Flask, send_from_directory
+from flask import Flask, jsonify, send_from_directory
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from utils.hash import bcrypt
 from routes.auth_routes import auth
 from routes.user_routes import user
 from routes.profile_routes import profile
@@ -12,22 +11,48 @@ from routes.order_details import order_details_bp
 from routes.inventory_log import inventory_log_bp
 from routes.checkout_steps import checkout_steps_bp
 from routes.users import users_bp
+from routes.reports import reports_bp
+from routes.inventory import inventory_bp
 from config import Config
+from database import connection, schema
+from services import analytics_cli, checkout, inventory_archive, sales_rollup
+from utils import authz, metrics
 import os
+from datetime import timedelta
 
 # --------------------------- Initialize Flask app ---------------------------
 app = Flask(__name__)
 app.config["JWT_SECRET_KEY"] = Config.JWT_SECRET_KEY  # JWT secret key
-
-# Initialize Bcrypt for password hashing
-bcrypt.init_app(app)
+app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(minutes=Config.JWT_ACCESS_TOKEN_MINUTES)
+app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=Config.JWT_REFRESH_TOKEN_DAYS)
 
 # Enable CORS globally for frontend (Angular at localhost:4200)
-CORS(app, resources={r"/*": {"origins": "http://localhost:4200"}}, supports_credentials=True)
+CORS(
+    app,
+    resources={r"/*": {"origins": "http://localhost:4200"}},
+    supports_credentials=True,
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "Server-Timing"]  # Headers readable by Angular
+)
 
 # Initialize JWT manager
 jwt = JWTManager(app)
 
+
+# Return each request's pooled DB connection on teardown
+connection.init_app(app)
+
+# Refuse to serve without the indexes / tables features depend on
+# (created by `flask ensure-schema`)
+schema.init_app(app)
+
+# Maintenance commands: `flask rebuild-sales-rollups`,
+# `flask export-analytics`, `flask compact-inventory-log`,
+# `flask purge-idempotency-keys`
+sales_rollup.init_app(app)
+analytics_cli.init_app(app)
+inventory_archive.init_app(app)
+checkout.init_app(app)
+
 # --------------------------- Register Blueprints ---------------------------
 # Each module (auth, user, profile, cart, products, orders, order details, inventory log, checkout) 
 # is registered as a blueprint with a URL prefix
@@ -41,6 +66,11 @@ app.register_blueprint(order_details_bp, url_prefix="/order_details")
 app.register_blueprint(inventory_log_bp, url_prefix="/inventory_log")
 app.register_blueprint(checkout_steps_bp, url_prefix="/checkout")
 app.register_blueprint(users_bp, url_prefix="/users")
+app.register_blueprint(reports_bp, url_prefix="/reports")
+app.register_blueprint(inventory_bp, url_prefix="/inventory")
+
+# Compile the role rules of every registered route (see utils/authz.py)
+authz.init_app(app)
 
 # --------------------------- Serve Uploaded Images ---------------------------
 # Ensure the uploads folder exists
@@ -63,6 +93,14 @@ def home():
     """
     return {"message": "Backend is running!"}
 
+# --------------------------- Runtime Metrics ---------------------------
+@app.route("/metrics")
+def runtime_metrics():
+    """
+    Snapshot of runtime counters (connection pool, caches, ...)
+    """
+    return jsonify(metrics.snapshot()), 200
+
 # --------------------------- Run App ---------------------------
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,129 @@
+"""
+Benchmark for the vectorized order-history analytics (services/analytics.py).
+
+Generates a synthetic order history in memory (no database needed), shaped
+exactly like the rows the cursors return, and computes the month-end
+aggregates two ways:
+
+    per-row     - dict rows walked in Python loops, the way the handlers in
+                  routes/orders.py and routes/order_details.py consume them
+    vectorized  - tuple rows packed into NumPy structured arrays and
+                  aggregated with np.unique / np.bincount
+
+Both results are compared, so the run fails if the two approaches disagree.
+
+Usage (from back_end/):
+    python -m benchmarks.analytics_export --orders 200000 --customers 20000 --products 2000
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from services.analytics import (
+    LINE_DTYPE, ORDER_DTYPE, history_summary, orders_by_month, revenue_by_product_month,
+)
+
+
+def synthetic_history(args):
+    """
+    Return (order rows, line rows) as tuples in ORDERS_SQL / LINES_SQL column order.
+    """
+    rng = random.Random(args.seed)
+    months = [y * 100 + m for y in (2024, 2025) for m in range(1, 13)]
+    orders, lines = [], []
+    for order_id in range(1, args.orders + 1):
+        month = rng.choice(months)
+        total = 0
+        for product_id in rng.sample(range(1, args.products + 1), rng.randint(1, 4)):
+            quantity = rng.randint(1, 3)
+            subtotal = quantity * rng.randint(100, 5000)  # cents
+            lines.append((order_id, product_id, month, quantity, subtotal))
+            total += subtotal
+        orders.append((order_id, rng.randint(1, args.customers), month, total))
+    return orders, lines
+
+
+# ----------------- per-row baseline -----------------
+def per_row(order_rows, line_rows):
+    product_month = defaultdict(lambda: [0, 0, 0])
+    for row in line_rows:
+        agg = product_month[(row["Product_ID"], row["Month"])]
+        agg[0] += 1
+        agg[1] += row["Quantity"]
+        agg[2] += row["Subtotal_Cents"]
+
+    by_month = defaultdict(lambda: {"orders": 0, "cents": 0, "customers": set()})
+    first_month = {}
+    for row in order_rows:
+        month = by_month[row["Month"]]
+        month["orders"] += 1
+        month["cents"] += row["Total_Cents"]
+        month["customers"].add(row["User_ID"])
+        first_month[row["User_ID"]] = min(first_month.get(row["User_ID"], row["Month"]), row["Month"])
+
+    monthly = {
+        m: (v["orders"], v["cents"], len(v["customers"]),
+            sum(1 for u in v["customers"] if first_month[u] < m))
+        for m, v in by_month.items()
+    }
+    return product_month, monthly
+
+
+def run(args):
+    order_tuples, line_tuples = synthetic_history(args)
+    print(f"history         : {len(order_tuples)} orders, {len(line_tuples)} lines")
+
+    # Per-row: dict rows, as DictCursor.fetchall() returns them
+    order_names, line_names = ORDER_DTYPE.names, LINE_DTYPE.names
+    started = time.perf_counter()
+    order_dicts = [dict(zip(order_names, row)) for row in order_tuples]
+    line_dicts = [dict(zip(line_names, row)) for row in line_tuples]
+    product_month, monthly = per_row(order_dicts, line_dicts)
+    per_row_s = time.perf_counter() - started
+
+    # Vectorized: chunked tuple rows -> structured arrays -> group-bys
+    started = time.perf_counter()
+    chunk = args.chunk_size
+    orders = np.concatenate([np.array(order_tuples[i:i + chunk], dtype=ORDER_DTYPE)
+                             for i in range(0, len(order_tuples), chunk)])
+    lines = np.concatenate([np.array(line_tuples[i:i + chunk], dtype=LINE_DTYPE)
+                            for i in range(0, len(line_tuples), chunk)])
+    by_product = revenue_by_product_month(lines)
+    by_month = orders_by_month(orders, lines)
+    summary = history_summary(orders, lines)
+    vectorized_s = time.perf_counter() - started
+
+    # Cross-check the two results
+    mismatches = 0
+    for pid, month, n, units, revenue in zip(
+        by_product["Product_ID"].tolist(), by_product["Month"].tolist(), by_product["Order_Lines"].tolist(),
+        by_product["Units"].tolist(), by_product["Revenue"].tolist()
+    ):
+        expected = product_month[(pid, int(month.replace("-", "")))]
+        mismatches += expected != [n, units, round(revenue * 100)]
+    for month, n, revenue, customers, returning in zip(
+        by_month["Month"].tolist(), by_month["Orders"].tolist(), by_month["Revenue"].tolist(),
+        by_month["Customers"].tolist(), by_month["Returning_Customers"].tolist()
+    ):
+        mismatches += monthly[int(month.replace("-", ""))] != (n, round(revenue * 100), customers, returning)
+    mismatches += len(product_month) != len(by_product["Product_ID"])
+
+    print(f"per-row         : {per_row_s:.3f}s")
+    print(f"vectorized      : {vectorized_s:.3f}s ({per_row_s / vectorized_s:.1f}x faster)")
+    print(f"repeat customers: {summary['repeat_customer_rate']:.2%}, "
+          f"avg basket {summary['avg_basket_value']:.2f} / {summary['avg_basket_units']} units")
+    print("result          : " + ("MISMATCH" if mismatches else "results identical"))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=200000, help="synthetic orders to generate")
+    parser.add_argument("--customers", type=int, default=20000, help="distinct customers")
+    parser.add_argument("--products", type=int, default=2000, help="distinct products")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="rows converted per chunk")
+    parser.add_argument("--seed", type=int, default=7, help="random seed")
+    raise SystemExit(run(parser.parse_args()))
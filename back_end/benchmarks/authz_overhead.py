@@ -0,0 +1,97 @@
+"""
+Microbenchmark for the role-based authorization layer (utils/authz.py).
+
+Builds a throwaway Flask app (no database needed) with three routes that
+return the same tiny body and times requests through the test client:
+
+    open       - no authentication at all
+    jwt only   - @jwt_required(), the cost any signed-in endpoint pays
+    authz      - a protect_blueprint(bp, "Admin") route: policy lookup,
+                 JWT verification and the role check
+
+The "authz" minus "jwt only" difference is what the policy table adds on
+top of verifying the token. The run also checks that a non-admin token is
+refused (403) and a missing token is refused (401).
+
+Usage (from back_end/):
+    python -m benchmarks.authz_overhead --requests 20000
+"""
+import argparse
+import time
+
+from flask import Blueprint, Flask, jsonify
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required
+
+from utils import authz
+
+
+def build_app():
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "benchmark-secret-key-of-sufficient-length"
+    JWTManager(app)
+
+    open_bp = Blueprint("bench_open", __name__)
+    admin_bp = Blueprint("bench_admin", __name__)
+    authz.protect_blueprint(admin_bp, authz.ADMIN_ROLE)
+
+    @open_bp.route("/open")
+    def open_route():
+        return jsonify({"ok": True})
+
+    @open_bp.route("/jwt")
+    @jwt_required()
+    def jwt_route():
+        return jsonify({"ok": True})
+
+    @admin_bp.route("/admin")
+    def admin_route():
+        return jsonify({"ok": True})
+
+    app.register_blueprint(open_bp, url_prefix="/bench")
+    app.register_blueprint(admin_bp, url_prefix="/bench")
+    authz.init_app(app)
+
+    with app.app_context():
+        tokens = {
+            role: create_access_token(identity="1", additional_claims={"role": role})
+            for role in (authz.ADMIN_ROLE, "Customer")
+        }
+    return app, tokens
+
+
+def time_requests(client, path, headers, n):
+    client.get(path, headers=headers)  # warm-up
+    started = time.perf_counter()
+    for _ in range(n):
+        client.get(path, headers=headers)
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def run(args):
+    app, tokens = build_app()
+    client = app.test_client()
+    admin = {"Authorization": f"Bearer {tokens[authz.ADMIN_ROLE]}"}
+
+    failures = 0
+    failures += client.get("/bench/admin", headers=admin).status_code != 200
+    failures += client.get("/bench/admin", headers={
+        "Authorization": f"Bearer {tokens['Customer']}"
+    }).status_code != 403
+    failures += client.get("/bench/admin").status_code != 401
+
+    open_us = time_requests(client, "/bench/open", {}, args.requests)
+    jwt_us = time_requests(client, "/bench/jwt", admin, args.requests)
+    authz_us = time_requests(client, "/bench/admin", admin, args.requests)
+
+    print(f"requests        : {args.requests} per route")
+    print(f"open            : {open_us:.1f} us/request")
+    print(f"jwt only        : {jwt_us:.1f} us/request (+{jwt_us - open_us:.1f})")
+    print(f"authz           : {authz_us:.1f} us/request (+{authz_us - jwt_us:.1f} over jwt only)")
+    print("result          : " + ("POLICY NOT ENFORCED" if failures else "200 / 403 / 401 as expected"))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000, help="requests timed per route")
+    raise SystemExit(run(parser.parse_args()))
@@ -0,0 +1,116 @@
+"""
+Concurrency benchmark for checkout stock reservation.
+
+Creates a throw-away product with a small stock, then fires many parallel
+"checkouts" at it from separate connections. Each checkout runs
+services.stock.reserve_stock() in its own transaction, exactly like the
+checkout endpoints do. The run fails if more units were sold than existed.
+
+Pass --naive to run the old read-then-write approach instead; it will
+usually oversell, which is the bug reserve_stock() fixes.
+
+Usage (from back_end/, against the database in config.py):
+    python -m benchmarks.checkout_concurrency --stock 50 --workers 32 --checkouts 400
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from database.connection import ConnectionPool, PooledConnection
+from services.stock import InsufficientStock, reserve_stock
+
+
+def naive_checkout(cursor, product_id, quantity):
+    # The pre-reservation behaviour: read stock, check in Python, write back
+    cursor.execute("SELECT Stock_Quantity FROM products WHERE Product_ID=%s", (product_id,))
+    stock = cursor.fetchone()["Stock_Quantity"]
+    if stock < quantity:
+        raise InsufficientStock(product_id, quantity)
+    cursor.execute("UPDATE products SET Stock_Quantity=%s WHERE Product_ID=%s",
+                   (stock - quantity, product_id))
+
+
+def run(args):
+    pool = ConnectionPool(max_size=args.workers + 1, timeout=30, max_idle=300, ping_after=30)
+
+    setup = PooledConnection(pool, pool.acquire())
+    cur = setup.cursor()
+    cur.execute("""
+        INSERT INTO products (Product_Name, Category, Description, Author_Brand, Price, Stock_Quantity)
+        VALUES ('Benchmark item', 'Other', 'checkout_concurrency benchmark', 'bench', 1.00, %s)
+    """, (args.stock,))
+    product_id = cur.lastrowid
+    setup.commit()
+
+    sold = []
+    rejected = []
+    latencies = []
+    lock = threading.Lock()
+    remaining = iter(range(args.checkouts))
+
+    def worker():
+        conn = PooledConnection(pool, pool.acquire())
+        cursor = conn.cursor()
+        try:
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                started = time.perf_counter()
+                try:
+                    if args.naive:
+                        naive_checkout(cursor, product_id, args.quantity)
+                    else:
+                        reserve_stock(cursor, [(product_id, args.quantity)], remarks="Benchmark")
+                    conn.commit()
+                    outcome = sold
+                except InsufficientStock:
+                    conn.rollback()
+                    outcome = rejected
+                with lock:
+                    outcome.append(args.quantity)
+                    latencies.append(time.perf_counter() - started)
+        finally:
+            cursor.close()
+            conn.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(args.workers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    cur.execute("SELECT Stock_Quantity FROM products WHERE Product_ID=%s", (product_id,))
+    final_stock = cur.fetchone()["Stock_Quantity"]
+
+    # Clean up the throw-away product and its log rows
+    cur.execute("DELETE FROM inventory_log WHERE Product_ID=%s", (product_id,))
+    cur.execute("DELETE FROM products WHERE Product_ID=%s", (product_id,))
+    setup.commit()
+    cur.close()
+    setup.close()
+
+    units_sold = sum(sold)
+    print(f"mode            : {'naive read-then-write' if args.naive else 'reserve_stock'}")
+    print(f"checkouts       : {len(sold)} succeeded, {len(rejected)} rejected in {elapsed:.2f}s "
+          f"({args.checkouts / elapsed:.0f}/s)")
+    print(f"latency         : p50 {statistics.median(latencies) * 1000:.1f} ms, "
+          f"max {max(latencies) * 1000:.1f} ms")
+    print(f"stock           : start {args.stock}, sold {units_sold}, final {final_stock}")
+
+    oversold = units_sold > args.stock or final_stock != args.stock - units_sold
+    print("result          : " + ("OVERSOLD" if oversold else "no overselling"))
+    return 1 if oversold else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stock", type=int, default=50, help="initial stock of the test product")
+    parser.add_argument("--quantity", type=int, default=1, help="units per checkout")
+    parser.add_argument("--workers", type=int, default=32, help="parallel connections")
+    parser.add_argument("--checkouts", type=int, default=400, help="total checkout attempts")
+    parser.add_argument("--naive", action="store_true", help="use the old read-then-write logic")
+    raise SystemExit(run(parser.parse_args()))
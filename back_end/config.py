@@ -10,8 +10,79 @@ class Config:
     SECRET_KEY = "super-secret-key"       # Flask secret key (used for session, CSRF, etc.)
     JWT_SECRET_KEY = "jwt-secret-key"     # Secret key for JWT token encoding/decoding
 
+    # --------------------------- Password Hashing ---------------------------
+    BCRYPT_LOG_ROUNDS = 12                 # bcrypt cost factor; older hashes are upgraded on login
+    BCRYPT_WORKERS = 2                     # Hashing processes (0 = hash on the request thread)
+    BCRYPT_MAX_PENDING = 16                # Hash / check calls in flight before answering 429
+    BCRYPT_TIMEOUT = 10                    # Seconds to wait for a hashing worker
+
+    # --------------------------- Login Protection ---------------------------
+    AUTH_USER_CACHE_SIZE = 4096            # Login rows cached by email (including unknown emails)
+    AUTH_USER_CACHE_TTL = 60               # Seconds a cached login row stays valid
+    LOGIN_EMAIL_BURST = 5                  # Failed logins allowed per email before 429
+    LOGIN_EMAIL_REFILL_SECONDS = 60        # One more attempt per email every this many seconds
+    LOGIN_IP_BURST = 20                    # Failed logins allowed per client IP before 429
+    LOGIN_IP_REFILL_SECONDS = 15           # One more attempt per IP every this many seconds
+
+    # --------------------------- Access Token Claims ---------------------------
+    # Users columns copied into the token's "profile" claim so read-mostly
+    # endpoints (profile, shipping, checkout review) can skip the Users query
+    JWT_PROFILE_CLAIMS = ["Full_Name", "Username", "Email", "Contact_Number", "Address", "Image_URL"]
+    JWT_ACCESS_TOKEN_MINUTES = 15          # Access tokens are trusted from their claims alone for this long
+    JWT_REFRESH_TOKEN_DAYS = 7             # POST /auth/refresh re-checks Profile_Version against the DB
+
     # --------------------------- Database Configuration ---------------------------
     DB_HOST = "localhost"                  # MySQL server host
     DB_USER = "root"                       # MySQL username
     DB_PASSWORD = ""                       # MySQL password
     DB_NAME = "librotrackdb"               # MySQL database name
+
+    # --------------------------- Connection Pool ---------------------------
+    DB_POOL_SIZE = 10                      # Max connections checked out at once
+    DB_POOL_TIMEOUT = 5                    # Seconds to wait for a free connection
+    DB_POOL_MAX_IDLE = 300                 # Idle connections older than this (s) are recycled
+    DB_POOL_PING_AFTER = 30                # Health-check connections idle longer than this (s)
+
+    # --------------------------- Product Catalog ---------------------------
+    PRODUCTS_PAGE_SIZE = 50                # Default page size for GET /products/
+    PRODUCTS_PAGE_MAX = 200                # Largest page a client may request
+    PRODUCT_CACHE_SIZE = 2048              # Max entries in the in-process product cache (LRU)
+    PRODUCT_CACHE_TTL = 300                # Seconds a cached product / listing stays valid
+    SEARCH_INDEX_REFRESH = 300             # Rebuild the in-process search index after this many seconds
+    FACETS_REFRESH = 300                   # Reload the facet summary from MySQL after this many seconds
+    PRICE_BUCKET_WIDTH = 100               # Width of each price histogram bucket
+    BULK_IMPORT_CHUNK = 500                # Products per INSERT / COMMIT in bulk imports
+    EXPORT_FETCH_SIZE = 1000               # Rows pulled per batch by the streaming export
+
+    # --------------------------- Cart ---------------------------
+    CART_CACHE_SIZE = 10000                # Max cached carts (one per user, LRU)
+    CART_CACHE_TTL = 120                   # Seconds a cached cart stays valid
+
+    # --------------------------- Orders ---------------------------
+    ORDERS_PAGE_SIZE = 50                  # Default page size for order listings
+    ORDERS_PAGE_MAX = 200                  # Upper bound for ?limit= on order listings
+    SALES_ROLLUP_SHARDS = 8                # sales_daily rows per day checkouts spread over
+    CHECKOUT_IDEMPOTENCY_TTL_HOURS = 24    # Hours an Idempotency-Key is remembered
+    CHECKOUT_IDEMPOTENCY_PURGE_CHUNK = 5000  # Expired keys deleted per transaction
+
+    # --------------------------- Inventory Log Writer ---------------------------
+    INVENTORY_LOG_ASYNC = True             # False = write each event synchronously (tests, scripts)
+    INVENTORY_LOG_QUEUE_SIZE = 10000       # Max queued events before callers write synchronously
+    INVENTORY_LOG_BATCH_SIZE = 500         # Max events per multi-row INSERT
+    INVENTORY_LOG_FLUSH_INTERVAL = 1.0     # Seconds the writer waits for more events
+    INVENTORY_LOG_DB_POOL_SIZE = 4         # Writer's own connections, separate from DB_POOL_SIZE
+    INVENTORY_LOG_PAGE_SIZE = 100          # Default page size for GET /inventory_log/
+    INVENTORY_LOG_PAGE_MAX = 500           # Upper bound for ?limit= on GET /inventory_log/
+    INVENTORY_LOG_RETENTION_MONTHS = 6     # Whole months kept row-by-row; older rows are compacted
+    INVENTORY_LOG_COMPACT_CHUNK = 5000     # Rows compacted per transaction
+
+    # --------------------------- Low-Stock Alerts ---------------------------
+    LOW_STOCK_DEFAULT_THRESHOLD = 5        # Reorder threshold when neither product nor category sets one
+    LOW_STOCK_COVER_DAYS = 14              # Also alert when stock covers this many days of sales or fewer
+    LOW_STOCK_VELOCITY_DAYS = 30           # Sales window used to compute daily velocity
+    LOW_STOCK_REFRESH = 300                # Seconds between full rebuilds of the alert index
+    LOW_STOCK_ALERTS_MAX = 200             # Upper bound for ?limit= on GET /inventory/alerts
+
+    # --------------------------- Analytics Export ---------------------------
+    ANALYTICS_CHUNK_SIZE = 50000           # Rows streamed per fetch into the columnar arrays
+    ANALYTICS_OUTPUT_DIR = "exports"       # Default output directory for `flask export-analytics`
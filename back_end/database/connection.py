@@ -1,16 +1,251 @@
+import threading
+import time
+
 import MySQLdb
 import MySQLdb.cursors
+from flask import g, has_app_context
 from config import Config
+from utils import metrics
 
-def get_db():
+# Driver error classes, re-exported so callers never import MySQLdb directly
+Error = MySQLdb.Error
+IntegrityError = MySQLdb.IntegrityError
+
+
+class PoolExhausted(MySQLdb.OperationalError):
+    """
+    Raised when no pooled connection becomes free within DB_POOL_TIMEOUT.
+    """
+
+
+def _connect():
     """
-    Create and return a new MySQL database connection using settings
-    from the Config class.
+    Open a brand-new MySQL connection using settings from the Config class.
+    Only the pool calls this; handlers should always go through get_db().
+
+    This is the single data-access path for the whole backend: one driver
+    (MySQLdb / mysqlclient), one row format (dicts) and one pool.
     """
     return MySQLdb.connect(
         host=Config.DB_HOST,             # Database server hostname / IP
         user=Config.DB_USER,             # MySQL username
         passwd=Config.DB_PASSWORD,       # MySQL password
         db=Config.DB_NAME,               # Database name to connect to
+        charset="utf8mb4",               # Full Unicode (titles, author names)
         cursorclass=MySQLdb.cursors.DictCursor  # Return results as dictionaries
     )
+
+
+# ================= CONNECTION POOL =================
+class ConnectionPool:
+    """
+    Bounded pool of MySQL connections.
+
+    - At most `max_size` connections are checked out at once; callers wait
+      up to `timeout` seconds for one to be returned.
+    - Idle connections older than `max_idle` seconds are closed instead of reused.
+    - Connections idle longer than `ping_after` seconds are pinged before reuse,
+      and dead ones are replaced transparently.
+    """
+
+    def __init__(self, max_size, timeout, max_idle, ping_after):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.ping_after = ping_after
+
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle = []  # stack of (raw connection, last used timestamp)
+        self._in_use = 0
+        self._stats = {"created": 0, "reused": 0, "discarded": 0, "timeouts": 0}
+
+    def acquire(self):
+        """
+        Check out a healthy raw connection, opening a new one if no idle
+        connection can be reused.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            self._count("timeouts")
+            raise PoolExhausted("No database connection available (pool size %d)" % self.max_size)
+
+        try:
+            raw = self._take_idle()
+            if raw is None:
+                raw = _connect()
+                self._count("created")
+            else:
+                self._count("reused")
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+        return raw
+
+    def release(self, raw, discard=False):
+        """
+        Return a raw connection to the pool. Any open transaction is rolled
+        back so the next borrower never inherits uncommitted work or a stale
+        read snapshot.
+        """
+        try:
+            if not discard:
+                try:
+                    raw.rollback()
+                except MySQLdb.Error:
+                    discard = True
+
+            if discard:
+                self._close(raw)
+            else:
+                with self._lock:
+                    self._idle.append((raw, time.monotonic()))
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "max_size": self.max_size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+            })
+        return stats
+
+    # ----------------- internal helpers -----------------
+    def _take_idle(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                raw, last_used = self._idle.pop()
+
+            idle_for = time.monotonic() - last_used
+            if idle_for > self.max_idle:
+                self._close(raw)
+                continue
+
+            if idle_for > self.ping_after:
+                try:
+                    raw.ping()
+                except MySQLdb.Error:
+                    self._close(raw)
+                    continue
+
+            return raw
+
+    def _close(self, raw):
+        self._count("discarded")
+        try:
+            raw.close()
+        except MySQLdb.Error:
+            pass
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+
+class PooledConnection:
+    """
+    Thin proxy around a pooled connection. Everything is delegated to the
+    underlying MySQLdb connection except close(), which hands the connection
+    back to the pool instead of tearing down the socket.
+
+    Request-scoped connections ignore close() entirely: the same connection
+    is shared by every get_db() call in the request and is released once,
+    on app context teardown.
+    """
+
+    def __init__(self, pool, raw, request_scoped=False):
+        self._pool = pool
+        self._raw = raw
+        self._request_scoped = request_scoped
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if not self._request_scoped:
+            self.release()
+
+    def release(self, discard=False):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool.release(raw, discard=discard)
+
+
+pool = ConnectionPool(
+    max_size=Config.DB_POOL_SIZE,
+    timeout=Config.DB_POOL_TIMEOUT,
+    max_idle=Config.DB_POOL_MAX_IDLE,
+    ping_after=Config.DB_POOL_PING_AFTER,
+)
+metrics.register("db_pool", pool.stats)
+
+
+def get_db():
+    """
+    Return a pooled MySQL connection.
+
+    Inside a Flask app/request context the connection is stored on `g`, so
+    every blueprint and helper called during the request shares one pooled
+    connection. Outside a context (scripts, background threads) the caller
+    owns the connection and must close() it to return it to the pool.
+    """
+    if has_app_context():
+        if "db" not in g:
+            g.db = PooledConnection(pool, pool.acquire(), request_scoped=True)
+        return g.db
+
+    return PooledConnection(pool, pool.acquire())
+
+
+def insert_many(cursor, table, columns, rows):
+    """
+    Insert `rows` (sequences of values in `columns` order) with ONE multi-row
+    INSERT statement and return the id generated for the first row.
+
+    The other rows' ids are larger, in row order, but NOT necessarily
+    first_id + i: with innodb_autoinc_lock_mode=2 (the MySQL 8 default)
+    concurrent inserts can interleave, and auto_increment_increment may be
+    above 1. Callers that need every id must re-select them by a key.
+    """
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    sql = "INSERT INTO {} ({}) VALUES {}".format(
+        table, ", ".join(columns), ", ".join([placeholders] * len(rows))
+    )
+    cursor.execute(sql, [value for row in rows for value in row])
+    return cursor.lastrowid
+
+
+def streaming_cursor(conn, dict_rows=True):
+    """
+    Return an unbuffered (server-side) cursor on `conn`. Rows are pulled
+    from MySQL as they are fetched instead of being loaded all at once; the
+    cursor must be fully read or closed before the connection is reused.
+    dict_rows=False yields plain tuples (cheaper for bulk numeric reads).
+    """
+    return conn.cursor(MySQLdb.cursors.SSDictCursor if dict_rows else MySQLdb.cursors.SSCursor)
+
+
+def close_db(exc=None):
+    """
+    Teardown handler: return the request's connection to the pool.
+    A connection that saw an unhandled error is discarded rather than reused.
+    """
+    db = g.pop("db", None)
+    if db is not None:
+        db.release(discard=exc is not None)
+
+
+def init_app(app):
+    """
+    Register the pool teardown handler on the Flask app.
+    """
+    app.teardown_appcontext(close_db)
@@ -0,0 +1,335 @@
+import click
+
+from database.connection import get_db
+
+# ================= IDEMPOTENT SCHEMA MIGRATIONS =================
+# Indexes, columns and helper tables that features rely on. Every step
+# checks information_schema first, so `flask ensure-schema` can be re-run
+# safely. Migrations only run from that command (some rewrite live data,
+# e.g. the cart de-duplication); app start-up merely verifies that
+# REQUIRED_SCHEMA is present and refuses to serve without it.
+
+
+class SchemaError(RuntimeError):
+    """
+    The database lacks indexes / tables / columns the code relies on.
+    """
+
+
+def index_exists(cursor, table, name):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        LIMIT 1
+    """, (table, name))
+    return cursor.fetchone() is not None
+
+
+def leading_index_exists(cursor, table, column):
+    """
+    True if any index (including one MySQL created for a foreign key)
+    starts with `column`.
+    """
+    cursor.execute("""
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+          AND COLUMN_NAME = %s AND SEQ_IN_INDEX = 1
+        LIMIT 1
+    """, (table, column))
+    return cursor.fetchone() is not None
+
+
+def column_exists(cursor, table, column):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        LIMIT 1
+    """, (table, column))
+    return cursor.fetchone() is not None
+
+
+def table_exists(cursor, table):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        LIMIT 1
+    """, (table,))
+    return cursor.fetchone() is not None
+
+
+def ensure_index(cursor, table, name, columns, unique=False):
+    if not index_exists(cursor, table, name):
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        cursor.execute(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})")
+
+
+# ----------------- cart -----------------
+def _cart_unique_line(cursor):
+    """
+    One row per (user_id, product_id), so POST /cart/add can upsert with
+    INSERT ... ON DUPLICATE KEY UPDATE. Existing duplicates are merged
+    into the oldest row first.
+    """
+    if index_exists(cursor, "cart", "uq_cart_user_product"):
+        return
+
+    cursor.execute("""
+        UPDATE cart c
+        JOIN (
+            SELECT MIN(cart_id) AS keep_id, SUM(quantity) AS total
+            FROM cart
+            GROUP BY user_id, product_id
+            HAVING COUNT(*) > 1
+        ) d ON c.cart_id = d.keep_id
+        SET c.quantity = d.total
+    """)
+    cursor.execute("""
+        DELETE c FROM cart c
+        JOIN cart k
+          ON k.user_id = c.user_id AND k.product_id = c.product_id AND k.cart_id < c.cart_id
+    """)
+    ensure_index(cursor, "cart", "uq_cart_user_product", ["user_id", "product_id"], unique=True)
+
+
+# ----------------- checkout -----------------
+def _checkout_idempotency(cursor):
+    """
+    Remembers which order an Idempotency-Key produced, so a retried
+    checkout returns the same order instead of placing a second one.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS checkout_idempotency (
+            User_ID INT NOT NULL,
+            Idem_Key VARCHAR(64) NOT NULL,
+            Order_ID INT NULL,
+            Created_At DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (User_ID, Idem_Key)
+        )
+    """)
+    # Expired keys are purged by age (services/checkout.py)
+    ensure_index(cursor, "checkout_idempotency", "idx_checkout_idempotency_created", ["Created_At"])
+
+
+# ----------------- orders -----------------
+def _order_listing_indexes(cursor):
+    """
+    Keyset-paginated order listings filter by status or user and sort by
+    date; InnoDB appends Order_ID to each index, which is the tie-breaker.
+    """
+    ensure_index(cursor, "orders", "idx_orders_status_date", ["Order_Status", "Order_Date"])
+    ensure_index(cursor, "orders", "idx_orders_user_date", ["User_ID", "Order_Date"])
+
+
+def _order_details_by_order(cursor):
+    """
+    Order lines are loaded per page of orders with Order_ID IN (...).
+    """
+    if not leading_index_exists(cursor, "order_details", "Order_ID"):
+        ensure_index(cursor, "order_details", "idx_order_details_order", ["Order_ID"])
+
+
+# ----------------- reports -----------------
+def _sales_rollups(cursor):
+    """
+    Daily sales rollups maintained by checkout (see services/sales_rollup.py).
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sales_daily (
+            Sale_Date DATE NOT NULL,
+            Shard TINYINT NOT NULL DEFAULT 0,
+            Orders INT NOT NULL DEFAULT 0,
+            Units INT NOT NULL DEFAULT 0,
+            Revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (Sale_Date, Shard)
+        )
+    """)
+    # Tables created before sales_daily was sharded: one row per day
+    if not column_exists(cursor, "sales_daily", "Shard"):
+        cursor.execute("""
+            ALTER TABLE sales_daily
+                ADD COLUMN Shard TINYINT NOT NULL DEFAULT 0 AFTER Sale_Date,
+                DROP PRIMARY KEY,
+                ADD PRIMARY KEY (Sale_Date, Shard)
+        """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS product_sales_daily (
+            Sale_Date DATE NOT NULL,
+            Product_ID INT NOT NULL,
+            Category VARCHAR(100) NULL,
+            Units INT NOT NULL DEFAULT 0,
+            Revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (Sale_Date, Product_ID),
+            INDEX idx_product_sales_product (Product_ID, Sale_Date)
+        )
+    """)
+
+
+# ----------------- inventory log -----------------
+def _inventory_log_retention(cursor):
+    """
+    Range queries on the hot inventory_log table, and the per-product
+    monthly summary that old rows are compacted into
+    (see services/inventory_archive.py).
+    """
+    ensure_index(cursor, "inventory_log", "idx_inventory_log_product_date", ["Product_ID", "Log_Date"])
+    ensure_index(cursor, "inventory_log", "idx_inventory_log_date", ["Log_Date"])
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS inventory_log_monthly (
+            Product_ID INT NOT NULL,
+            Month DATE NOT NULL,
+            Net_Change INT NOT NULL DEFAULT 0,
+            Entries INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (Product_ID, Month),
+            INDEX idx_inventory_log_monthly_month (Month)
+        )
+    """)
+
+
+# ----------------- low-stock alerts -----------------
+def _reorder_thresholds(cursor):
+    """
+    Per-product reorder threshold (NULL = use the category's) and
+    per-category thresholds (see services/low_stock.py).
+    """
+    if not column_exists(cursor, "products", "Reorder_Threshold"):
+        cursor.execute("ALTER TABLE products ADD COLUMN Reorder_Threshold INT NULL")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS category_thresholds (
+            Category VARCHAR(100) NOT NULL PRIMARY KEY,
+            Reorder_Threshold INT NOT NULL
+        )
+    """)
+
+
+# ----------------- catalog import -----------------
+def _product_import_token(cursor):
+    """
+    products.Import_Token: set on every row of one bulk-import chunk, so the
+    chunk's generated Product_IDs can be read back exactly
+    (see services/catalog_import.py).
+    """
+    if not column_exists(cursor, "products", "Import_Token"):
+        cursor.execute("ALTER TABLE products ADD COLUMN Import_Token CHAR(32) NULL")
+    ensure_index(cursor, "products", "idx_products_import_token", ["Import_Token", "Product_ID"])
+
+
+# ----------------- access tokens -----------------
+def _profile_version(cursor):
+    """
+    Users.Profile_Version: bumped on every profile change; access tokens
+    carry the version they were issued for (see services/auth.py).
+    """
+    # Queries use both `Users` and `users`, i.e. table names are stored in
+    # lower case (lower_case_table_names=1), which information_schema reports
+    if not column_exists(cursor, "users", "Profile_Version"):
+        cursor.execute("ALTER TABLE Users ADD COLUMN Profile_Version INT NOT NULL DEFAULT 0")
+
+
+MIGRATIONS = [
+    _cart_unique_line,
+    _checkout_idempotency,
+    _order_listing_indexes,
+    _order_details_by_order,
+    _sales_rollups,
+    _inventory_log_retention,
+    _reorder_thresholds,
+    _product_import_token,
+    _profile_version,
+]
+
+
+# What the migrations above produce, checked at start-up
+REQUIRED_SCHEMA = [
+    ("cart.uq_cart_user_product", lambda c: index_exists(c, "cart", "uq_cart_user_product")),
+    ("checkout_idempotency table", lambda c: table_exists(c, "checkout_idempotency")),
+    ("checkout_idempotency.idx_checkout_idempotency_created",
+     lambda c: index_exists(c, "checkout_idempotency", "idx_checkout_idempotency_created")),
+    ("orders.idx_orders_status_date", lambda c: index_exists(c, "orders", "idx_orders_status_date")),
+    ("orders.idx_orders_user_date", lambda c: index_exists(c, "orders", "idx_orders_user_date")),
+    ("order_details index on Order_ID", lambda c: leading_index_exists(c, "order_details", "Order_ID")),
+    ("sales_daily table", lambda c: table_exists(c, "sales_daily")),
+    ("sales_daily.Shard column", lambda c: column_exists(c, "sales_daily", "Shard")),
+    ("product_sales_daily table", lambda c: table_exists(c, "product_sales_daily")),
+    ("inventory_log.idx_inventory_log_product_date",
+     lambda c: index_exists(c, "inventory_log", "idx_inventory_log_product_date")),
+    ("inventory_log.idx_inventory_log_date", lambda c: index_exists(c, "inventory_log", "idx_inventory_log_date")),
+    ("inventory_log_monthly table", lambda c: table_exists(c, "inventory_log_monthly")),
+    ("products.Reorder_Threshold column", lambda c: column_exists(c, "products", "Reorder_Threshold")),
+    ("category_thresholds table", lambda c: table_exists(c, "category_thresholds")),
+    ("products.idx_products_import_token", lambda c: index_exists(c, "products", "idx_products_import_token")),
+    ("users.Profile_Version column", lambda c: column_exists(c, "users", "Profile_Version")),
+]
+
+
+def ensure_schema():
+    """
+    Apply every migration step. DDL auto-commits in MySQL, so each step is
+    committed as it runs. Run it from one process (`flask ensure-schema`),
+    ideally while traffic is quiet.
+    """
+    conn = get_db()
+    cursor = conn.cursor()
+    try:
+        for step in MIGRATIONS:
+            step(cursor)
+            conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def missing_schema():
+    """
+    Names of the REQUIRED_SCHEMA entries the database does not have.
+    """
+    conn = get_db()
+    cursor = conn.cursor()
+    try:
+        return [name for name, present in REQUIRED_SCHEMA if not present(cursor)]
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def verify_schema():
+    """
+    Raise SchemaError if anything in REQUIRED_SCHEMA is missing.
+    """
+    missing = missing_schema()
+    if missing:
+        raise SchemaError(
+            "Database schema is out of date (missing: %s); run `flask ensure-schema`" % ", ".join(missing)
+        )
+
+
+def init_app(app):
+    """
+    Register the `flask ensure-schema` command and verify the schema.
+
+    Started directly (python app.py, a WSGI server) the check runs now and
+    a missing schema or unreachable database stops the app from booting.
+    Under the flask CLI the app is loaded for every command, including
+    ensure-schema itself, so there the check runs on the first request.
+    """
+    @app.cli.command("ensure-schema")
+    def ensure_schema_command():
+        """Create the indexes and tables the backend relies on."""
+        ensure_schema()
+        print("Schema is up to date")
+
+    if click.get_current_context(silent=True) is None:
+        with app.app_context():
+            verify_schema()
+        return
+
+    verified = []
+
+    @app.before_request
+    def verify_schema_once():
+        if not verified:
+            try:
+                verify_schema()
+            except SchemaError as e:
+                app.logger.error("%s", e)
+                raise
+            verified.append(True)
@@ -1,8 +1,6 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token
-from database.connection import get_db
-from utils.hash import check_password
-import MySQLdb.cursors
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
+from services.auth import AuthError, authenticate, issue_tokens, refresh_access_token
 
 auth = Blueprint("auth", __name__)
 
@@ -17,39 +15,40 @@ def login():
     email = data.get("email")
     password = data.get("password")
 
-    # Connect to database with dictionary cursor
-    conn = get_db()
-    cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+    # Cached lookup + bcrypt check in the hashing pool; failed attempts are
+    # rate-limited per email and per client IP before any of that work
+    try:
+        user = authenticate(email, password, request.remote_addr or "unknown")
+    except AuthError as e:
+        return jsonify({"success": False, "message": e.message}), e.status, e.headers
 
-    # Fetch user information including role
-    cursor.execute(
-        "SELECT User_ID, Email, Password, Role FROM Users WHERE Email = %s",
-        (email,)
-    )
-    user = cursor.fetchone()
-
-    cursor.close()
-    conn.close()
-
-    # If no user found with the given email
-    if not user:
-        return jsonify({"success": False, "message": "User not found"}), 404
-
-    # Validate password using hashing utility
-    if not check_password(user["Password"], password):
-        return jsonify({"success": False, "message": "Incorrect password"}), 401
-
-    # Generate JWT token including the role as an additional claim
-    token = create_access_token(
-        identity=str(user["User_ID"]),
-        additional_claims={"role": user["Role"]}  # Store role in JWT
-    )
+    # Short-lived access token (role, profile fields, version stamp) plus
+    # a refresh token for POST /auth/refresh
+    tokens = issue_tokens(user)
 
     # Successful login response + RETURN USER ID
     return jsonify({
         "success": True,
-        "token": token,
+        "token": tokens["token"],
+        "refresh_token": tokens["refresh_token"],
         "role": user["Role"],
         "user_id": user["User_ID"],     # 👈 Added this line
         "message": "Login successful"
     }), 200
+
+
+@auth.route("/refresh", methods=["POST", "OPTIONS"])
+@jwt_required(refresh=True)
+def refresh():
+    """
+    Exchange a refresh token (Authorization: Bearer <refresh_token>) for a
+    new access token. Refused once the user has edited their profile since
+    the refresh token was issued, or was deleted.
+    """
+    if request.method == "OPTIONS":
+        return '', 200
+
+    token = refresh_access_token(get_jwt_identity(), get_jwt().get("ver"))
+    if not token:
+        return jsonify({"success": False, "message": "Session expired, please log in again"}), 401
+    return jsonify({"success": True, "token": token}), 200
@@ -1,7 +1,8 @@
-from datetime import datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from database.connection import get_db
+from services import cart_cache
+from services.checkout import CheckoutError, checkout
 import traceback
 
 cart = Blueprint("cart", __name__)
@@ -18,43 +19,97 @@ def get_cart():
         if not user_id:
             return jsonify({"error": "Invalid user"}), 401
 
+        # Cart items with product info + totals (served from the per-user cart cache)
+        return jsonify(cart_cache.get_cart_view(user_id)), 200
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+# ===========================================================
+# ADD TO CART
+# ===========================================================
+# One statement per line: the row is inserted, or its quantity bumped via
+# the (user_id, product_id) unique key, only if the product has enough stock
+# for the resulting cart quantity. The SELECT yields no row otherwise.
+UPSERT_CART_LINE = """
+    INSERT INTO cart (user_id, product_id, quantity)
+    SELECT %s, p.Product_ID, %s
+    FROM products p
+    LEFT JOIN cart c ON c.user_id = %s AND c.product_id = p.Product_ID
+    WHERE p.Product_ID = %s
+      AND p.Stock_Quantity >= %s + COALESCE(c.quantity, 0)
+    ON DUPLICATE KEY UPDATE quantity = cart.quantity + %s
+"""
+
+def parse_cart_line(data):
+    """
+    Validate {"product_id", "quantity"} from a request body.
+    Returns (product_id, quantity, error message or None).
+    """
+    if not isinstance(data, dict) or "product_id" not in data:
+        return None, None, "Missing product_id"
+
+    try:
+        product_id = int(data["product_id"])
+        quantity = int(data.get("quantity", 1))
+    except (TypeError, ValueError):
+        return None, None, "product_id and quantity must be numbers"
+
+    if quantity < 1:
+        return None, None, "Quantity must be at least 1"
+
+    return product_id, quantity, None
+
+def upsert_cart_line(cur, user_id, product_id, quantity):
+    """
+    Add `quantity` of a product to the user's cart in one round trip.
+    Returns None on success, or (http status, error message).
+    """
+    cur.execute(UPSERT_CART_LINE, (user_id, quantity, user_id, product_id, quantity, quantity))
+    if cur.rowcount > 0:  # 1 = inserted, 2 = existing line updated
+        return None
+
+    # Nothing written: find out why (only on the failure path)
+    cur.execute("SELECT Stock_Quantity FROM products WHERE Product_ID=%s", (product_id,))
+    product = cur.fetchone()
+    if not product:
+        return 404, "Product not found"
+    return 400, f"Quantity exceeds available stock ({product['Stock_Quantity']})"
+
+@cart.route("/add", methods=["POST"])
+@jwt_required()
+def add_cart():
+    try:
+        # Parse and validate request body
+        product_id, quantity, error = parse_cart_line(request.get_json())
+        if error:
+            return jsonify({"error": error}), 422
+
+        # Get user ID from token
+        user_id = get_jwt_identity()
+        if not user_id:
+            return jsonify({"error": "Invalid user"}), 401
+
         # Connect to DB
         db = get_db()
         cur = db.cursor()
 
-        # Fetch cart items with related product info
-        cur.execute("""
-            SELECT 
-                c.cart_id, c.quantity, 
-                p.Product_ID, p.Product_Name, p.Price, p.image_uri
-            FROM cart c
-            JOIN products p ON c.product_id = p.Product_ID
-            WHERE c.user_id = %s
-        """, (user_id,))
-        items = cur.fetchall()
-
-        # Compute item totals + cart total
-        cart_total = 0
-        for item in items:
-            price = float(item["Price"])
-            qty = int(item["quantity"])
-            item["total_price"] = round(price * qty, 2)
-            cart_total += price * qty
-
-        # Build response
-        response = {
-            "items": items,
-            "cart_total": round(cart_total, 2)
-        }
-
-        return jsonify(response), 200
+        failure = upsert_cart_line(cur, user_id, product_id, quantity)
+        if failure:
+            return jsonify({"error": failure[1]}), failure[0]
+
+        db.commit()
+        cart_cache.line_added(user_id, product_id, quantity)
+        return jsonify({"msg": "Added to cart"}), 201
 
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
     finally:
-        # Close database resources
+        # Close resources
         if 'cur' in locals():
             cur.close()
         if 'db' in locals():
@@ -62,64 +117,54 @@ def get_cart():
 
 
 # ===========================================================
-# ADD TO CART
+# ADD MANY ITEMS TO CART (e.g. a whole wishlist)
 # ===========================================================
-@cart.route("/add", methods=["POST"])
+@cart.route("/add_many", methods=["POST"])
 @jwt_required()
-def add_cart():
+def add_many_cart():
+    """
+    Add several products in one request and one transaction.
+    Body: {"items": [{"product_id": 1, "quantity": 2}, ...]} or the bare list.
+    Lines that fail (bad input, unknown product, not enough stock) are
+    reported in "errors" by position; the rest are still added.
+    """
     try:
-        # Parse request body
         data = request.get_json()
-        if not data or "product_id" not in data:
-            return jsonify({"error": "Missing product_id"}), 422
-
-        product_id = data["product_id"]
-
-        # Validate quantity
-        try:
-            quantity = int(data.get("quantity", 1))
-        except ValueError:
-            return jsonify({"error": "Quantity must be a number"}), 422
+        items = data.get("items") if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "Missing items"}), 422
 
-        # Get user ID from token
         user_id = get_jwt_identity()
         if not user_id:
             return jsonify({"error": "Invalid user"}), 401
 
-        # Connect to DB
         db = get_db()
         cur = db.cursor()
 
-        # Check if product already exists in cart
-        cur.execute(
-            "SELECT cart_id, quantity FROM cart WHERE user_id=%s AND product_id=%s",
-            (user_id, product_id)
-        )
-        existing = cur.fetchone()
-
-        # Update quantity if item exists
-        if existing:
-            new_qty = existing["quantity"] + quantity
-            cur.execute(
-                "UPDATE cart SET quantity=%s WHERE cart_id=%s",
-                (new_qty, existing["cart_id"])
-            )
-        else:
-            # Insert new cart item
-            cur.execute(
-                "INSERT INTO cart (user_id, product_id, quantity) VALUES (%s, %s, %s)",
-                (user_id, product_id, quantity)
-            )
+        added = []
+        errors = []
+        for index, item in enumerate(items):
+            product_id, quantity, error = parse_cart_line(item)
+            if error:
+                errors.append({"index": index, "error": error})
+                continue
+
+            failure = upsert_cart_line(cur, user_id, product_id, quantity)
+            if failure:
+                errors.append({"index": index, "product_id": product_id, "error": failure[1]})
+            else:
+                added.append({"product_id": product_id, "quantity": quantity})
 
         db.commit()
-        return jsonify({"msg": "Added to cart"}), 201
+        cart_cache.invalidate_cart(user_id)
+        status = 201 if added else 400
+        return jsonify({"msg": f"Added {len(added)} item(s) to cart", "added": added, "errors": errors}), status
 
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
     finally:
-        # Close resources
         if 'cur' in locals():
             cur.close()
         if 'db' in locals():
@@ -132,11 +177,6 @@ def add_cart():
 @cart.route("/update/<int:cart_id>", methods=["PUT", "OPTIONS"])
 @jwt_required()
 def update_cart(cart_id):
-    import traceback
-    from flask import request, jsonify
-    from database.connection import get_db
-    import MySQLdb.cursors
-
     # Handle preflight OPTIONS for CORS
     if request.method == "OPTIONS":
         return '', 200
@@ -158,12 +198,13 @@ def update_cart(cart_id):
 
         # Connect to DB
         db = get_db()
-        cur = db.cursor(MySQLdb.cursors.DictCursor)
+        cur = db.cursor()
+        user_id = get_jwt_identity()
 
         # -------------------------
-        # Get product_id from cart
+        # Get product_id from cart (only the caller's own lines)
         # -------------------------
-        cur.execute("SELECT product_id FROM cart WHERE cart_id=%s", (cart_id,))
+        cur.execute("SELECT product_id FROM cart WHERE cart_id=%s AND user_id=%s", (cart_id, user_id))
         result = cur.fetchone()
         if not result:
             return jsonify({"error": "Cart item not found"}), 404
@@ -188,10 +229,13 @@ def update_cart(cart_id):
         # Update cart quantity
         # -------------------------
         cur.execute(
-            "UPDATE cart SET quantity=%s WHERE cart_id=%s",
-            (quantity, cart_id)
+            "UPDATE cart SET quantity=%s WHERE cart_id=%s AND user_id=%s",
+            (quantity, cart_id, user_id)
         )
+        updated = cur.rowcount
         db.commit()
+        if updated == 1:  # 0 = quantity unchanged, cache already right
+            cart_cache.line_updated(user_id, cart_id, quantity)
 
         return jsonify({"msg": "Quantity updated successfully"}), 200
 
@@ -215,12 +259,14 @@ def remove_cart(cart_id):
         db = get_db()
         cur = db.cursor()
 
-        # Delete one cart item
-        cur.execute("DELETE FROM cart WHERE cart_id = %s", (cart_id,))
-        if cur.rowcount == 0:
+        # Delete one of the caller's cart items
+        user_id = get_jwt_identity()
+        cur.execute("DELETE FROM cart WHERE cart_id = %s AND user_id = %s", (cart_id, user_id))
+        if cur.rowcount != 1:
             return jsonify({"error": "Item not found"}), 404
 
         db.commit()
+        cart_cache.line_removed(user_id, cart_id)
         return jsonify({"msg": "Item removed"}), 200
 
     except Exception as e:
@@ -240,68 +286,26 @@ def remove_cart(cart_id):
 @cart.route("/checkout", methods=["POST"])
 @jwt_required()
 def checkout_cart():
-    db = None
-    cur = None
+    """
+    Thin wrapper around services.checkout.checkout().
+    Send an Idempotency-Key header to make client retries safe.
+    """
     try:
         # Get user ID
         user_id = get_jwt_identity()
         if not user_id:
             return jsonify({"error": "Invalid user"}), 401
 
-        # Connect to DB
-        db = get_db()
-        cur = db.cursor()
-
-        # 1. Get all items in user's cart
-        cur.execute("""
-            SELECT c.cart_id, c.product_id, c.quantity, p.Price AS price
-            FROM cart c
-            JOIN products p ON c.product_id = p.Product_ID
-            WHERE c.user_id = %s
-        """, (user_id,))
-        cart_items = cur.fetchall()
-
-        if not cart_items:
-            return jsonify({"error": "Cart is empty"}), 400
-
-        # 2. Compute order total
-        total_amount = sum(float(item["price"]) * int(item["quantity"]) for item in cart_items)
-
-        # 3. Insert a new order record
-        order_date = datetime.now()
-        order_status = "Pending"
-        cur.execute("""
-            INSERT INTO orders (User_ID, Order_Date, Total_Amount, Order_Status)
-            VALUES (%s, %s, %s, %s)
-        """, (user_id, order_date, total_amount, order_status))
-
-        order_id = cur.lastrowid  # Get newly created order ID
-
-        # 4. Insert each item into order_details table
-        for item in cart_items:
-            subtotal = float(item["price"]) * int(item["quantity"])
-            cur.execute("""
-                INSERT INTO order_details (Order_ID, Product_ID, Quantity, Subtotal)
-                VALUES (%s, %s, %s, %s)
-            """, (order_id, item["product_id"], item["quantity"], subtotal))
-
-        # 5. Clear the user's cart after checkout
-        cur.execute("DELETE FROM cart WHERE user_id = %s", (user_id,))
-        db.commit()
+        summary, timer = checkout(user_id, request.headers.get("Idempotency-Key"))
 
         # Successful checkout response
-        return jsonify({
-            "message": "Checkout successful",
-            "Order_ID": order_id,
-            "total_amount": round(total_amount, 2)
-        }), 201
+        response = jsonify({"message": "Checkout successful", **summary})
+        response.headers["Server-Timing"] = timer.server_timing()
+        return response, 200 if summary["replayed"] else 201
+
+    except CheckoutError as e:
+        return jsonify(e.body), e.status
 
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": f"Checkout failed: {str(e)}"}), 500
-
-    finally:
-        if cur:
-            cur.close()
-        if db:
-            db.close()
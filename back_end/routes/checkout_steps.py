@@ -1,8 +1,11 @@
-import MySQLdb
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_cors import CORS
 from database.connection import get_db
+from services import cart_cache
+from services.cart_cache import get_cart_view
+from services.auth import invalidate_user, reissue_tokens, token_profile
+from services.checkout import CheckoutError, checkout
 
 checkout_steps_bp = Blueprint("checkout", __name__)
 CORS(checkout_steps_bp, origins="http://localhost:4200")  # Allow Angular frontend
@@ -10,10 +13,21 @@ CORS(checkout_steps_bp, origins="http://localhost:4200")  # Allow Angular fronte
 @jwt_required()
 def save_shipping():
     user_id = get_jwt_identity()
+
+    if request.method == "GET":
+        # Shipping fields travel in the token's profile claim
+        claims = token_profile("Full_Name", "Address", "Contact_Number")
+        if claims:
+            return jsonify({
+                "full_name": claims["Full_Name"] or "",
+                "address": claims["Address"] or "",
+                "contact_number": claims["Contact_Number"] or ""
+            }), 200
+
     db = get_db()
 
     try:
-        with db.cursor(MySQLdb.cursors.DictCursor) as cur:  # dict cursor
+        with db.cursor() as cur:  # dict rows
             if request.method == "GET":
                 cur.execute("""
                     SELECT Full_Name, Address, Contact_Number
@@ -22,8 +36,6 @@ def save_shipping():
                 """, (user_id,))
                 user_info = cur.fetchone()
 
-                print("DEBUG SQL RESULT:", user_info)  # debug
-
                 if not user_info:
                     return jsonify({"error": "User profile not found"}), 404
 
@@ -44,15 +56,20 @@ def save_shipping():
 
             cur.execute("""
                 UPDATE Users
-                SET Full_Name=%s, Address=%s, Contact_Number=%s
+                SET Full_Name=%s, Address=%s, Contact_Number=%s,
+                    Profile_Version = Profile_Version + 1
                 WHERE User_ID=%s
             """, (full_name, address, contact_number, user_id))
             db.commit()
 
-        return jsonify({"message": "Shipping info saved"}), 200
+            # The old token now carries stale shipping fields; hand out new ones
+            invalidate_user(user_id)
+            tokens = reissue_tokens(cur, user_id) or {}
+
+        return jsonify({"message": "Shipping info saved", **tokens}), 200
 
-    except Exception as e:
-        print("Error in save_shipping:", e)
+    except Exception:
+        current_app.logger.exception("Error in save_shipping")
         return jsonify({"error": "Internal server error"}), 500
 
     finally:
@@ -80,8 +97,12 @@ def save_payment():
 @checkout_steps_bp.route("/review", methods=["GET"])
 @jwt_required()
 def review_order():
+    """
+    Cart items, total and shipping info for the review step.
+    ?mode=full returns everything the checkout wizard needs in one query
+    (see review_order_full).
+    """
     user_id = get_jwt_identity()
-    print("DEBUG USER_ID RECEIVED FROM TOKEN =", user_id)
 
     # Ensure user_id is integer (safety)
     try:
@@ -89,48 +110,44 @@ def review_order():
     except:
         return jsonify({"error": "Invalid user identity in token"}), 400
 
-    db = get_db()
+    if request.args.get("mode") == "full":
+        return review_order_full(user_id)
 
     try:
-        # Use DictCursor to safely access columns by name
-        cur = db.cursor(MySQLdb.cursors.DictCursor)
-
         # ----------------------
-        # Fetch cart items
+        # Cart items + total (from the per-user cart cache)
         # ----------------------
-        cur.execute("""
-            SELECT c.cart_id, c.product_id, c.quantity, p.Product_Name, p.Price
-            FROM cart c
-            JOIN products p ON c.product_id = p.Product_ID
-            WHERE c.user_id=%s
-        """, (user_id,))
-        rows = cur.fetchall()
-
-        if not rows:
+        cart_view = get_cart_view(user_id)
+        if not cart_view["items"]:
             return jsonify({"error": "Cart is empty"}), 400
 
         cart_items = [
             {
                 "cart_id": r["cart_id"],
-                "product_id": r["product_id"],
+                "product_id": r["Product_ID"],
                 "quantity": r["quantity"],
                 "Product_Name": r["Product_Name"],
                 "Price": float(r["Price"])
             }
-            for r in rows
+            for r in cart_view["items"]
         ]
 
-        total_amount = sum(item["Price"] * item["quantity"] for item in cart_items)
-
         # ----------------------
-        # Fetch user shipping info
+        # User shipping info (from the token's profile claim when present)
         # ----------------------
-        cur.execute("""
-            SELECT Full_Name, Address, Contact_Number
-            FROM Users
-            WHERE User_ID=%s
-        """, (user_id,))
-        user_info_db = cur.fetchone()
+        user_info_db = token_profile("Full_Name", "Address", "Contact_Number")
+        if not user_info_db:
+            # Rows come back as dicts, so columns are accessed by name
+            db = get_db()
+            cur = db.cursor()
+            cur.execute("""
+                SELECT Full_Name, Address, Contact_Number
+                FROM Users
+                WHERE User_ID=%s
+            """, (user_id,))
+            user_info_db = cur.fetchone()
+            cur.close()
+            db.close()
 
         if not user_info_db:
             return jsonify({"error": "User profile not found"}), 404
@@ -142,21 +159,99 @@ def review_order():
             "payment_method": "COD"  # always COD
         }
 
-        cur.close()
-
         return jsonify({
             "user_info": user_info,
             "items": cart_items,
-            "total_amount": round(total_amount, 2)
+            "total_amount": cart_view["cart_total"]
         }), 200
 
-    except Exception as e:
-        print("Error in review_order:", e)
+    except Exception:
+        current_app.logger.exception("Error in review_order")
         return jsonify({"error": "Internal server error"}), 500
 
+
+# Users LEFT JOIN cart LEFT JOIN products: one row per cart line (or a
+# single row with NULL cart columns when the cart is empty), each carrying
+# the user's shipping fields.
+FULL_REVIEW = """
+    SELECT u.Full_Name, u.Address, u.Contact_Number,
+           c.cart_id, c.product_id, c.quantity,
+           p.Product_ID, p.Product_Name, p.Price, p.image_uri, p.Stock_Quantity
+    FROM Users u
+    LEFT JOIN cart c ON c.user_id = u.User_ID
+    LEFT JOIN products p ON p.Product_ID = c.product_id
+    WHERE u.User_ID = %s
+    ORDER BY c.product_id
+"""
+
+def review_order_full(user_id):
+    """
+    Whole checkout wizard state from ONE joined query:
+        user_info    - shipping fields (+ payment_method, always COD)
+        items        - cart lines with available stock and an in_stock flag
+        total_amount - cart total
+        all_in_stock - false if any line exceeds current stock
+    Unlike the default mode an empty cart is not an error (items is []),
+    so the wizard can prefill shipping from the same response. The cart
+    lines also refresh the per-user cart cache.
+    """
+    cache_token = cart_cache.snapshot(user_id)
+    db = get_db()
+    try:
+        with db.cursor() as cur:
+            cur.execute(FULL_REVIEW, (user_id,))
+            rows = cur.fetchall()
+    except Exception:
+        current_app.logger.exception("Error in review_order_full")
+        return jsonify({"error": "Internal server error"}), 500
     finally:
         db.close()
 
+    if not rows:
+        return jsonify({"error": "User profile not found"}), 404
+
+    user = rows[0]
+    # Like the default mode's inner join, skip cart rows whose product no
+    # longer exists (the LEFT JOIN returns NULL product columns for them)
+    lines = [r for r in rows if r["cart_id"] is not None and r["Product_ID"] is not None]
+
+    items = []
+    total_amount = 0
+    for r in lines:
+        price = float(r["Price"])
+        stock = int(r["Stock_Quantity"])
+        items.append({
+            "cart_id": r["cart_id"],
+            "product_id": r["product_id"],
+            "quantity": r["quantity"],
+            "Product_Name": r["Product_Name"],
+            "Price": price,
+            "available": stock,
+            "in_stock": stock >= r["quantity"]
+        })
+        total_amount += price * r["quantity"]
+
+    cart_cache.prime(user_id, [
+        {
+            "cart_id": r["cart_id"], "quantity": r["quantity"],
+            "Product_ID": r["product_id"], "Product_Name": r["Product_Name"],
+            "Price": r["Price"], "image_uri": r["image_uri"]
+        }
+        for r in lines
+    ], cache_token)
+
+    return jsonify({
+        "user_info": {
+            "full_name": user.get("Full_Name") or "",
+            "address": user.get("Address") or "",
+            "contact_number": user.get("Contact_Number") or "",
+            "payment_method": "COD"  # always COD
+        },
+        "items": items,
+        "total_amount": round(total_amount, 2),
+        "all_in_stock": all(item["in_stock"] for item in items)
+    }), 200
+
 
 # ================================
 # STEP 4: PLACE ORDER
@@ -166,6 +261,8 @@ def review_order():
 def place_order():
     """
     Moves items from cart to orders table, clears cart, returns order summary.
+    Thin wrapper around services.checkout.checkout(); send an
+    Idempotency-Key header to make client retries safe.
     Handles CORS preflight OPTIONS request.
     """
     # Handle preflight
@@ -180,68 +277,18 @@ def place_order():
     except:
         return jsonify({"error": "Invalid user identity"}), 400
 
-    db = get_db()
-
     try:
-        # Use DictCursor for safety
-        with db.cursor(MySQLdb.cursors.DictCursor) as cur:
-            # ----------------------
-            # Fetch cart items
-            # ----------------------
-            cur.execute("""
-                SELECT c.cart_id, c.product_id, c.quantity, p.Product_Name, p.Price
-                FROM cart c
-                JOIN products p ON c.product_id = p.Product_ID
-                WHERE c.user_id=%s
-            """, (user_id,))
-            rows = cur.fetchall()
-
-            if not rows:
-                return jsonify({"error": "Cart is empty"}), 400
-
-            total_amount = 0
-            order_items = []
-
-            for r in rows:
-                total_amount += float(r["Price"]) * r["quantity"]
-                order_items.append((user_id, r["product_id"], r["quantity"], r["Price"]))
-
-                    # Insert order
-            cur.execute("""
-                INSERT INTO orders (user_id, total_amount)
-                VALUES (%s, %s)
-            """, (user_id, total_amount))
-            order_id = cur.lastrowid
-            # ----------------------
-            # Insert order details
-            # ----------------------
-            for item in order_items:
-                subtotal = float(item[3]) * item[2]  # Price * Quantity
-                cur.execute("""
-                    INSERT INTO order_details (Order_ID, Product_ID, Quantity, Subtotal)
-                    VALUES (%s, %s, %s, %s)
-                """, (order_id, item[1], item[2], subtotal))
-
-
-            # ----------------------
-            # Clear user's cart
-            # ----------------------
-            cur.execute("DELETE FROM cart WHERE user_id=%s", (user_id,))
-
-        # Commit all changes
-        db.commit()
-
-    except Exception as e:
-        print("Error in place_order:", e)
-        db.rollback()
+        summary, timer = checkout(user_id, request.headers.get("Idempotency-Key"))
+    except CheckoutError as e:
+        return jsonify(e.body), e.status
+    except Exception:
+        current_app.logger.exception("Error in place_order")
         return jsonify({"error": "Internal server error"}), 500
 
-    finally:
-        db.close()
-
-    return jsonify({
-        "Order_ID": order_id,
-        "total_amount": round(total_amount, 2),
+    response = jsonify({
+        **summary,
         "message": "Order placed successfully",
         "payment_method": "COD"
-    }), 200
+    })
+    response.headers["Server-Timing"] = timer.server_timing()
+    return response, 200
@@ -0,0 +1,131 @@
+from flask import Blueprint, request, jsonify
+from config import Config
+from database.connection import get_db
+from services.catalog_sync import sync_catalog
+from services.low_stock import low_stock_monitor
+from utils.authz import ADMIN_ROLE, protect_blueprint
+
+# Create a blueprint for stock alerting / reorder thresholds
+inventory_bp = Blueprint('inventory', __name__)
+protect_blueprint(inventory_bp, ADMIN_ROLE)  # admin only
+
+
+def parse_threshold(data):
+    """
+    Read Reorder_Threshold from a JSON body: a non-negative int, or null to
+    clear the override. Raises ValueError otherwise.
+    """
+    if not isinstance(data, dict) or "Reorder_Threshold" not in data:
+        raise ValueError("Reorder_Threshold is required")
+    value = data["Reorder_Threshold"]
+    if value is None:
+        return None
+    if isinstance(value, bool) or int(value) != value or value < 0:
+        raise ValueError("Reorder_Threshold must be a non-negative integer or null")
+    return int(value)
+
+
+# ============================================================
+# LOW-STOCK ALERTS
+# ============================================================
+@inventory_bp.route('/alerts', methods=['GET'])
+def get_alerts():
+    """
+    Most urgent low-stock products, fewest days of cover first.
+    Query parameters:
+        limit - number of products (default 20, max LOW_STOCK_ALERTS_MAX)
+    Served from the in-process low-stock index (no catalog scan).
+    """
+    limit = request.args.get("limit", 20, type=int)
+    limit = max(1, min(limit, Config.LOW_STOCK_ALERTS_MAX))
+    return jsonify(low_stock_monitor.alerts(limit)), 200
+
+
+# ============================================================
+# REORDER THRESHOLDS
+# ============================================================
+@inventory_bp.route('/thresholds', methods=['GET'])
+def get_thresholds():
+    """
+    Default threshold, per-category thresholds and per-product overrides.
+    """
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute("SELECT Category, Reorder_Threshold FROM category_thresholds ORDER BY Category")
+    categories = cursor.fetchall()
+    cursor.execute("""
+        SELECT Product_ID, Product_Name, Reorder_Threshold
+        FROM products
+        WHERE Reorder_Threshold IS NOT NULL
+        ORDER BY Product_ID
+    """)
+    products = cursor.fetchall()
+    cursor.close()
+    conn.close()
+
+    return jsonify({
+        "default": Config.LOW_STOCK_DEFAULT_THRESHOLD,
+        "categories": {row["Category"]: row["Reorder_Threshold"] for row in categories},
+        "products": products,
+    }), 200
+
+
+@inventory_bp.route('/thresholds/product/<int:product_id>', methods=['PUT'])
+def set_product_threshold(product_id):
+    """
+    Set (or clear with null) a product's own reorder threshold.
+    Expected JSON body: {"Reorder_Threshold": int | null}
+    """
+    try:
+        threshold = parse_threshold(request.get_json(silent=True))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute("SELECT Product_ID FROM products WHERE Product_ID = %s", (product_id,))
+    if not cursor.fetchone():
+        cursor.close()
+        conn.close()
+        return jsonify({"error": "Product not found"}), 404
+
+    cursor.execute(
+        "UPDATE products SET Reorder_Threshold = %s WHERE Product_ID = %s",
+        (threshold, product_id)
+    )
+    conn.commit()
+    sync_catalog(cursor, product_id)
+    cursor.close()
+    conn.close()
+
+    return jsonify({"message": "Threshold updated", "Reorder_Threshold": threshold}), 200
+
+
+@inventory_bp.route('/thresholds/category/<path:category>', methods=['PUT'])
+def set_category_threshold(category):
+    """
+    Set (or clear with null) the reorder threshold for every product in a
+    category that has no threshold of its own.
+    Expected JSON body: {"Reorder_Threshold": int | null}
+    """
+    try:
+        threshold = parse_threshold(request.get_json(silent=True))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_db()
+    cursor = conn.cursor()
+    if threshold is None:
+        cursor.execute("DELETE FROM category_thresholds WHERE Category = %s", (category,))
+    else:
+        cursor.execute("""
+            INSERT INTO category_thresholds (Category, Reorder_Threshold)
+            VALUES (%s, %s) AS new
+            ON DUPLICATE KEY UPDATE Reorder_Threshold = new.Reorder_Threshold
+        """, (category, threshold))
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+    low_stock_monitor.set_category_threshold(category, threshold)
+    return jsonify({"message": "Threshold updated", "Category": category, "Reorder_Threshold": threshold}), 200
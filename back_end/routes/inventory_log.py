@@ -1,33 +1,126 @@
+from datetime import date, datetime, timedelta
+
 from flask import Blueprint, request, jsonify
+from config import Config
 from database.connection import get_db  # your MySQL connection file
+from services.inventory_archive import monthly_summary
+from services.inventory_log_writer import inventory_log_writer
+from utils.pagination import encode_cursor, decode_cursor
+from utils.authz import ADMIN_ROLE, protect_blueprint
 
 inventory_log_bp = Blueprint('inventory_log', __name__)
+protect_blueprint(inventory_log_bp, ADMIN_ROLE)  # admin only
 
 # ================= HELPER FUNCTION =================
-# Allows products.py to log inventory changes directly
-def log_inventory_change(Product_ID, Quantity_Changed, Remarks=None):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO inventory_log (Product_ID, Log_Date, Quantity_Changed, Remarks)
-        VALUES (%s, NOW(), %s, %s)
-    """, (Product_ID, Quantity_Changed, Remarks))
-    conn.commit()
-    cursor.close()
-    conn.close()
+# Allows products.py to log inventory changes directly. Events are queued
+# and written in batches by the background inventory log writer; sync=True
+# writes the row before returning.
+def log_inventory_change(Product_ID, Quantity_Changed, Remarks=None, sync=False):
+    inventory_log_writer.log(Product_ID, Quantity_Changed, Remarks, sync=sync)
 
 # ============================================================
 # GET ALL INVENTORY LOGS
 # ============================================================
 @inventory_log_bp.route('/', methods=['GET'])
 def get_all_inventory_logs():
+    """
+    List inventory log entries newest first, one page at a time.
+
+    Query parameters:
+        product_id         - only entries for this product
+        date_from, date_to - Log_Date range (YYYY-MM-DD or ISO datetime, inclusive)
+        limit              - page size (default INVENTORY_LOG_PAGE_SIZE, capped at INVENTORY_LOG_PAGE_MAX)
+        cursor             - X-Next-Cursor value from the previous page
+    Served by the (Product_ID, Log_Date) and (Log_Date) indexes. Entries
+    older than the retention window live in GET /inventory_log/summary.
+    """
+    limit = request.args.get("limit", Config.INVENTORY_LOG_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, Config.INVENTORY_LOG_PAGE_MAX))
+    where, params = [], []
+    try:
+        product_id = request.args.get("product_id", type=int)
+        if product_id is not None:
+            where.append("Product_ID = %s")
+            params.append(product_id)
+
+        date_from = request.args.get("date_from")
+        if date_from:
+            where.append("Log_Date >= %s")
+            params.append(datetime.fromisoformat(date_from))
+
+        date_to = request.args.get("date_to")
+        if date_to:
+            if len(date_to) == 10:  # bare date: include the whole day
+                where.append("Log_Date < %s")
+                params.append(datetime.fromisoformat(date_to) + timedelta(days=1))
+            else:
+                where.append("Log_Date <= %s")
+                params.append(datetime.fromisoformat(date_to))
+
+        after = request.args.get("cursor")
+        if after:
+            last_date, last_id = decode_cursor(after, "log_date_desc")
+            where.append("(Log_Date < %s OR (Log_Date = %s AND Log_ID < %s))")
+            params += [last_date, last_date, last_id]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    sql = "SELECT * FROM inventory_log"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    # Fetch one extra row to learn whether another page exists
+    sql += " ORDER BY Log_Date DESC, Log_ID DESC LIMIT %s"
+
     conn = get_db()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM inventory_log")
+    cursor.execute(sql, params + [limit + 1])
     rows = cursor.fetchall()
     cursor.close()
     conn.close()
-    return jsonify(rows), 200
+
+    response = jsonify(rows[:limit])
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        response.headers["X-Next-Cursor"] = encode_cursor("log_date_desc", [last["Log_Date"], last["Log_ID"]])
+    return response, 200
+
+# ============================================================
+# MONTHLY NET-CHANGE SUMMARY
+# ============================================================
+@inventory_log_bp.route('/summary', methods=['GET'])
+def get_inventory_log_summary():
+    """
+    Per-product monthly net change, covering both compacted history and
+    the current hot table.
+
+    Query parameters:
+        product_id           - only this product
+        month_from, month_to - YYYY-MM range (inclusive)
+    """
+    try:
+        product_id = request.args.get("product_id", type=int)
+        month_from = request.args.get("month_from")
+        month_from = date.fromisoformat(month_from + "-01") if month_from else None
+        month_to = request.args.get("month_to")
+        month_to = date.fromisoformat(month_to + "-01") if month_to else None
+    except ValueError:
+        return jsonify({"error": "Months must be YYYY-MM"}), 400
+
+    conn = get_db()
+    cursor = conn.cursor()
+    rows = monthly_summary(cursor, product_id, month_from, month_to)
+    cursor.close()
+    conn.close()
+
+    return jsonify([
+        {
+            "Product_ID": r["Product_ID"],
+            "Month": r["Month"].strftime("%Y-%m"),
+            "Net_Change": int(r["Net_Change"]),
+            "Entries": int(r["Entries"]),
+        }
+        for r in rows
+    ]), 200
 
 # ============================================================
 # GET ONE INVENTORY LOG BY ID
@@ -96,9 +189,9 @@ def update_inventory_log(log_id):
         conn.close()
         return jsonify({"error": "Inventory log not found"}), 404
 
-    Product_ID = data.get("Product_ID", log[1])  # assuming Log_ID is at index 0
-    Quantity_Changed = data.get("Quantity_Changed", log[2])
-    Remarks = data.get("Remarks", log[3] if len(log) > 3 else None)
+    Product_ID = data.get("Product_ID", log["Product_ID"])
+    Quantity_Changed = data.get("Quantity_Changed", log["Quantity_Changed"])
+    Remarks = data.get("Remarks", log.get("Remarks"))
 
     cursor.execute("""
         UPDATE inventory_log
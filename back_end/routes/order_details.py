@@ -1,8 +1,10 @@
 from flask import Blueprint, request, jsonify
 from database.connection import get_db  # Import MySQL connection function
+from utils.authz import ADMIN_ROLE, protect_blueprint
 
 # Create a blueprint for order_details routes
 order_details_bp = Blueprint('order_details', __name__)
+protect_blueprint(order_details_bp, ADMIN_ROLE)  # admin only
 
 # ============================================================
 # GET ALL ORDER DETAILS
@@ -1,9 +1,122 @@
 from flask import Blueprint, request, jsonify
 from database.connection import get_db   # Import the get_db() function to connect to MySQL
-from datetime import datetime
+from datetime import datetime, timedelta
+from decimal import Decimal
+from config import Config
+from services.sales_rollup import add_order, counts_in_rollups, remove_order
+from utils.pagination import encode_cursor, decode_cursor
+from utils.authz import ADMIN_ROLE, is_self_or_admin, protect_blueprint, roles_required
 
 # Create a blueprint for orders routes
 orders_bp = Blueprint('orders', __name__)
+protect_blueprint(orders_bp, ADMIN_ROLE)  # admin only, except the per-user history below
+
+# ============================================================
+# KEYSET PAGINATION HELPERS
+# ============================================================
+# sort name -> (column, direction). Order_ID breaks ties so the
+# (column, Order_ID) key is unique and pages never overlap or skip rows.
+# MySQL sorts NULL as the lowest value (first ASC, last DESC, matching the
+# index order); the keyset predicate mirrors that, and a cursor stores a
+# NULL sort value as JSON null.
+ORDER_SORTS = {
+    "date_desc": ("Order_Date", "DESC"),
+    "date_asc": ("Order_Date", "ASC"),
+    "total_desc": ("Total_Amount", "DESC"),
+    "total_asc": ("Total_Amount", "ASC"),
+}
+
+
+def fetch_orders_page(cursor, where, params, sort, limit, after=None):
+    """
+    Return (rows, next_cursor) for one page of orders matching `where`
+    (a list of SQL conditions with %s placeholders bound from `params`).
+
+    Pages are fetched with a keyset predicate on (sort column, Order_ID)
+    instead of OFFSET, so every page costs the same however deep it is.
+    Raises ValueError for a bad cursor.
+    """
+    column, direction = ORDER_SORTS[sort]
+    where, params = list(where), list(params)
+
+    if after:
+        value, last_id = decode_cursor(after, sort)
+        op = "<" if direction == "DESC" else ">"
+        if value is None:
+            # Inside the NULL group; ASC still has every non-NULL row ahead
+            rest = f" OR {column} IS NOT NULL" if direction == "ASC" else ""
+            where.append(f"(({column} IS NULL AND Order_ID {op} %s){rest})")
+            params += [last_id]
+        else:
+            # DESC reaches the NULL group after every non-NULL value
+            rest = f" OR {column} IS NULL" if direction == "DESC" else ""
+            where.append(f"({column} {op} %s OR ({column} = %s AND Order_ID {op} %s){rest})")
+            params += [value, value, last_id]
+
+    sql = "SELECT * FROM orders"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    # Fetch one extra row to learn whether another page exists
+    sql += f" ORDER BY {column} {direction}, Order_ID {direction} LIMIT %s"
+    cursor.execute(sql, params + [limit + 1])
+    rows = cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, [last[column], last["Order_ID"]])
+    return rows, next_cursor
+
+
+ORDER_LINES = """
+    SELECT od.OrderDetail_ID, od.Order_ID, od.Product_ID, od.Quantity, od.Subtotal,
+           p.Product_Name
+    FROM order_details od
+    LEFT JOIN products p ON p.Product_ID = od.Product_ID
+    WHERE od.Order_ID IN ({})
+    ORDER BY od.Order_ID, od.OrderDetail_ID
+"""
+
+
+def attach_lines(cursor, orders):
+    """
+    Add an "items" list (order_details rows + Product_Name) to every order.
+    All lines are loaded with ONE IN (...) query and grouped here, so a page
+    of orders costs two queries however many orders it holds.
+    """
+    by_id = {}
+    for order in orders:
+        order["items"] = []
+        by_id[order["Order_ID"]] = order
+    if not by_id:
+        return orders
+
+    cursor.execute(ORDER_LINES.format(", ".join(["%s"] * len(by_id))), list(by_id))
+    for line in cursor.fetchall():
+        by_id[line["Order_ID"]]["items"].append(line)
+    return orders
+
+
+def wants_lines():
+    """
+    ?include=lines asks an order endpoint to embed each order's line items.
+    """
+    return request.args.get("include") == "lines"
+
+
+def page_args():
+    """
+    Read the ?limit=, ?cursor= and ?sort= arguments shared by the order
+    listings. Raises ValueError for an unknown sort.
+    """
+    limit = request.args.get("limit", Config.ORDERS_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, Config.ORDERS_PAGE_MAX))
+    sort = request.args.get("sort", "date_desc")
+    if sort not in ORDER_SORTS:
+        raise ValueError(f"Unknown sort: {sort}")
+    return limit, request.args.get("cursor"), sort
+
 
 # ============================================================
 # GET ALL ORDERS
@@ -11,20 +124,78 @@ orders_bp = Blueprint('orders', __name__)
 @orders_bp.route('/', methods=['GET'])
 def get_all_orders():
     """
-    Fetch all orders from the database.
-    Returns:
-        JSON list of all orders
+    List orders one page at a time (newest first by default).
+
+    Query parameters:
+        status             - only orders with this Order_Status
+        user_id            - only orders placed by this user
+        date_from, date_to - Order_Date range (YYYY-MM-DD or ISO datetime, inclusive)
+        sort               - date_desc (default), date_asc, total_desc, total_asc
+        limit              - page size (default ORDERS_PAGE_SIZE, capped at ORDERS_PAGE_MAX)
+        cursor             - X-Next-Cursor value from the previous page
+        include            - "lines" embeds each order's items (see attach_lines)
+    Response headers:
+        X-Total-Count - number of matching orders (first page only)
+        X-Next-Cursor - cursor for the next page (absent on the last page)
+    Status and user filters are served by the (Order_Status, Order_Date)
+    and (User_ID, Order_Date) indexes.
     """
+    where, params = [], []
+    try:
+        limit, after, sort = page_args()
+
+        status = request.args.get("status")
+        if status:
+            where.append("Order_Status = %s")
+            params.append(status)
+
+        user_id = request.args.get("user_id", type=int)
+        if user_id is not None:
+            where.append("User_ID = %s")
+            params.append(user_id)
+
+        date_from = request.args.get("date_from")
+        if date_from:
+            where.append("Order_Date >= %s")
+            params.append(datetime.fromisoformat(date_from))
+
+        date_to = request.args.get("date_to")
+        if date_to:
+            if len(date_to) == 10:  # bare date: include the whole day
+                where.append("Order_Date < %s")
+                params.append(datetime.fromisoformat(date_to) + timedelta(days=1))
+            else:
+                where.append("Order_Date <= %s")
+                params.append(datetime.fromisoformat(date_to))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     conn = get_db()
     cursor = conn.cursor()
+    try:
+        orders, next_cursor = fetch_orders_page(cursor, where, params, sort, limit, after)
+        if wants_lines():
+            attach_lines(cursor, orders)
+
+        total = None
+        if not after:
+            sql = "SELECT COUNT(*) AS total FROM orders"
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            cursor.execute(sql, params)
+            total = cursor.fetchone()["total"]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
 
-    cursor.execute("SELECT * FROM orders")
-    orders = cursor.fetchall()
-
-    cursor.close()
-    conn.close()
-
-    return jsonify(orders), 200
+    response = jsonify(orders)
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
 
 
 # ============================================================
@@ -37,6 +208,8 @@ def get_order(order_id):
     
     Parameters:
         order_id (int): ID of the order
+    Query parameters:
+        include - "lines" embeds the order's items with product names
     Returns:
         JSON object of the order or 404 if not found
     """
@@ -45,6 +218,8 @@ def get_order(order_id):
 
     cursor.execute("SELECT * FROM orders WHERE Order_ID = %s", (order_id,))
     order = cursor.fetchone()
+    if order and wants_lines():
+        attach_lines(cursor, [order])
 
     cursor.close()
     conn.close()
@@ -111,11 +286,13 @@ def update_order(order_id):
     conn = get_db()
     cursor = conn.cursor()
 
-    # Check if order exists
-    cursor.execute("SELECT * FROM orders WHERE Order_ID = %s", (order_id,))
+    # Check if order exists (locked, so concurrent edits adjust the sales
+    # rollups one after the other)
+    cursor.execute("SELECT * FROM orders WHERE Order_ID = %s FOR UPDATE", (order_id,))
     order = cursor.fetchone()
 
     if not order:
+        conn.rollback()
         cursor.close()
         conn.close()
         return jsonify({"error": "Order not found"}), 404
@@ -128,10 +305,19 @@ def update_order(order_id):
     # Validate status
     VALID_STATUSES = ["Pending", "Processing", "Shipped", "Completed", "Cancelled"]
     if Order_Status not in VALID_STATUSES:
+        conn.rollback()
         cursor.close()
         conn.close()
         return jsonify({"error": "Invalid order status"}), 400
 
+    # Cancelling / un-cancelling or re-pricing changes what the order adds
+    # to the sales rollups: take the old figures out, put the new ones in
+    was_counted = counts_in_rollups(order["Order_Status"])
+    now_counted = counts_in_rollups(Order_Status)
+    rollup_changed = was_counted != now_counted or (
+        now_counted and _amount(Total_Amount) != _amount(order["Total_Amount"])
+    )
+
     # Update order
     sql = """
         UPDATE orders
@@ -140,15 +326,30 @@ def update_order(order_id):
             Order_Status = %s
         WHERE Order_ID = %s
     """
-    cursor.execute(sql, (User_ID, Total_Amount, Order_Status, order_id))
-    conn.commit()
-
-    cursor.close()
-    conn.close()
+    try:
+        if rollup_changed and was_counted:
+            remove_order(cursor, order)
+        cursor.execute(sql, (User_ID, Total_Amount, Order_Status, order_id))
+        if rollup_changed and now_counted:
+            add_order(cursor, {**order, "Total_Amount": _amount(Total_Amount)})
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
 
     return jsonify({"message": "Order updated successfully"}), 200
 
 
+def _amount(value):
+    """
+    Total_Amount as a cents Decimal (requests send floats, MySQL returns Decimal).
+    """
+    return None if value is None else Decimal(str(value)).quantize(Decimal("0.01"))
+
+
 # ============================================================
 # DELETE ORDER
 # ============================================================
@@ -163,20 +364,28 @@ def delete_order(order_id):
     cursor = conn.cursor()
 
     # Check if the order exists
-    cursor.execute("SELECT * FROM orders WHERE Order_ID = %s", (order_id,))
+    cursor.execute("SELECT * FROM orders WHERE Order_ID = %s FOR UPDATE", (order_id,))
     order = cursor.fetchone()
 
     if not order:
+        conn.rollback()
         cursor.close()
         conn.close()
         return jsonify({"error": "Order not found"}), 404
 
-    # Delete the order
-    cursor.execute("DELETE FROM orders WHERE Order_ID = %s", (order_id,))
-    conn.commit()
-
-    cursor.close()
-    conn.close()
+    # Delete the order, taking it out of the sales rollups first (while its
+    # lines can still be read)
+    try:
+        if counts_in_rollups(order["Order_Status"]):
+            remove_order(cursor, order)
+        cursor.execute("DELETE FROM orders WHERE Order_ID = %s", (order_id,))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
 
     return jsonify({"message": "Order deleted successfully"}), 200
 
@@ -185,22 +394,41 @@ def delete_order(order_id):
 # GET ALL ORDERS OF A SPECIFIC USER
 # ============================================================
 @orders_bp.route('/user/<int:user_id>', methods=['GET'])
+@roles_required()
 def get_orders_by_user(user_id):
     """
-    Fetch all orders belonging to a specific user.
+    Fetch the orders belonging to a specific user, newest first, one page
+    at a time (?limit=, ?cursor=, ?sort= as for GET /orders/).
+    ?include=lines embeds each order's items, so an order history page
+    needs no per-order detail requests.
+    Customers may only read their own orders; admins may read anyone's.
     Returns:
-        JSON list of orders
+        JSON list of orders plus next_cursor (null on the last page)
     """
-    conn = get_db()
-    cursor = conn.cursor()
+    if not is_self_or_admin(user_id):
+        return jsonify({"error": "Forbidden: not your orders"}), 403
 
-    cursor.execute("SELECT * FROM orders WHERE User_ID = %s", (user_id,))
-    orders = cursor.fetchall()
+    try:
+        limit, after, sort = page_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    cursor.close()
-    conn.close()
+    conn = get_db()
+    cursor = conn.cursor()
+    try:
+        orders, next_cursor = fetch_orders_page(
+            cursor, ["User_ID = %s"], [user_id], sort, limit, after
+        )
+        if wants_lines():
+            attach_lines(cursor, orders)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
 
     return jsonify({
         "status": "success",
-        "orders": orders
+        "orders": orders,
+        "next_cursor": next_cursor
     }), 200
@@ -1,42 +1,113 @@
-from flask import Blueprint, Flask, request, jsonify
+import csv
+import io
+import json
+from flask import Blueprint, Flask, Response, request, jsonify, stream_with_context
 from config import Config
-import mysql.connector
+from database.connection import get_db, streaming_cursor
 from routes.inventory_log import log_inventory_change  # Updated helper without Change_Type
+from services.catalog_facets import catalog_facets
+from services.catalog_import import import_products
+from services.catalog_search import catalog_index, tokenize
+from services.catalog_sync import get_product_count, product_cache, sync_catalog, sync_catalog_bulk
+from utils.authz import ADMIN_ROLE, protect_blueprint, public
 
 app = Flask(__name__)
 products_bp = Blueprint("products", __name__)
+protect_blueprint(products_bp, ADMIN_ROLE)  # catalog writes; storefront reads are @public
 
-# ================= Database connection helper =================
-def get_db_connection():
-    conn = mysql.connector.connect(
-        host=Config.DB_HOST,
-        user=Config.DB_USER,
-        password=Config.DB_PASSWORD,
-        database=Config.DB_NAME,
-        allow_local_infile=True
-    )
-    return conn
+# Columns a client may request through ?fields=
+PRODUCT_FIELDS = (
+    "Product_ID", "Product_Name", "Category", "Description",
+    "Author_Brand", "Price", "Stock_Quantity", "image_uri", "Reorder_Threshold"
+)
 
 # ================= GET all products =================
 @products_bp.route("/", methods=["GET"])
+@public
 def get_products():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM products")
-    products = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return jsonify(products), 200
+    """
+    List products using keyset pagination on Product_ID.
+
+    Query parameters:
+        limit  - page size (default PRODUCTS_PAGE_SIZE, capped at PRODUCTS_PAGE_MAX)
+        after  - return products with Product_ID greater than this cursor
+        fields - comma-separated column projection, e.g. fields=Product_Name,Price
+        all    - "true" returns the whole catalog unpaginated (legacy behaviour)
+    Response headers:
+        X-Total-Count - total number of products (cached)
+        X-Next-Cursor - value to pass as ?after= for the next page (absent on the last page)
+    Pages are served from the product cache.
+    """
+    fields = request.args.get("fields")
+    if fields:
+        columns = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [c for c in columns if c not in PRODUCT_FIELDS]
+        if unknown:
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+        # The cursor column must always be present
+        if "Product_ID" not in columns:
+            columns.insert(0, "Product_ID")
+        select_list = ", ".join(columns)
+    else:
+        select_list = "*"
+
+    if request.args.get("all", "").lower() in ("1", "true", "yes"):
+        def load_all():
+            conn = get_db()
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {select_list} FROM products ORDER BY Product_ID")
+            rows = cursor.fetchall()
+            cursor.close()
+            conn.close()
+            return rows
+
+        products = product_cache.get_or_load(("list", select_list, None, None), load_all)
+        return jsonify(products), 200
+
+    limit = request.args.get("limit", Config.PRODUCTS_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, Config.PRODUCTS_PAGE_MAX))
+    after = request.args.get("after", 0, type=int)
+
+    def load_page():
+        conn = get_db()
+        cursor = conn.cursor()
+        # Fetch one extra row to learn whether another page exists
+        cursor.execute(
+            f"SELECT {select_list} FROM products WHERE Product_ID > %s ORDER BY Product_ID LIMIT %s",
+            (after, limit + 1)
+        )
+        rows = cursor.fetchall()
+        total = get_product_count(cursor)
+        cursor.close()
+        conn.close()
+
+        next_cursor = rows[limit - 1]["Product_ID"] if len(rows) > limit else None
+        return rows[:limit], total, next_cursor
+
+    products, total, next_cursor = product_cache.get_or_load(
+        ("list", select_list, after, limit), load_page
+    )
+
+    response = jsonify(products)
+    response.headers["X-Total-Count"] = str(total)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return response, 200
 
 # ================= GET single product =================
 @products_bp.route("/<int:id>", methods=["GET"])
+@public
 def get_product(id):
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM products WHERE Product_ID=%s", (id,))
-    product = cursor.fetchone()
-    cursor.close()
-    conn.close()
+    def load():
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM products WHERE Product_ID=%s", (id,))
+        row = cursor.fetchone()
+        cursor.close()
+        conn.close()
+        return row
+
+    product = product_cache.get_or_load(("product", id), load)
     if product:
         return jsonify(product), 200
     return jsonify({"message": "Product not found"}), 404
@@ -49,7 +120,7 @@ def create_product():
         data = [data]
 
     inserted_products = []
-    conn = get_db_connection()
+    conn = get_db()
     cursor = conn.cursor()
     query = """
     INSERT INTO products 
@@ -70,6 +141,7 @@ def create_product():
         conn.commit()
         new_id = cursor.lastrowid
         inserted_products.append({"Product_ID": new_id, **item})
+        sync_catalog(cursor, new_id)
 
         # --- Inventory logging: initial stock ---
         if stock_qty > 0:
@@ -79,14 +151,134 @@ def create_product():
     conn.close()
     return jsonify({"inserted": inserted_products}), 201
 
+# ================= BULK IMPORT products =================
+@products_bp.route("/bulk", methods=["POST"])
+def bulk_import_products():
+    """
+    Import a large JSON list of products.
+
+    Rows are inserted in chunks of BULK_IMPORT_CHUNK: one multi-row INSERT,
+    one batched inventory_log INSERT and one COMMIT per chunk. Invalid rows
+    are reported in "errors" (by 0-based position) without aborting the rest.
+    """
+    data = request.get_json()
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        return jsonify({"error": "Expected a JSON list of products"}), 400
+
+    conn = get_db()
+    result = import_products(conn, data)
+    conn.close()
+
+    if result["inserted_count"]:
+        sync_catalog_bulk()
+
+    status = 201 if result["inserted_count"] or not data else 400
+    return jsonify(result), status
+
+# ================= STREAMING IMPORT (CSV / JSONL) =================
+@products_bp.route("/import", methods=["POST"])
+def stream_import_products():
+    """
+    Import products from a CSV or JSON Lines request body.
+
+    The body is read row by row from the request stream (never buffered whole)
+    and fed to the chunked bulk importer. Format comes from ?format=csv|jsonl,
+    falling back to the Content-Type (text/csv or application/x-ndjson).
+    CSV files need a header row using the product column names.
+    """
+    fmt = _stream_format()
+    if fmt is None:
+        return jsonify({"error": "Unsupported format, use csv or jsonl"}), 415
+
+    text = io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline="")
+    rows = csv.DictReader(text) if fmt == "csv" else _jsonl_rows(text)
+
+    conn = get_db()
+    result = import_products(conn, rows, collect=False)
+    conn.close()
+
+    if result["inserted_count"]:
+        sync_catalog_bulk()
+
+    return jsonify(result), 201 if result["inserted_count"] else 400
+
+def _stream_format():
+    fmt = (request.args.get("format") or "").lower()
+    if not fmt:
+        mimetype = request.mimetype or ""
+        if mimetype in ("text/csv", "application/csv"):
+            fmt = "csv"
+        elif mimetype in ("application/x-ndjson", "application/jsonl", "application/x-jsonlines"):
+            fmt = "jsonl"
+    return fmt if fmt in ("csv", "jsonl") else None
+
+def _jsonl_rows(text):
+    for line in text:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line  # rejected by the importer and reported as a row error
+
+# ================= STREAMING EXPORT (CSV / JSONL) =================
+@products_bp.route("/export", methods=["GET"])
+def export_products():
+    """
+    Stream the whole catalog as CSV (default) or JSON Lines (?format=jsonl).
+
+    Rows come from a server-side cursor in batches of EXPORT_FETCH_SIZE and
+    are written to the response as they arrive, so memory use stays flat no
+    matter how large the catalog is.
+    """
+    fmt = (request.args.get("format") or "csv").lower()
+    if fmt not in ("csv", "jsonl"):
+        return jsonify({"error": "Unsupported format, use csv or jsonl"}), 415
+
+    def generate():
+        conn = get_db()
+        cursor = streaming_cursor(conn)
+        try:
+            cursor.execute(f"SELECT {', '.join(PRODUCT_FIELDS)} FROM products ORDER BY Product_ID")
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=PRODUCT_FIELDS)
+            if fmt == "csv":
+                writer.writeheader()
+
+            while True:
+                rows = cursor.fetchmany(Config.EXPORT_FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    if fmt == "csv":
+                        writer.writerow(row)
+                    else:
+                        buffer.write(json.dumps(row, default=str) + "\n")
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        finally:
+            cursor.close()
+            conn.close()
+
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=products.{fmt}"}
+    )
+
 # ================= UPDATE product =================
 @products_bp.route("/<int:id>", methods=["PUT"])
 def update_product(id):
     data = request.get_json()
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    conn = get_db()
+    cursor = conn.cursor()
 
-    cursor.execute("SELECT Stock_Quantity FROM products WHERE Product_ID=%s", (id,))
+    cursor.execute("SELECT Stock_Quantity, Category, Price FROM products WHERE Product_ID=%s", (id,))
     product = cursor.fetchone()
     if not product:
         cursor.close()
@@ -120,6 +312,7 @@ def update_product(id):
         id
     ))
     conn.commit()
+    sync_catalog(cursor, id, old_row=product)
     cursor.close()
     conn.close()
 
@@ -132,10 +325,10 @@ def update_product(id):
 # ================= DELETE product =================
 @products_bp.route("/<int:id>", methods=["DELETE"])
 def delete_product(id):
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    conn = get_db()
+    cursor = conn.cursor()
 
-    cursor.execute("SELECT Stock_Quantity FROM products WHERE Product_ID=%s", (id,))
+    cursor.execute("SELECT Stock_Quantity, Category, Price FROM products WHERE Product_ID=%s", (id,))
     product = cursor.fetchone()
     if not product:
         cursor.close()
@@ -145,11 +338,13 @@ def delete_product(id):
     stock_qty = int(product["Stock_Quantity"])
 
     # --- Inventory logging: product deleted ---
+    # Written synchronously: the row must exist before its product is removed
     if stock_qty > 0:
-        log_inventory_change(id, stock_qty, "Product deleted")
+        log_inventory_change(id, stock_qty, "Product deleted", sync=True)
 
     cursor.execute("DELETE FROM products WHERE Product_ID=%s", (id,))
     conn.commit()
+    sync_catalog(cursor, id, old_row=product)
     cursor.close()
     conn.close()
 
@@ -157,34 +352,47 @@ def delete_product(id):
 
 # ================= GET product filters =================
 @products_bp.route("/filters", methods=["GET"])
+@public
 def get_product_filters():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-
-    cursor.execute("SELECT DISTINCT Category FROM products")
-    categories = [row["Category"] for row in cursor.fetchall()]
-
-    cursor.execute("SELECT MIN(Price) AS min_price, MAX(Price) AS max_price FROM products")
-    price_row = cursor.fetchone()
-    min_price = float(price_row["min_price"]) if price_row["min_price"] is not None else 0
-    max_price = float(price_row["max_price"]) if price_row["max_price"] is not None else 0
-
-    cursor.close()
-    conn.close()
-
-    return jsonify({
-        "categories": categories,
-        "min_price": min_price,
-        "max_price": max_price
-    }), 200
+    """
+    Facet summary for the storefront filter panel:
+        categories      - list of category names
+        category_counts - {category: number of products}
+        min_price / max_price
+        price_histogram - [{"min", "max", "count"}] in PRICE_BUCKET_WIDTH steps
+    Maintained incrementally by the product write handlers, so this never scans.
+    """
+    return jsonify(catalog_facets.summary()), 200
 
 # ================= FILTER products =================
 @products_bp.route("/filter", methods=["GET"])
+@public
 def filter_products():
-    category = request.args.get("category")
+    """
+    Filter products by category and price range, with optional full-text search.
+
+    When `search` is given the request is answered from the in-process
+    catalog index: results are ranked by relevance over Product_Name,
+    Author_Brand and Description, and the last word matches as a prefix
+    (type-ahead). Without `search` the filters run as plain SQL.
+    Results are cached per normalized query.
+    """
+    category = request.args.get("category") or None
     min_price = request.args.get("min_price", type=float)
     max_price = request.args.get("max_price", type=float)
-    search = request.args.get("search")
+    # "Harry  Potter!" and "harry potter" are the same query
+    search = " ".join(tokenize(request.args.get("search"))) or None
+
+    key = ("filter", category, min_price, max_price, search)
+    products = product_cache.get_or_load(
+        key, lambda: _run_filter(category, min_price, max_price, search)
+    )
+    return jsonify(products), 200
+
+def _run_filter(category, min_price, max_price, search):
+    if search:
+        return catalog_index.search(search, category=category,
+                                    min_price=min_price, max_price=max_price)
 
     query = "SELECT * FROM products WHERE 1=1"
     params = []
@@ -201,19 +409,14 @@ def filter_products():
         query += " AND Price <= %s"
         params.append(max_price)
 
-    if search:
-        search = f"%{search}%"
-        query += " AND Product_Name LIKE %s"
-        params.append(search)
-
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    conn = get_db()
+    cursor = conn.cursor()
     cursor.execute(query, tuple(params))
     products = cursor.fetchall()
     cursor.close()
     conn.close()
 
-    return jsonify(products), 200
+    return products
 
 # ================= REGISTER BLUEPRINT =================
 app.register_blueprint(products_bp, url_prefix="/products")
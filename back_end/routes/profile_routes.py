@@ -1,7 +1,8 @@
 from flask import Flask, Blueprint, jsonify, request, send_from_directory
-from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity
+from flask_jwt_extended import JWTManager, jwt_required, get_jwt, get_jwt_identity
 from flask_cors import CORS
-import MySQLdb
+from database.connection import get_db
+from services.auth import invalidate_user, reissue_tokens, token_profile
 import os
 
 app = Flask(__name__)
@@ -19,19 +20,6 @@ CORS(app, origins="http://localhost:4200")
 if not os.path.exists("uploads"):
     os.makedirs("uploads")
 
-# --------------------------- Database connection ---------------------------
-def get_db_connection():
-    """
-    Connect to the MySQL database and return the connection object.
-    """
-    return MySQLdb.connect(
-        host="localhost",
-        user="root",
-        passwd="",
-        db="librotrackdb",
-        charset="utf8mb4"
-    )
-
 profile = Blueprint("profile", __name__)
 
 # ------------------------------------------------------------------------
@@ -42,12 +30,28 @@ profile = Blueprint("profile", __name__)
 def get_profile():
     """
     Get the profile information of the logged-in user.
-    JWT is used to get user_id.
+    JWT is used to get user_id; the profile fields are read from the token's
+    profile claim when it carries them (no query), else from Users.
     Returns:
         JSON object with user profile data or 404 if user not found.
     """
     user_id = get_jwt_identity()
-    db = get_db_connection()
+    claims = token_profile("Username", "Full_Name", "Email", "Contact_Number", "Address", "Image_URL")
+    if claims:
+        return jsonify({
+            "user": {
+                "User_ID": int(user_id),
+                "Username": claims["Username"],
+                "Full_Name": claims["Full_Name"],
+                "Email": claims["Email"],
+                "Role": get_jwt().get("role"),
+                "Contact_Number": claims["Contact_Number"],
+                "Address": claims["Address"],
+                "image": claims["Image_URL"]
+            }
+        })
+
+    db = get_db()
     cursor = db.cursor()
     cursor.execute("""
         SELECT User_ID, Username, Full_Name, Email, Role, Contact_Number, Address, Image_URL
@@ -60,14 +64,14 @@ def get_profile():
     if row:
         return jsonify({
             "user": {
-                "User_ID": row[0],
-                "Username": row[1],
-                "Full_Name": row[2],
-                "Email": row[3],
-                "Role": row[4],
-                "Contact_Number": row[5],
-                "Address": row[6],
-                "image": row[7]
+                "User_ID": row["User_ID"],
+                "Username": row["Username"],
+                "Full_Name": row["Full_Name"],
+                "Email": row["Email"],
+                "Role": row["Role"],
+                "Contact_Number": row["Contact_Number"],
+                "Address": row["Address"],
+                "image": row["Image_URL"]
             }
         })
 
@@ -87,9 +91,10 @@ def edit_profile():
     Steps:
         1. Check if an image file is uploaded and save it to UPLOAD_FOLDER
         2. If no new image, keep the old image
-        3. Update the Users table in MySQL
+        3. Update the Users table in MySQL and bump Profile_Version
     Returns:
-        JSON message with updated image URL
+        JSON message with updated image URL and a fresh token / refresh_token
+        pair (older refresh tokens are refused from now on)
     """
     if request.method == "OPTIONS":
         return '', 200
@@ -118,19 +123,22 @@ def edit_profile():
         image_url = request.form.get("Current_Image")
 
     # --------------------------- Update database ---------------------------
-    db = get_db_connection()
+    db = get_db()
     cursor = db.cursor()
     cursor.execute("""
         UPDATE Users
-        SET Full_Name=%s, Username=%s, Contact_Number=%s, Address=%s, Image_URL=%s
+        SET Full_Name=%s, Username=%s, Contact_Number=%s, Address=%s, Image_URL=%s,
+            Profile_Version = Profile_Version + 1
         WHERE User_ID=%s
     """, (full_name, username, contact, address, image_url, user_id))
 
     db.commit()
+    invalidate_user(user_id)
+    tokens = reissue_tokens(cursor, user_id) or {}
     cursor.close()
     db.close()
 
-    return jsonify({"message": "Profile updated successfully", "image_url": image_url}), 200
+    return jsonify({"message": "Profile updated successfully", "image_url": image_url, **tokens}), 200
 
 
 if __name__ == "__main__":
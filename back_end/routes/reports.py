@@ -0,0 +1,190 @@
+from datetime import date, timedelta
+
+from flask import Blueprint, request, jsonify
+from database.connection import get_db
+from utils.authz import ADMIN_ROLE, protect_blueprint
+
+# Create a blueprint for sales reports
+reports_bp = Blueprint('reports', __name__)
+protect_blueprint(reports_bp, ADMIN_ROLE)  # admin only
+
+# Every report reads the sales rollup tables (services/sales_rollup.py),
+# never orders / order_details, so its cost depends on the date range
+# requested, not on how much order history exists.
+
+# period -> SQL expression that maps Sale_Date to the start of its bucket
+PERIODS = {
+    "day": "Sale_Date",
+    "week": "DATE_SUB(Sale_Date, INTERVAL WEEKDAY(Sale_Date) DAY)",  # Monday
+    "month": "DATE_FORMAT(Sale_Date, '%%Y-%%m-01')",  # %% survives parameter binding
+}
+
+DEFAULT_REPORT_DAYS = 30
+MAX_REPORT_LIMIT = 100
+
+
+def date_range():
+    """
+    Read ?date_from= / ?date_to= (YYYY-MM-DD, inclusive), defaulting to the
+    last DEFAULT_REPORT_DAYS days. Raises ValueError for bad dates.
+    """
+    date_to = request.args.get("date_to")
+    date_to = date.fromisoformat(date_to) if date_to else date.today()
+    date_from = request.args.get("date_from")
+    date_from = date.fromisoformat(date_from) if date_from else date_to - timedelta(days=DEFAULT_REPORT_DAYS - 1)
+    return date_from, date_to
+
+
+def report_limit(default):
+    limit = request.args.get("limit", default, type=int)
+    return max(1, min(limit, MAX_REPORT_LIMIT))
+
+
+def run_report(sql, params):
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return rows
+
+
+# ============================================================
+# REVENUE BY DAY / WEEK / MONTH
+# ============================================================
+@reports_bp.route('/revenue', methods=['GET'])
+def revenue():
+    """
+    Orders, units and revenue per period.
+    Query parameters:
+        period             - day (default), week or month
+        date_from, date_to - inclusive range (default: last 30 days)
+    """
+    period = request.args.get("period", "day")
+    if period not in PERIODS:
+        return jsonify({"error": "period must be day, week or month"}), 400
+    try:
+        date_from, date_to = date_range()
+    except ValueError:
+        return jsonify({"error": "Dates must be YYYY-MM-DD"}), 400
+
+    bucket = PERIODS[period]
+    rows = run_report(f"""
+        SELECT {bucket} AS period_start,
+               SUM(Orders) AS orders, SUM(Units) AS units, SUM(Revenue) AS revenue
+        FROM sales_daily
+        WHERE Sale_Date BETWEEN %s AND %s
+        GROUP BY period_start
+        ORDER BY period_start
+    """, (date_from, date_to))
+
+    return jsonify({
+        "period": period,
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+        "rows": [
+            {
+                "period_start": str(r["period_start"]),
+                "orders": int(r["orders"]),
+                "units": int(r["units"]),
+                "revenue": float(r["revenue"]),
+            }
+            for r in rows
+        ],
+    }), 200
+
+
+# ============================================================
+# UNITS / REVENUE PER PRODUCT
+# ============================================================
+@reports_bp.route('/products', methods=['GET'])
+def product_sales():
+    """
+    Units sold and revenue per product over a date range, best first.
+    Query parameters:
+        date_from, date_to - inclusive range (default: last 30 days)
+        sort               - revenue (default) or units
+        limit              - max products returned (default 50, max 100)
+    """
+    sort = request.args.get("sort", "revenue")
+    if sort not in ("revenue", "units"):
+        return jsonify({"error": "sort must be revenue or units"}), 400
+    try:
+        date_from, date_to = date_range()
+    except ValueError:
+        return jsonify({"error": "Dates must be YYYY-MM-DD"}), 400
+
+    rows = run_report(f"""
+        SELECT s.Product_ID, p.Product_Name, MAX(s.Category) AS Category,
+               SUM(s.Units) AS units, SUM(s.Revenue) AS revenue
+        FROM product_sales_daily s
+        LEFT JOIN products p ON p.Product_ID = s.Product_ID
+        WHERE s.Sale_Date BETWEEN %s AND %s
+        GROUP BY s.Product_ID, p.Product_Name
+        ORDER BY {sort} DESC, s.Product_ID
+        LIMIT %s
+    """, (date_from, date_to, report_limit(50)))
+
+    return jsonify([
+        {**r, "units": int(r["units"]), "revenue": float(r["revenue"])} for r in rows
+    ]), 200
+
+
+# ============================================================
+# UNITS / REVENUE PER CATEGORY
+# ============================================================
+@reports_bp.route('/categories', methods=['GET'])
+def category_sales():
+    """
+    Units sold and revenue per category over a date range.
+    Query parameters:
+        date_from, date_to - inclusive range (default: last 30 days)
+    """
+    try:
+        date_from, date_to = date_range()
+    except ValueError:
+        return jsonify({"error": "Dates must be YYYY-MM-DD"}), 400
+
+    rows = run_report("""
+        SELECT Category, SUM(Units) AS units, SUM(Revenue) AS revenue
+        FROM product_sales_daily
+        WHERE Sale_Date BETWEEN %s AND %s
+        GROUP BY Category
+        ORDER BY revenue DESC
+    """, (date_from, date_to))
+
+    return jsonify([
+        {"Category": r["Category"], "units": int(r["units"]), "revenue": float(r["revenue"])}
+        for r in rows
+    ]), 200
+
+
+# ============================================================
+# TOP SELLERS
+# ============================================================
+@reports_bp.route('/top_sellers', methods=['GET'])
+def top_sellers():
+    """
+    Best-selling products by units over the last N days.
+    Query parameters:
+        days  - window size (default 30)
+        limit - number of products (default 10, max 100)
+    """
+    days = max(1, request.args.get("days", DEFAULT_REPORT_DAYS, type=int))
+    since = date.today() - timedelta(days=days - 1)
+
+    rows = run_report("""
+        SELECT s.Product_ID, p.Product_Name,
+               SUM(s.Units) AS units, SUM(s.Revenue) AS revenue
+        FROM product_sales_daily s
+        LEFT JOIN products p ON p.Product_ID = s.Product_ID
+        WHERE s.Sale_Date >= %s
+        GROUP BY s.Product_ID, p.Product_Name
+        ORDER BY units DESC, s.Product_ID
+        LIMIT %s
+    """, (since, report_limit(10)))
+
+    return jsonify([
+        {**r, "units": int(r["units"]), "revenue": float(r["revenue"])} for r in rows
+    ]), 200
@@ -1,11 +1,10 @@
-import MySQLdb
 from flask import Blueprint, request, jsonify
 from flask_cors import CORS, cross_origin
 from database.connection import get_db  # MySQL connection helper
-from flask_bcrypt import Bcrypt
+from services.auth import forget_email, hash_new_password
+from utils.hash import HasherSaturated
 
 user = Blueprint("user", __name__)
-bcrypt = Bcrypt()  # Initialize Bcrypt for password hashing
 
 # ------------------------------------------------------------------------
 # REGISTER USER
@@ -24,7 +23,7 @@ def register():
     Steps:
         1. Handle CORS preflight OPTIONS request
         2. Get data from JSON request
-        3. Hash the password using bcrypt
+        3. Hash the password using bcrypt (in the hashing pool; 429 when saturated)
         4. Insert user data into the Users table
         5. Return success message
     """
@@ -42,11 +41,16 @@ def register():
     address = data.get("address")
 
     # --------------------------- Hash the password ---------------------------
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+    if not password:
+        return jsonify({"success": False, "message": "Password is required"}), 400
+    try:
+        hashed_password = hash_new_password(password)
+    except HasherSaturated:
+        return jsonify({"success": False, "message": "Server busy, please retry"}), 429, {"Retry-After": "1"}
 
     # --------------------------- Insert user into database ---------------------------
     conn = get_db()
-    cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+    cursor = conn.cursor()
 
     cursor.execute("""
         INSERT INTO Users (Full_Name, Email, Username, Password, Contact_Number, Address)
@@ -56,6 +60,7 @@ def register():
     conn.commit()
     cursor.close()
     conn.close()
+    forget_email(email)  # drop a cached "User not found" for this email
 
     # --------------------------- Return success response ---------------------------
     return jsonify({"success": True, "message": "User registered successfully"}), 201
@@ -1,28 +1,21 @@
 from flask import Blueprint, Flask, jsonify, request
 from flask_cors import CORS
-import mysql.connector
-from config import Config  # make sure this imports your DB settings
+from database.connection import get_db
+from services.auth import invalidate_user
+from utils.authz import ADMIN_ROLE, protect_blueprint
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
 users_bp = Blueprint("users", __name__)
+protect_blueprint(users_bp, ADMIN_ROLE)  # admin only
 CORS(users_bp)  # Enable CORS for this blueprint too (optional)
 
-# ================= Database Connection Helper =================
-def get_db_connection():
-    return mysql.connector.connect(
-        host=Config.DB_HOST,
-        user=Config.DB_USER,
-        password=Config.DB_PASSWORD,
-        database=Config.DB_NAME
-    )
-
 # ================= GET ALL USERS =================
 @users_bp.route('/', methods=['GET'])
 def get_all_users():
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor() 
         query = """
             SELECT 
@@ -52,7 +45,7 @@ def get_all_users():
 @users_bp.route('/<int:user_id>', methods=['DELETE'])
 def delete_user(user_id):
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
         query = "DELETE FROM users WHERE User_ID = %s"
@@ -65,6 +58,8 @@ def delete_user(user_id):
         if cursor.rowcount == 0:
             return jsonify({"status": "error", "message": "User not found"}), 404
 
+        invalidate_user(user_id)
+
         return jsonify({"status": "success", "message": f"User {user_id} deleted"}), 200
 
     except Exception as e:
@@ -0,0 +1,229 @@
+import csv
+import json
+import os
+
+import numpy as np
+
+from config import Config
+from database.connection import get_db, streaming_cursor
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet output is optional; CSV always works
+    pyarrow = None
+
+# ================= ORDER HISTORY ANALYTICS =================
+# Month-end aggregates over the full orders / order_details history.
+#
+# Both tables are streamed from a server-side cursor in chunks of
+# ANALYTICS_CHUNK_SIZE rows straight into NumPy structured arrays (one
+# fixed-width record per row, no per-row dicts). Every aggregate below is
+# then a handful of vectorized np.unique / np.bincount passes. Money is
+# carried as integer cents so totals reconcile exactly.
+#
+# NumPy is only needed by the `flask export-analytics` command, which
+# imports this module lazily (services/analytics_cli.py); the web app
+# never loads it.
+
+LINE_DTYPE = np.dtype([
+    ("Order_ID", "i8"),
+    ("Product_ID", "i8"),
+    ("Month", "i8"),            # YYYYMM of the order date
+    ("Quantity", "i8"),
+    ("Subtotal_Cents", "i8"),
+])
+
+ORDER_DTYPE = np.dtype([
+    ("Order_ID", "i8"),
+    ("User_ID", "i8"),
+    ("Month", "i8"),
+    ("Total_Cents", "i8"),
+])
+
+LINES_SQL = """
+    SELECT od.Order_ID, COALESCE(od.Product_ID, 0),
+           COALESCE(YEAR(o.Order_Date) * 100 + MONTH(o.Order_Date), 0),
+           od.Quantity, CAST(ROUND(od.Subtotal * 100) AS SIGNED)
+    FROM order_details od
+    JOIN orders o ON o.Order_ID = od.Order_ID
+"""
+
+ORDERS_SQL = """
+    SELECT Order_ID, COALESCE(User_ID, 0),
+           COALESCE(YEAR(Order_Date) * 100 + MONTH(Order_Date), 0),
+           CAST(ROUND(COALESCE(Total_Amount, 0) * 100) AS SIGNED)
+    FROM orders
+"""
+
+# Multiplier for packing (id, YYYYMM) pairs into one int64 group key
+_MONTH_SPAN = 1_000_000
+
+# User_ID of orders whose user is unknown (NULL); counted in order and
+# revenue totals but not as a customer
+NO_USER = 0
+
+
+# ----------------- loading -----------------
+def stream_array(conn, sql, dtype, chunk_size=None):
+    """
+    Run `sql` on a server-side tuple cursor and collect the rows into one
+    structured array, converting chunk_size rows at a time.
+    """
+    chunk_size = chunk_size or Config.ANALYTICS_CHUNK_SIZE
+    cursor = streaming_cursor(conn, dict_rows=False)
+    chunks = []
+    try:
+        cursor.execute(sql)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            chunks.append(np.array(rows, dtype=dtype))
+    finally:
+        cursor.close()
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+
+
+def month_labels(months):
+    """
+    YYYYMM ints -> "YYYY-MM" strings (formatted once per distinct month).
+    """
+    distinct, inverse = np.unique(months, return_inverse=True)
+    labels = np.array([f"{m // 100:04d}-{m % 100:02d}" for m in distinct.tolist()])
+    return labels[inverse]
+
+
+# ----------------- aggregates -----------------
+def revenue_by_product_month(lines):
+    """
+    Units, order lines and revenue per (product, month).
+    """
+    keys, inverse = np.unique(lines["Product_ID"] * _MONTH_SPAN + lines["Month"], return_inverse=True)
+    return {
+        "Product_ID": keys // _MONTH_SPAN,
+        "Month": month_labels(keys % _MONTH_SPAN),
+        "Order_Lines": np.bincount(inverse, minlength=len(keys)),
+        "Units": np.bincount(inverse, weights=lines["Quantity"], minlength=len(keys)).astype(np.int64),
+        "Revenue": np.bincount(inverse, weights=lines["Subtotal_Cents"], minlength=len(keys)) / 100,
+    }
+
+
+def units_per_order(orders, lines):
+    """
+    Units on each order (aligned with `orders`); lines whose order is
+    missing from `orders` are ignored.
+    """
+    order_sort = np.argsort(orders["Order_ID"], kind="stable")
+    sorted_ids = orders["Order_ID"][order_sort]
+    pos = np.searchsorted(sorted_ids, lines["Order_ID"])
+    pos = np.minimum(pos, max(len(sorted_ids) - 1, 0))
+    found = (sorted_ids[pos] == lines["Order_ID"]) if len(sorted_ids) else np.zeros(len(lines), bool)
+    return np.bincount(order_sort[pos[found]], weights=lines["Quantity"][found], minlength=len(orders))
+
+
+def orders_by_month(orders, lines):
+    """
+    Per month: orders, revenue, average basket (value and units), distinct
+    customers, returning customers (first order in an earlier month) and
+    the repeat-customer rate.
+    """
+    months, inverse = np.unique(orders["Month"], return_inverse=True)
+    n_orders = np.bincount(inverse, minlength=len(months))
+    revenue_cents = np.bincount(inverse, weights=orders["Total_Cents"], minlength=len(months))
+    units = np.bincount(inverse, weights=units_per_order(orders, lines), minlength=len(months))
+
+    # Each customer's first month, then every distinct (customer, month) pair
+    known = orders[orders["User_ID"] != NO_USER]
+    users, user_inverse = np.unique(known["User_ID"], return_inverse=True)
+    first_month = np.full(len(users), np.iinfo(np.int64).max)
+    np.minimum.at(first_month, user_inverse, known["Month"])
+
+    pairs = np.unique(known["User_ID"] * _MONTH_SPAN + known["Month"])
+    pair_users, pair_months = pairs // _MONTH_SPAN, pairs % _MONTH_SPAN
+    pair_slot = np.searchsorted(months, pair_months)
+    returning = pair_months > first_month[np.searchsorted(users, pair_users)]
+
+    customers = np.bincount(pair_slot, minlength=len(months))
+    returning_customers = np.bincount(pair_slot, weights=returning, minlength=len(months)).astype(np.int64)
+    safe_orders = np.maximum(n_orders, 1)
+    return {
+        "Month": month_labels(months),
+        "Orders": n_orders,
+        "Revenue": revenue_cents / 100,
+        "Avg_Basket_Value": np.round(revenue_cents / safe_orders / 100, 2),
+        "Avg_Basket_Units": np.round(units / safe_orders, 3),
+        "Customers": customers,
+        "Returning_Customers": returning_customers,
+        "Repeat_Rate": np.round(returning_customers / np.maximum(customers, 1), 4),
+    }
+
+
+def history_summary(orders, lines):
+    """
+    Whole-history totals, average basket and repeat-customer rate
+    (share of customers with two or more orders).
+    """
+    n_orders = len(orders)
+    known_users = orders["User_ID"][orders["User_ID"] != NO_USER]
+    _, orders_per_user = np.unique(known_users, return_counts=True)
+    customers = len(orders_per_user)
+    repeat = int(np.count_nonzero(orders_per_user >= 2))
+    revenue_cents = int(orders["Total_Cents"].sum())
+    return {
+        "orders": n_orders,
+        "order_lines": len(lines),
+        "revenue": revenue_cents / 100,
+        "avg_basket_value": round(revenue_cents / n_orders / 100, 2) if n_orders else 0.0,
+        "avg_basket_units": round(int(lines["Quantity"].sum()) / n_orders, 3) if n_orders else 0.0,
+        "customers": customers,
+        "repeat_customers": repeat,
+        "repeat_customer_rate": round(repeat / customers, 4) if customers else 0.0,
+    }
+
+
+# ----------------- output -----------------
+def write_table(path_base, table, fmt="csv"):
+    """
+    Write a {column: array} table as Parquet (when pyarrow is installed and
+    fmt == "parquet") or CSV. Returns the path written.
+    """
+    if fmt == "parquet" and pyarrow is not None:
+        path = path_base + ".parquet"
+        pyarrow.parquet.write_table(pyarrow.table({k: np.asarray(v) for k, v in table.items()}), path)
+        return path
+
+    path = path_base + ".csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(table.keys())
+        writer.writerows(zip(*(np.asarray(v).tolist() for v in table.values())))
+    return path
+
+
+def export_analytics(out_dir=None, fmt="csv", chunk_size=None):
+    """
+    Load both tables, compute every aggregate and write them to out_dir.
+    Returns (paths written, whole-history summary).
+    """
+    out_dir = out_dir or Config.ANALYTICS_OUTPUT_DIR
+    os.makedirs(out_dir, exist_ok=True)
+
+    conn = get_db()
+    try:
+        orders = stream_array(conn, ORDERS_SQL, ORDER_DTYPE, chunk_size)
+        lines = stream_array(conn, LINES_SQL, LINE_DTYPE, chunk_size)
+    finally:
+        conn.close()
+
+    paths = [
+        write_table(os.path.join(out_dir, "revenue_by_product_month"), revenue_by_product_month(lines), fmt),
+        write_table(os.path.join(out_dir, "orders_by_month"), orders_by_month(orders, lines), fmt),
+    ]
+    summary = history_summary(orders, lines)
+    summary_path = os.path.join(out_dir, "summary.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    paths.append(summary_path)
+    return paths, summary
+
@@ -0,0 +1,26 @@
+import json
+
+import click
+
+# ================= ANALYTICS EXPORT COMMAND =================
+# Registers `flask export-analytics` without importing services.analytics
+# (and with it NumPy) until the command actually runs, so the web app
+# starts without the analytics dependencies installed.
+
+
+def init_app(app):
+    """
+    Register the `flask export-analytics` command.
+    """
+    @app.cli.command("export-analytics")
+    @click.option("--out", "out_dir", default=None, help="Output directory (default ANALYTICS_OUTPUT_DIR).")
+    @click.option("--format", "fmt", type=click.Choice(["csv", "parquet"]), default="csv",
+                  help="Parquet needs pyarrow; falls back to CSV without it.")
+    def export_analytics_command(out_dir, fmt):
+        """Write order-history aggregates for month-end reconciliation."""
+        from services.analytics import export_analytics
+
+        paths, summary = export_analytics(out_dir, fmt)
+        for path in paths:
+            print("wrote", path)
+        print(json.dumps(summary, indent=2))
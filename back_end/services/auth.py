@@ -0,0 +1,226 @@
+from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt
+
+from config import Config
+from database.connection import get_db
+from utils.cache import TTLCache
+from utils.hash import HasherSaturated, hasher
+from utils.rate_limit import TokenBucketLimiter
+from utils import metrics
+
+# ================= AUTH SERVICE =================
+# Credential checks for /auth/login and password hashing for registration,
+# all through the one process-pool hasher (utils.hash.hasher).
+#
+#   - Login rows (User_ID, Email, Password, Role) are cached by email for
+#     AUTH_USER_CACHE_TTL seconds, including "no such user", so repeated
+#     attempts do not turn into repeated Users lookups. Call
+#     invalidate_user() / forget_email() whenever those columns change.
+#   - Failed attempts spend tokens from per-email and per-IP buckets. An
+#     empty bucket is rejected with 429 before any DB or bcrypt work, so
+#     credential stuffing cannot buy CPU time.
+#   - Access tokens carry the user's role, Profile_Version ("ver") and the
+#     JWT_PROFILE_CLAIMS columns ("profile"), so read-mostly endpoints and
+#     authorization (utils/authz.py) answer from the token with no DB
+#     access at all. They live JWT_ACCESS_TOKEN_MINUTES, which bounds how
+#     long another session can keep using claims from before a profile
+#     edit or role change.
+#   - Refresh tokens carry only "ver". POST /auth/refresh reads the user
+#     row (one query per user per access-token lifetime) and refuses a
+#     token stamped with an older Profile_Version, so a profile edit
+#     retires every other session's refresh token. The editing client gets
+#     a fresh pair straight away.
+
+TOKEN_COLUMNS = ["User_ID", "Email", "Role", "Profile_Version"] + [
+    column for column in Config.JWT_PROFILE_CLAIMS
+    if column not in ("User_ID", "Email", "Role", "Profile_Version")
+]
+
+USER_LOOKUP = "SELECT Password, " + ", ".join(TOKEN_COLUMNS) + " FROM Users WHERE Email = %s"
+TOKEN_ROW = "SELECT " + ", ".join(TOKEN_COLUMNS) + " FROM Users WHERE User_ID = %s"
+
+user_cache = TTLCache(maxsize=Config.AUTH_USER_CACHE_SIZE, ttl=Config.AUTH_USER_CACHE_TTL)
+email_limiter = TokenBucketLimiter(Config.LOGIN_EMAIL_BURST, Config.LOGIN_EMAIL_REFILL_SECONDS)
+ip_limiter = TokenBucketLimiter(Config.LOGIN_IP_BURST, Config.LOGIN_IP_REFILL_SECONDS)
+
+metrics.register("auth_user_cache", user_cache.stats)
+metrics.register("login_rate_limit", lambda: {
+    "email": email_limiter.stats(),
+    "ip": ip_limiter.stats(),
+})
+
+
+class AuthError(Exception):
+    """
+    A failed login; carries the HTTP status and optional response headers.
+    """
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+def _email_key(email):
+    return (email or "").strip().lower()
+
+
+def find_user(email):
+    """
+    Login row for `email` (or None), served from the user cache.
+    """
+    def load():
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute(USER_LOOKUP, (email,))
+        row = cursor.fetchone()
+        cursor.close()
+        conn.close()
+        return row
+
+    return user_cache.get_or_load(_email_key(email), load)
+
+
+def _record_failure(email_key, ip):
+    email_limiter.consume(email_key)
+    ip_limiter.consume(ip)
+
+
+def authenticate(email, password, ip):
+    """
+    Return the login row for a valid email / password pair. Raises
+    AuthError(429) when rate-limited or the hasher is saturated, 404 for an
+    unknown email and 401 for a wrong password.
+    """
+    email_key = _email_key(email)
+    if not email_limiter.allow(email_key) or not ip_limiter.allow(ip):
+        retry = max(email_limiter.retry_after(email_key), ip_limiter.retry_after(ip), 1)
+        raise AuthError(429, "Too many failed login attempts, try again later",
+                        {"Retry-After": str(retry)})
+
+    user = find_user(email)
+    if not user:
+        _record_failure(email_key, ip)
+        raise AuthError(404, "User not found")
+
+    try:
+        valid = hasher.check(user["Password"], password)
+    except HasherSaturated:
+        raise AuthError(429, "Too many login attempts, please retry", {"Retry-After": "1"})
+    if not valid:
+        _record_failure(email_key, ip)
+        raise AuthError(401, "Incorrect password")
+
+    email_limiter.reset(email_key)
+    _maybe_rehash(user, password)
+    return user
+
+
+def _maybe_rehash(user, password):
+    """
+    Upgrade a hash made with another BCRYPT_LOG_ROUNDS cost (skipped when
+    the pool is busy; it will happen on a later login).
+    """
+    if not hasher.needs_rehash(user["Password"]) or not hasher.try_reserve():
+        return
+    try:
+        rehashed = hasher.hash(password)
+    except HasherSaturated:
+        return
+
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE Users SET Password = %s WHERE User_ID = %s", (rehashed, user["User_ID"]))
+    conn.commit()
+    cursor.close()
+    conn.close()
+    invalidate_user(user["User_ID"])
+
+
+def hash_new_password(password):
+    """
+    Hash a password for storage. Raises HasherSaturated when the pool is full.
+    """
+    return hasher.hash(password)
+
+
+def invalidate_user(user_id):
+    """
+    Drop the cached login row of a user whose profile or password changed
+    (or who was deleted).
+    """
+    user_id = int(user_id)
+    user_cache.invalidate_where(lambda _, row: row is not None and row["User_ID"] == user_id)
+
+
+def forget_email(email):
+    """
+    Drop a cached lookup for `email` (e.g. a cached "no such user" once
+    that email registers).
+    """
+    user_cache.invalidate(_email_key(email))
+
+
+# ================= ACCESS TOKENS =================
+def issue_token(user):
+    """
+    Access token for a TOKEN_COLUMNS row (e.g. the one authenticate() returns).
+    """
+    return create_access_token(
+        identity=str(user["User_ID"]),
+        additional_claims={
+            "role": user["Role"],
+            "ver": user["Profile_Version"],
+            "profile": {column: user[column] for column in Config.JWT_PROFILE_CLAIMS},
+        },
+    )
+
+
+def issue_tokens(user):
+    """
+    Access + refresh token pair for a TOKEN_COLUMNS row.
+    """
+    return {
+        "token": issue_token(user),
+        "refresh_token": create_refresh_token(
+            identity=str(user["User_ID"]),
+            additional_claims={"ver": user["Profile_Version"]},
+        ),
+    }
+
+
+def reissue_tokens(cursor, user_id):
+    """
+    Fresh token pair after a profile change (None if the user is gone).
+    """
+    cursor.execute(TOKEN_ROW, (user_id,))
+    user = cursor.fetchone()
+    return issue_tokens(user) if user else None
+
+
+def refresh_access_token(user_id, version):
+    """
+    New access token for a refresh token stamped with `version`, or None if
+    the user is gone or has changed their profile since it was issued.
+    """
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute(TOKEN_ROW, (user_id,))
+    user = cursor.fetchone()
+    cursor.close()
+    conn.close()
+    if not user or user["Profile_Version"] != version:
+        return None
+    return issue_token(user)
+
+
+def token_profile(*columns):
+    """
+    The current token's "profile" claim if it carries every one of
+    `columns`, else None (older token or column not in JWT_PROFILE_CLAIMS;
+    callers then fall back to a Users query).
+    """
+    profile = get_jwt().get("profile")
+    if not profile or any(column not in profile for column in columns):
+        return None
+    return profile
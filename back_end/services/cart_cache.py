@@ -0,0 +1,182 @@
+import threading
+
+from config import Config
+from database.connection import get_db
+from utils.cache import TTLCache
+from utils import metrics
+
+# ================= PER-USER CART CACHE =================
+# Keyed by the JWT identity (as a string). Each entry is the GET /cart/
+# payload: {"items": [...], "cart_total": float}. Entries are treated as
+# immutable; write-through helpers build a new payload and replace it
+# while holding that user's lock, so concurrent writes cannot lose updates.
+#
+# Reads that fill the cache from the database (get_cart_view, prime) take a
+# snapshot() of the generation counters before their query and only store
+# the result if no write bumped them meanwhile; otherwise a GET that read
+# the cart just before a write committed could cache the old cart after the
+# write-through had already run.
+
+CART_ITEMS = """
+    SELECT
+        c.cart_id, c.quantity,
+        p.Product_ID, p.Product_Name, p.Price, p.image_uri
+    FROM cart c
+    JOIN products p ON c.product_id = p.Product_ID
+    WHERE c.user_id = %s
+"""
+
+cart_cache = TTLCache(maxsize=Config.CART_CACHE_SIZE, ttl=Config.CART_CACHE_TTL)
+metrics.register("cart_cache", cart_cache.stats)
+
+_LOCK_STRIPES = 64
+_locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+_generations = [0] * _LOCK_STRIPES  # bumped under the matching lock
+_catalog_generation = 0             # bumped by invalidate_product()
+_catalog_lock = threading.Lock()
+
+
+def _stripe(key):
+    return hash(key) % _LOCK_STRIPES
+
+
+def _lock_for(key):
+    return _locks[_stripe(key)]
+
+
+def _bump(key):
+    """
+    Record a cart write for `key`; call while holding _lock_for(key).
+    """
+    _generations[_stripe(key)] += 1
+
+
+def snapshot(user_id):
+    """
+    Generation token to take before reading a cart from the database.
+    """
+    return _generations[_stripe(str(user_id))], _catalog_generation
+
+
+def _store_if_current(key, token, view):
+    """
+    Cache `view` unless a write to this cart (or an invalidated product)
+    happened since `token` was taken. Stripes are shared, so a write to
+    another user's cart can skip a fill too; that only costs a cache miss.
+    """
+    with _lock_for(key):
+        if (_generations[_stripe(key)], _catalog_generation) == token:
+            cart_cache.set(key, view)
+
+
+def _build(items):
+    """
+    Compute item totals + cart total for a list of cart rows.
+    """
+    cart_total = 0
+    lines = []
+    for item in items:
+        price = float(item["Price"])
+        qty = int(item["quantity"])
+        lines.append({**item, "total_price": round(price * qty, 2)})
+        cart_total += price * qty
+    return {"items": lines, "cart_total": round(cart_total, 2)}
+
+
+def prime(user_id, items, token):
+    """
+    Store a cart that was already read as part of another query
+    (rows shaped like CART_ITEMS); `token` is the snapshot() taken
+    before that query ran.
+    """
+    _store_if_current(str(user_id), token, _build(items))
+
+
+def get_cart_view(user_id):
+    """
+    Return the user's cart lines and totals, from cache when possible.
+    """
+    key = str(user_id)
+    view = cart_cache.get(key)
+    if view is not None:
+        return view
+
+    token = snapshot(user_id)
+    db = get_db()
+    cur = db.cursor()
+    cur.execute(CART_ITEMS, (user_id,))
+    items = cur.fetchall()
+    cur.close()
+    db.close()
+
+    view = _build(items)
+    _store_if_current(key, token, view)
+    return view
+
+
+# ----------------- write-through -----------------
+def _rewrite(user_id, change):
+    """
+    Apply change(items) -> new items list to the cached cart, if cached.
+    If change returns None the entry is dropped instead (it cannot be
+    patched without going back to the database).
+    """
+    key = str(user_id)
+    with _lock_for(key):
+        _bump(key)
+        cached = cart_cache.get(key)
+        if cached is None:
+            return
+        items = change([dict(item) for item in cached["items"]])
+        if items is None:
+            cart_cache.invalidate(key)
+        else:
+            cart_cache.set(key, _build(items))
+
+
+def line_added(user_id, product_id, quantity):
+    """
+    POST /cart/add succeeded. Bump the cached line if it is there; a brand
+    new line needs product details, so the entry is dropped instead.
+    """
+    def change(items):
+        for item in items:
+            if item["Product_ID"] == product_id:
+                item["quantity"] = int(item["quantity"]) + quantity
+                return items
+        return None
+    _rewrite(user_id, change)
+
+
+def line_updated(user_id, cart_id, quantity):
+    def change(items):
+        for item in items:
+            if item["cart_id"] == cart_id:
+                item["quantity"] = quantity
+                return items
+        return None
+    _rewrite(user_id, change)
+
+
+def line_removed(user_id, cart_id):
+    _rewrite(user_id, lambda items: [item for item in items if item["cart_id"] != cart_id])
+
+
+def invalidate_cart(user_id):
+    key = str(user_id)
+    with _lock_for(key):
+        _bump(key)
+        cart_cache.invalidate(key)
+
+
+def invalidate_product(product_id):
+    """
+    A product's price / name / image changed or it was deleted: drop every
+    cached cart that contains it.
+    """
+    global _catalog_generation
+    with _catalog_lock:
+        _catalog_generation += 1
+    cart_cache.invalidate_where(
+        lambda _, cart: any(item["Product_ID"] == product_id for item in cart["items"])
+    )
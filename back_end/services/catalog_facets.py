@@ -0,0 +1,126 @@
+import bisect
+import threading
+import time
+from collections import Counter
+
+from config import Config
+from database.connection import get_db
+
+
+class CatalogFacets:
+    """
+    Facet summary for the storefront filter panel, maintained incrementally.
+
+    Holds per-category product counts, the overall price range and a
+    fixed-width price histogram. Product writes call apply(old_row, new_row)
+    so the summary never needs a table scan on the request path; a full
+    reload happens lazily on first use and every FACETS_REFRESH seconds to
+    reconcile writes made by other worker processes.
+    """
+
+    def __init__(self, bucket_width):
+        self.bucket_width = bucket_width
+        self._lock = threading.Lock()
+        self._category_counts = Counter()
+        self._bucket_counts = Counter()
+        self._prices = []        # sorted prices, so min / max are O(1)
+        self._summary = None     # cached response, rebuilt after each change
+        self._built_at = None
+
+    # ----------------- maintenance -----------------
+    def ensure_built(self):
+        built_at = self._built_at
+        if built_at is not None and time.monotonic() - built_at < Config.FACETS_REFRESH:
+            return
+
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute("SELECT Category, Price FROM products")
+        rows = cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+        with self._lock:
+            self._category_counts.clear()
+            self._bucket_counts.clear()
+            self._prices = []
+            for row in rows:
+                self._add(row)
+            self._summary = None
+            self._built_at = time.monotonic()
+
+    def mark_stale(self):
+        """
+        Force a full reload on next use (e.g. after a bulk import).
+        """
+        self._built_at = None
+
+    def apply(self, old_row=None, new_row=None):
+        """
+        Account for one product write: old_row is the product before the
+        write (None for inserts), new_row after it (None for deletes). Only
+        Category and Price are read.
+        """
+        if self._built_at is None:
+            return  # nothing loaded yet; the first read will scan anyway
+
+        with self._lock:
+            if old_row is not None:
+                self._remove(old_row)
+            if new_row is not None:
+                self._add(new_row)
+            self._summary = None
+
+    def _add(self, row):
+        price = _price(row)
+        self._category_counts[row["Category"]] += 1
+        self._bucket_counts[self._bucket(price)] += 1
+        bisect.insort(self._prices, price)
+
+    def _remove(self, row):
+        price = _price(row)
+        _decrement(self._category_counts, row["Category"])
+        _decrement(self._bucket_counts, self._bucket(price))
+        i = bisect.bisect_left(self._prices, price)
+        if i < len(self._prices) and self._prices[i] == price:
+            del self._prices[i]
+
+    def _bucket(self, price):
+        return int(price // self.bucket_width)
+
+    # ----------------- queries -----------------
+    def summary(self):
+        """
+        Return the facet summary (served from memory once built).
+        """
+        self.ensure_built()
+        with self._lock:
+            if self._summary is None:
+                self._summary = {
+                    "categories": sorted(c for c in self._category_counts if c is not None),
+                    "category_counts": {c: n for c, n in self._category_counts.items() if c is not None},
+                    "min_price": self._prices[0] if self._prices else 0,
+                    "max_price": self._prices[-1] if self._prices else 0,
+                    "price_histogram": [
+                        {
+                            "min": bucket * self.bucket_width,
+                            "max": (bucket + 1) * self.bucket_width,
+                            "count": count,
+                        }
+                        for bucket, count in sorted(self._bucket_counts.items())
+                    ],
+                }
+            return self._summary
+
+
+def _price(row):
+    return float(row["Price"]) if row.get("Price") is not None else 0.0
+
+
+def _decrement(counter, key):
+    counter[key] -= 1
+    if counter[key] <= 0:
+        del counter[key]
+
+
+catalog_facets = CatalogFacets(bucket_width=Config.PRICE_BUCKET_WIDTH)
@@ -0,0 +1,167 @@
+import uuid
+
+from config import Config
+from database.connection import Error as DBError, insert_many
+
+# Insertable product columns, in INSERT order
+PRODUCT_COLUMNS = (
+    "Product_Name", "Category", "Description", "Author_Brand",
+    "Price", "Stock_Quantity", "image_uri"
+)
+
+# Chunk INSERTs also tag their rows so the generated ids can be read back
+CHUNK_COLUMNS = PRODUCT_COLUMNS + ("Import_Token",)
+
+INSERT_PRODUCT = """
+    INSERT INTO products
+    (Product_Name, Category, Description, Author_Brand, Price, Stock_Quantity, image_uri)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+INSERT_LOG = """
+    INSERT INTO inventory_log (Product_ID, Log_Date, Quantity_Changed, Remarks)
+    VALUES (%s, NOW(), %s, %s)
+"""
+
+
+def normalize_product(item):
+    """
+    Validate one incoming product and return its INSERT parameters.
+    Raises ValueError with a readable message for bad rows.
+    """
+    if not isinstance(item, dict):
+        raise ValueError("Row must be an object")
+    if not (item.get("Product_Name") or "").strip():
+        raise ValueError("Product_Name is required")
+
+    try:
+        price = float(item.get("Price") or 0)
+        stock = int(item.get("Stock_Quantity") or 0)
+    except (TypeError, ValueError):
+        raise ValueError("Price and Stock_Quantity must be numbers")
+    if price < 0 or stock < 0:
+        raise ValueError("Price and Stock_Quantity cannot be negative")
+
+    return (
+        item.get("Product_Name").strip(),
+        item.get("Category"),
+        item.get("Description"),
+        item.get("Author_Brand"),
+        price,
+        stock,
+        item.get("image_uri") or None,
+    )
+
+
+def import_products(conn, rows, chunk_size=None, collect=True):
+    """
+    Bulk-insert products from any iterable of dicts.
+
+    Rows are validated, then written in chunks of `chunk_size`: each chunk is
+    one multi-row INSERT, one batched inventory_log INSERT for the initial
+    stock, and one COMMIT. If a chunk is rejected by MySQL it is rolled back and retried
+    row by row so a single bad row cannot sink its neighbours.
+
+    Returns {"inserted_count", "inserted" (when collect=True), "errors"} where
+    each error is {"row": <0-based index in the input>, "error": <message>}.
+    """
+    chunk_size = chunk_size or Config.BULK_IMPORT_CHUNK
+    result = {"inserted_count": 0, "inserted": [], "errors": []}
+    chunk = []  # [(input index, original item, insert params)]
+
+    for index, item in enumerate(rows):
+        try:
+            chunk.append((index, item, normalize_product(item)))
+        except ValueError as e:
+            result["errors"].append({"row": index, "error": str(e)})
+
+        if len(chunk) >= chunk_size:
+            _write_chunk(conn, chunk, result, collect)
+            chunk = []
+
+    if chunk:
+        _write_chunk(conn, chunk, result, collect)
+
+    if not collect:
+        del result["inserted"]
+    return result
+
+
+def _write_chunk(conn, chunk, result, collect):
+    cursor = conn.cursor()
+    token = uuid.uuid4().hex
+    try:
+        # One multi-row INSERT per chunk, then read the generated ids back
+        first_id = insert_many(cursor, "products", CHUNK_COLUMNS, [params + (token,) for _, _, params in chunk])
+        written = list(zip(_generated_ids(cursor, first_id, token, len(chunk)), chunk))
+        _log_initial_stock(cursor, written)
+        conn.commit()
+    except DBError:
+        conn.rollback()
+        written = _write_rows_individually(conn, cursor, chunk, result)
+    finally:
+        cursor.close()
+
+    result["inserted_count"] += len(written)
+    if collect:
+        for product_id, (_, item, _) in written:
+            result["inserted"].append({**item, "Product_ID": product_id})  # the generated id wins
+
+
+def _generated_ids(cursor, first_id, token, count):
+    """
+    Product_IDs of the `count` rows the chunk's INSERT just wrote, in row
+    order. Only this chunk's rows carry `token`; the id range bounds the
+    index scan. A multi-row INSERT normally reserves its ids as one block
+    (first_id, stepping by auto_increment_increment), but that is not
+    guaranteed, so a short read falls back to the token alone.
+    """
+    cursor.execute("""
+        SELECT Product_ID FROM products
+        WHERE Import_Token = %s
+          AND Product_ID >= %s AND Product_ID < %s + %s * @@auto_increment_increment
+        ORDER BY Product_ID
+    """, (token, first_id, first_id, count))
+    ids = [row["Product_ID"] for row in cursor.fetchall()]
+    if len(ids) != count:
+        cursor.execute("""
+            SELECT Product_ID FROM products
+            WHERE Import_Token = %s AND Product_ID >= %s
+            ORDER BY Product_ID
+        """, (token, first_id))
+        ids = [row["Product_ID"] for row in cursor.fetchall()]
+    if len(ids) != count:
+        raise DBError("Could not read back the generated Product_IDs")
+    return ids
+
+
+def _write_rows_individually(conn, cursor, chunk, result):
+    written = []
+    for entry in chunk:
+        index, _, params = entry
+        try:
+            cursor.execute(INSERT_PRODUCT, params)
+            written.append((cursor.lastrowid, entry))
+        except DBError as e:
+            result["errors"].append({"row": index, "error": str(e)})
+
+    try:
+        _log_initial_stock(cursor, written)
+        conn.commit()
+    except DBError as e:
+        # Nothing from this chunk was kept; report every row that was pending
+        conn.rollback()
+        for _, (index, _, _) in written:
+            result["errors"].append({"row": index, "error": str(e)})
+        return []
+    return written
+
+
+def _log_initial_stock(cursor, written):
+    logs = [
+        (product_id, params[5], "Initial stock")
+        for product_id, (_, _, params) in written
+        if params[5] > 0
+    ]
+    if logs:
+        cursor.executemany(INSERT_LOG, logs)
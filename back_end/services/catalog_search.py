@@ -0,0 +1,228 @@
+import bisect
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+
+from config import Config
+from database.connection import get_db
+
+# ================= TOKENIZER =================
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+# Matches in the title count more than matches in the author/brand,
+# which count more than matches in the description.
+FIELD_WEIGHTS = {
+    "Product_Name": 3.0,
+    "Author_Brand": 2.0,
+    "Description": 1.0,
+}
+
+# Score multiplier for a term that only matched as a prefix (type-ahead)
+PREFIX_PENALTY = 0.7
+
+
+def tokenize(text):
+    """
+    Lower-case and split text into alphanumeric tokens.
+    """
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+# ================= INVERTED INDEX =================
+class CatalogSearchIndex:
+    """
+    In-process inverted index over the product catalog.
+
+    - Full text over Product_Name, Author_Brand and Description, ranked with
+      field-weighted TF-IDF.
+    - The last query word also matches as a prefix, for type-ahead search.
+    - Category and price filters are answered from a category -> ids map and
+      a sorted price list, so they never scan the catalog.
+
+    The index is loaded lazily from MySQL, updated in place by the product
+    write handlers, and rebuilt every SEARCH_INDEX_REFRESH seconds to pick up
+    writes made by other worker processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+        self._built_at = None
+
+    def _reset(self):
+        self._docs = {}                        # Product_ID -> product row
+        self._doc_terms = {}                   # Product_ID -> set of its terms
+        self._postings = defaultdict(dict)     # term -> {Product_ID: weighted term frequency}
+        self._vocabulary = []                  # sorted terms, for prefix lookups
+        self._by_category = defaultdict(set)   # Category -> {Product_ID}
+        self._prices = []                      # sorted [(price, Product_ID)]
+
+    # ----------------- maintenance -----------------
+    def ensure_built(self):
+        """
+        Build the index from MySQL if it is empty or older than SEARCH_INDEX_REFRESH.
+        """
+        built_at = self._built_at
+        if built_at is not None and time.monotonic() - built_at < Config.SEARCH_INDEX_REFRESH:
+            return
+
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM products")
+        rows = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        self.build(rows)
+
+    def build(self, rows):
+        with self._lock:
+            self._reset()
+            for row in rows:
+                self._add(row)
+            self._built_at = time.monotonic()
+
+    def mark_stale(self):
+        """
+        Force a full rebuild on next use (e.g. after a bulk import).
+        """
+        self._built_at = None
+
+    def upsert(self, row):
+        with self._lock:
+            self._remove(row["Product_ID"])
+            self._add(row)
+
+    def remove(self, product_id):
+        with self._lock:
+            self._remove(product_id)
+
+    def adjust_stock(self, product_id, delta):
+        """
+        Apply a stock change to the stored row without re-reading it
+        (stock is not indexed, so postings are untouched).
+        """
+        with self._lock:
+            row = self._docs.get(product_id)
+            if row is not None:
+                row = dict(row)
+                row["Stock_Quantity"] = int(row["Stock_Quantity"]) + delta
+                self._docs[product_id] = row
+
+    def _add(self, row):
+        product_id = row["Product_ID"]
+        frequencies = defaultdict(float)
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(row.get(field)):
+                frequencies[term] += weight
+
+        for term, tf in frequencies.items():
+            postings = self._postings[term]
+            if not postings:
+                bisect.insort(self._vocabulary, term)
+            postings[product_id] = tf
+
+        self._docs[product_id] = row
+        self._doc_terms[product_id] = set(frequencies)
+        self._by_category[row.get("Category")].add(product_id)
+        bisect.insort(self._prices, (_price(row), product_id))
+
+    def _remove(self, product_id):
+        row = self._docs.pop(product_id, None)
+        if row is None:
+            return
+
+        for term in self._doc_terms.pop(product_id):
+            postings = self._postings[term]
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[term]
+                i = bisect.bisect_left(self._vocabulary, term)
+                del self._vocabulary[i]
+
+        category_ids = self._by_category[row.get("Category")]
+        category_ids.discard(product_id)
+        if not category_ids:
+            del self._by_category[row.get("Category")]
+
+        i = bisect.bisect_left(self._prices, (_price(row), product_id))
+        del self._prices[i]
+
+    # ----------------- queries -----------------
+    def search(self, text, category=None, min_price=None, max_price=None):
+        """
+        Return product rows matching every word of `text` (the last word may
+        match as a prefix), restricted by the optional category / price range
+        and ordered by relevance.
+        """
+        self.ensure_built()
+        terms = tokenize(text)
+
+        with self._lock:
+            total_docs = len(self._docs) or 1
+            scores = None
+
+            for position, term in enumerate(terms):
+                expansions = {term: 1.0} if term in self._postings else {}
+                if position == len(terms) - 1:
+                    for candidate in self._prefix_terms(term):
+                        expansions.setdefault(candidate, PREFIX_PENALTY)
+
+                # Score contribution of this query word, per product
+                word_scores = defaultdict(float)
+                for candidate, factor in expansions.items():
+                    postings = self._postings[candidate]
+                    idf = math.log(1 + total_docs / len(postings))
+                    for product_id, tf in postings.items():
+                        word_scores[product_id] += factor * tf * idf
+
+                # Every query word must match (AND semantics)
+                if scores is None:
+                    scores = word_scores
+                else:
+                    scores = {pid: s + word_scores[pid] for pid, s in scores.items() if pid in word_scores}
+                if not scores:
+                    return []
+
+            if scores is None:
+                # No searchable words: fall back to the predicates alone
+                scores = dict.fromkeys(self._docs, 0.0)
+
+            allowed = self._filter_ids(category, min_price, max_price)
+            if allowed is not None:
+                scores = {pid: s for pid, s in scores.items() if pid in allowed}
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            return [self._docs[pid] for pid, _ in ranked]
+
+    def _prefix_terms(self, prefix):
+        i = bisect.bisect_left(self._vocabulary, prefix)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(prefix):
+            yield self._vocabulary[i]
+            i += 1
+
+    def _filter_ids(self, category, min_price, max_price):
+        """
+        Resolve category / price predicates to a set of ids, or None when no
+        predicate was given.
+        """
+        allowed = None
+        if category:
+            allowed = set(self._by_category.get(category, ()))
+
+        if min_price is not None or max_price is not None:
+            lo = 0 if min_price is None else bisect.bisect_left(self._prices, (min_price, -math.inf))
+            hi = len(self._prices) if max_price is None else bisect.bisect_right(self._prices, (max_price, math.inf))
+            in_range = {pid for _, pid in self._prices[lo:hi]}
+            allowed = in_range if allowed is None else allowed & in_range
+
+        return allowed
+
+
+def _price(row):
+    price = row.get("Price")
+    return float(price) if price is not None else 0.0
+
+
+catalog_index = CatalogSearchIndex()
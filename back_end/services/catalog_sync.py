@@ -0,0 +1,84 @@
+from config import Config
+from services.cart_cache import invalidate_product as invalidate_cached_carts
+from services.catalog_facets import catalog_facets
+from services.catalog_search import catalog_index
+from services.low_stock import low_stock_monitor
+from services.stock import add_stock_listener
+from utils.cache import TTLCache
+from utils import metrics
+
+# ================= Product cache =================
+# Shared by the catalog routes (routes/products.py) and the inventory
+# admin routes (routes/inventory.py). The catalog only changes through
+# their write handlers, which call sync_catalog(), so browse traffic is
+# served from memory. Keys:
+#   ("product", id)                          - single product row
+#   ("list", columns, after, limit)          - one page of GET /products/
+#   ("filter", category, min, max, search)   - normalized /filter query
+#   ("count",)                               - total product count
+product_cache = TTLCache(maxsize=Config.PRODUCT_CACHE_SIZE, ttl=Config.PRODUCT_CACHE_TTL)
+metrics.register("product_cache", product_cache.stats)
+
+
+def get_product_count(cursor):
+    # COUNT(*) is a full index scan on InnoDB, so it is cached like everything else
+    def load():
+        cursor.execute("SELECT COUNT(*) AS total FROM products")
+        return int(cursor.fetchone()["total"])
+    return product_cache.get_or_load(("count",), load)
+
+
+def invalidate_product_cache(product_id):
+    product_cache.invalidate(("product", product_id))
+    # Any listing, filter result or count may include the changed product
+    product_cache.invalidate_where(lambda key, _: key[0] != "product")
+
+
+# ================= Keep in-process catalog structures in sync =================
+
+def sync_catalog(cursor, product_id, old_row=None):
+    """
+    Call after a product write has been committed. Re-reads the row and
+    pushes it into the search index and low-stock monitor (or drops it if
+    the product is gone), updates the facet summary and invalidates the
+    product cache.
+    `old_row` is the product before the write (needs Category and Price),
+    or None for inserts.
+    """
+    cursor.execute("SELECT * FROM products WHERE Product_ID=%s", (product_id,))
+    row = cursor.fetchone()
+    if row:
+        catalog_index.upsert(row)
+        low_stock_monitor.upsert_product(row)
+    else:
+        catalog_index.remove(product_id)
+        low_stock_monitor.remove_product(product_id)
+    catalog_facets.apply(old_row, row)
+    invalidate_product_cache(product_id)
+    if old_row is not None:
+        # Cached carts hold this product's price / name / image
+        invalidate_cached_carts(product_id)
+
+
+def apply_stock_changes(changes):
+    """
+    Call after a committed transaction that changed stock without touching
+    any other product column (e.g. checkout). `changes` is {Product_ID: delta}.
+    """
+    for product_id, delta in changes.items():
+        catalog_index.adjust_stock(product_id, delta)
+        invalidate_product_cache(product_id)
+
+
+add_stock_listener(apply_stock_changes)
+
+
+def sync_catalog_bulk():
+    """
+    Call after a bulk write: per-row syncing would cost a query per product,
+    so the in-process structures are simply rebuilt on next use.
+    """
+    catalog_index.mark_stale()
+    catalog_facets.mark_stale()
+    low_stock_monitor.mark_stale()
+    product_cache.clear()
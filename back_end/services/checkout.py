@@ -0,0 +1,343 @@
+import threading
+import time
+from decimal import Decimal, ROUND_HALF_UP
+
+from config import Config
+from database.connection import IntegrityError, get_db, insert_many
+from services.cart_cache import invalidate_cart
+from services.sales_rollup import record_order
+from services.stock import InsufficientStock, notify_stock_changed, reserve_stock
+from utils import metrics
+
+CENT = Decimal("0.01")
+
+CART_LINES = """
+    SELECT c.cart_id, c.product_id, c.quantity, p.Product_Name, p.Price, p.Category
+    FROM cart c
+    JOIN products p ON c.product_id = p.Product_ID
+    WHERE c.user_id = %s
+    ORDER BY c.product_id
+"""
+
+ORDER_LINE_COLUMNS = ("Order_ID", "Product_ID", "Quantity", "Subtotal")
+
+
+def money(value):
+    """
+    Round a Decimal to cents (half up), the way prices are stored.
+    """
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def fetch_cart_lines(cur, user_id):
+    """
+    Read the user's cart joined with current product prices (one query).
+    """
+    cur.execute(CART_LINES, (user_id,))
+    return cur.fetchall()
+
+
+def price_lines(rows):
+    """
+    Compute per-line subtotals and the order total in Decimal (prices come
+    back from MySQL as Decimal, so nothing passes through float).
+    Returns (lines, total).
+    """
+    lines = []
+    for row in rows:
+        price = Decimal(row["Price"])
+        quantity = int(row["quantity"])
+        lines.append({
+            "Product_ID": row["product_id"],
+            "Product_Name": row["Product_Name"],
+            "Category": row.get("Category"),
+            "Quantity": quantity,
+            "Price": price,
+            "Subtotal": money(price * quantity),
+        })
+    total = sum((line["Subtotal"] for line in lines), Decimal("0.00"))
+    return lines, total
+
+
+def insert_order_lines(cur, order_id, lines):
+    """
+    Write every order line in one multi-row INSERT, then read back each
+    line's OrderDetail_ID by Order_ID (auto-increment ids of a multi-row
+    INSERT are not guaranteed to be consecutive). A cart holds one line per
+    product, so Product_ID identifies the line within the order.
+    """
+    if not lines:
+        return lines
+
+    insert_many(cur, "order_details", ORDER_LINE_COLUMNS, [
+        (order_id, line["Product_ID"], line["Quantity"], line["Subtotal"]) for line in lines
+    ])
+    cur.execute(
+        "SELECT OrderDetail_ID, Product_ID FROM order_details WHERE Order_ID = %s ORDER BY OrderDetail_ID",
+        (order_id,)
+    )
+    detail_ids = {row["Product_ID"]: row["OrderDetail_ID"] for row in cur.fetchall()}
+    for line in lines:
+        line["Order_ID"] = order_id
+        line["OrderDetail_ID"] = detail_ids[line["Product_ID"]]
+    return lines
+
+
+def serialize_lines(lines):
+    """
+    JSON-friendly copy of order lines (money as floats, like the rest of the API).
+    """
+    return [
+        {**line, "Price": float(line["Price"]), "Subtotal": float(line["Subtotal"])}
+        for line in lines
+    ]
+
+
+# ================= CHECKOUT SERVICE =================
+# Shared by POST /cart/checkout and POST /checkout/place_order.
+
+CHECKOUT_PHASES = ("read_cart", "reserve_stock", "write_order", "clear_cart")
+
+# Maximum Idempotency-Key length (matches checkout_idempotency.Idem_Key)
+MAX_IDEMPOTENCY_KEY = 64
+
+
+class CheckoutError(Exception):
+    """
+    A checkout that cannot go ahead; carries the HTTP status and JSON body.
+    """
+
+    def __init__(self, status, message, **extra):
+        super().__init__(message)
+        self.status = status
+        self.body = {"error": message, **extra}
+
+
+class PhaseTimer:
+    """
+    Records how long each checkout phase takes (milliseconds).
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self._started = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.timings[phase] = round((now - self._started) * 1000, 3)
+        self._started = now
+
+    def server_timing(self):
+        """
+        Value for the Server-Timing response header.
+        """
+        return ", ".join(f"{phase};dur={ms}" for phase, ms in self.timings.items())
+
+
+# Cumulative per-phase timings, exposed under "checkout" in GET /metrics
+_stats_lock = threading.Lock()
+_stats = {"checkouts": 0, "replays": 0, "phase_ms": dict.fromkeys(CHECKOUT_PHASES, 0.0)}
+
+
+def _record(timer=None, replay=False):
+    with _stats_lock:
+        if replay:
+            _stats["replays"] += 1
+            return
+        _stats["checkouts"] += 1
+        for phase, ms in timer.timings.items():
+            _stats["phase_ms"][phase] += ms
+
+
+def checkout_stats():
+    with _stats_lock:
+        count = _stats["checkouts"]
+        return {
+            "checkouts": count,
+            "replays": _stats["replays"],
+            "avg_phase_ms": {
+                phase: round(total / count, 3) if count else 0.0
+                for phase, total in _stats["phase_ms"].items()
+            },
+        }
+
+
+metrics.register("checkout", checkout_stats)
+
+
+def checkout(user_id, idempotency_key=None):
+    """
+    Move the user's cart into a new order in one short transaction:
+
+        read_cart     - cart joined with current prices (one query)
+        reserve_stock - conditional stock decrements in Product_ID order
+        write_order   - orders row + all lines in one multi-row INSERT
+        clear_cart    - delete the user's cart rows, add the order to the
+                        sales rollups
+
+    With an idempotency key, the key is claimed (inserted) first inside the
+    same transaction. A concurrent retry blocks on that row and, once the
+    first attempt commits, gets the original order back instead of
+    creating another one. Keys older than CHECKOUT_IDEMPOTENCY_TTL_HOURS
+    are forgotten: reusing one places a new order.
+
+    Returns (summary, timer) where summary holds Order_ID, total_amount,
+    items and replayed. Raises CheckoutError for client-visible failures.
+    """
+    if idempotency_key is not None:
+        idempotency_key = str(idempotency_key).strip()
+        if not idempotency_key or len(idempotency_key) > MAX_IDEMPOTENCY_KEY:
+            raise CheckoutError(400, f"Idempotency-Key must be 1-{MAX_IDEMPOTENCY_KEY} characters")
+
+    timer = PhaseTimer()
+    db = get_db()
+    cur = db.cursor()
+    try:
+        if idempotency_key is not None:
+            # An expired claim no longer counts, even before it is purged
+            cur.execute("""
+                DELETE FROM checkout_idempotency
+                WHERE User_ID=%s AND Idem_Key=%s AND Created_At < NOW() - INTERVAL %s HOUR
+            """, (user_id, idempotency_key, Config.CHECKOUT_IDEMPOTENCY_TTL_HOURS))
+            try:
+                cur.execute(
+                    "INSERT INTO checkout_idempotency (User_ID, Idem_Key) VALUES (%s, %s)",
+                    (user_id, idempotency_key)
+                )
+            except IntegrityError:
+                db.rollback()
+                invalidate_cart(user_id)
+                summary = _replay(cur, user_id, idempotency_key)
+                _record(replay=True)
+                return summary, timer
+
+        rows = fetch_cart_lines(cur, user_id)
+        if not rows:
+            raise CheckoutError(400, "Cart is empty")
+        timer.lap("read_cart")
+
+        try:
+            reserved = reserve_stock(cur, [(r["product_id"], r["quantity"]) for r in rows])
+        except InsufficientStock as e:
+            raise CheckoutError(409, "Not enough stock", product_id=e.product_id)
+        timer.lap("reserve_stock")
+
+        lines, total_amount = price_lines(rows)
+        cur.execute("""
+            INSERT INTO orders (User_ID, Order_Date, Total_Amount, Order_Status)
+            VALUES (%s, NOW(), %s, 'Pending')
+        """, (user_id, total_amount))
+        order_id = cur.lastrowid
+        insert_order_lines(cur, order_id, lines)
+        if idempotency_key is not None:
+            cur.execute(
+                "UPDATE checkout_idempotency SET Order_ID=%s WHERE User_ID=%s AND Idem_Key=%s",
+                (order_id, user_id, idempotency_key)
+            )
+        timer.lap("write_order")
+
+        cur.execute("DELETE FROM cart WHERE user_id=%s", (user_id,))
+        record_order(cur, lines, total_amount)
+        db.commit()
+        timer.lap("clear_cart")
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        cur.close()
+        db.close()
+
+    invalidate_cart(user_id)
+    notify_stock_changed({pid: -qty for pid, qty in reserved.items()})
+    _record(timer)
+
+    return {
+        "Order_ID": order_id,
+        "total_amount": float(total_amount),
+        "items": serialize_lines(lines),
+        "replayed": False,
+    }, timer
+
+
+def _replay(cur, user_id, idempotency_key):
+    """
+    Rebuild the summary of the order an earlier request with the same key created.
+    """
+    cur.execute(
+        "SELECT Order_ID FROM checkout_idempotency WHERE User_ID=%s AND Idem_Key=%s",
+        (user_id, idempotency_key)
+    )
+    claim = cur.fetchone()
+    if not claim or claim["Order_ID"] is None:
+        raise CheckoutError(409, "A checkout with this Idempotency-Key is still in progress")
+
+    order_id = claim["Order_ID"]
+    cur.execute("SELECT Total_Amount FROM orders WHERE Order_ID=%s", (order_id,))
+    order = cur.fetchone()
+    cur.execute("""
+        SELECT od.OrderDetail_ID, od.Order_ID, od.Product_ID, p.Product_Name,
+               od.Quantity, od.Subtotal
+        FROM order_details od
+        LEFT JOIN products p ON p.Product_ID = od.Product_ID
+        WHERE od.Order_ID = %s
+        ORDER BY od.OrderDetail_ID
+    """, (order_id,))
+    items = [
+        {**row, "Price": float(money(Decimal(row["Subtotal"]) / row["Quantity"])),
+         "Subtotal": float(row["Subtotal"])}
+        for row in cur.fetchall()
+    ]
+
+    return {
+        "Order_ID": order_id,
+        "total_amount": float(order["Total_Amount"]) if order else 0.0,
+        "items": items,
+        "replayed": True,
+    }
+
+
+# ----------------- idempotency key expiry -----------------
+def purge_idempotency_keys(chunk_size=None):
+    """
+    Delete idempotency keys older than CHECKOUT_IDEMPOTENCY_TTL_HOURS, in
+    chunks so no single transaction locks many rows. Returns rows deleted.
+    """
+    chunk_size = chunk_size or Config.CHECKOUT_IDEMPOTENCY_PURGE_CHUNK
+    purged = 0
+
+    conn = get_db()
+    cursor = conn.cursor()
+    try:
+        while True:
+            cursor.execute("""
+                DELETE FROM checkout_idempotency
+                WHERE Created_At < NOW() - INTERVAL %s HOUR
+                ORDER BY Created_At
+                LIMIT %s
+            """, (Config.CHECKOUT_IDEMPOTENCY_TTL_HOURS, chunk_size))
+            deleted = cursor.rowcount
+            conn.commit()
+            purged += deleted
+            if deleted < chunk_size:
+                break
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    return purged
+
+
+def init_app(app):
+    """
+    Register the `flask purge-idempotency-keys` command.
+    """
+    @app.cli.command("purge-idempotency-keys")
+    def purge_idempotency_keys_command():
+        """Delete checkout idempotency keys older than CHECKOUT_IDEMPOTENCY_TTL_HOURS."""
+        purged = purge_idempotency_keys()
+        print(f"Purged {purged} expired idempotency key(s)")
@@ -0,0 +1,130 @@
+from datetime import date
+
+import click
+
+from config import Config
+from database.connection import get_db
+
+# ================= INVENTORY LOG RETENTION =================
+# inventory_log is append-only. Rows older than the retention window are
+# rolled up into inventory_log_monthly (one row per product per month:
+# net change and number of entries) and removed from the hot table, so
+# the hot table only ever holds the last few months.
+#
+# Each chunk is summarised and deleted in the same transaction, so a
+# compaction that stops half-way never double-counts or loses rows.
+# Run `flask compact-inventory-log` from cron (e.g. nightly).
+
+
+def retention_cutoff(months=None, today=None):
+    """
+    First day of the oldest month that stays in the hot table.
+    """
+    months = Config.INVENTORY_LOG_RETENTION_MONTHS if months is None else months
+    today = today or date.today()
+    index = today.year * 12 + (today.month - 1) - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def compact_inventory_log(months=None, chunk_size=None):
+    """
+    Compact every inventory_log row dated before retention_cutoff(months).
+    Returns (rows compacted, cutoff date).
+    """
+    cutoff = retention_cutoff(months)
+    chunk_size = chunk_size or Config.INVENTORY_LOG_COMPACT_CHUNK
+    compacted = 0
+
+    conn = get_db()
+    cursor = conn.cursor()
+    try:
+        while True:
+            cursor.execute("""
+                SELECT Log_ID FROM inventory_log
+                WHERE Log_Date < %s
+                ORDER BY Log_Date, Log_ID
+                LIMIT %s
+                FOR UPDATE
+            """, (cutoff, chunk_size))
+            ids = [row["Log_ID"] for row in cursor.fetchall()]
+            if not ids:
+                conn.commit()
+                break
+
+            placeholders = ", ".join(["%s"] * len(ids))
+            cursor.execute(f"""
+                INSERT INTO inventory_log_monthly (Product_ID, Month, Net_Change, Entries)
+                SELECT * FROM (
+                    SELECT Product_ID, DATE_FORMAT(Log_Date, '%%Y-%%m-01') AS Month,
+                           SUM(Quantity_Changed) AS Net_Change, COUNT(*) AS Entries
+                    FROM inventory_log
+                    WHERE Log_ID IN ({placeholders})
+                    GROUP BY Product_ID, DATE_FORMAT(Log_Date, '%%Y-%%m-01')
+                ) AS new
+                ON DUPLICATE KEY UPDATE
+                    Net_Change = inventory_log_monthly.Net_Change + new.Net_Change,
+                    Entries = inventory_log_monthly.Entries + new.Entries
+            """, ids)
+            cursor.execute(f"DELETE FROM inventory_log WHERE Log_ID IN ({placeholders})", ids)
+            conn.commit()
+            compacted += len(ids)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    return compacted, cutoff
+
+
+def monthly_summary(cursor, product_id=None, month_from=None, month_to=None):
+    """
+    Per-product monthly net change across both the compacted history and
+    the hot table, oldest month first. month_from / month_to are dates
+    (any day of the month).
+    """
+    where, params = [], []
+    if product_id is not None:
+        where.append("Product_ID = %s")
+        params.append(product_id)
+    if month_from is not None:
+        where.append("Month >= %s")
+        params.append(month_from.replace(day=1))
+    if month_to is not None:
+        where.append("Month <= %s")
+        params.append(month_to.replace(day=1))
+    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
+
+    # The hot table is small by design, and product filters use the
+    # (Product_ID, Log_Date) index
+    cursor.execute(f"""
+        SELECT Product_ID, Month, SUM(Net_Change) AS Net_Change, SUM(Entries) AS Entries
+        FROM (
+            SELECT Product_ID, Month, Net_Change, Entries
+            FROM inventory_log_monthly
+            UNION ALL
+            SELECT Product_ID, DATE(DATE_FORMAT(Log_Date, '%%Y-%%m-01')) AS Month,
+                   SUM(Quantity_Changed), COUNT(*)
+            FROM inventory_log
+            {"WHERE Product_ID = %s" if product_id is not None else ""}
+            GROUP BY Product_ID, Month
+        ) m
+        {where_sql}
+        GROUP BY Product_ID, Month
+        ORDER BY Month, Product_ID
+    """, ([product_id] if product_id is not None else []) + params)
+    return cursor.fetchall()
+
+
+def init_app(app):
+    """
+    Register the `flask compact-inventory-log` command.
+    """
+    @app.cli.command("compact-inventory-log")
+    @click.option("--months", type=int, default=None,
+                  help="Whole months to keep row-by-row (default INVENTORY_LOG_RETENTION_MONTHS).")
+    def compact_inventory_log_command(months):
+        """Roll old inventory_log rows into monthly per-product summaries."""
+        compacted, cutoff = compact_inventory_log(months)
+        print(f"Compacted {compacted} inventory log row(s) dated before {cutoff.isoformat()}")
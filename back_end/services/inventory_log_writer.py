@@ -0,0 +1,242 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from config import Config
+from database.connection import Error as DBError, ConnectionPool, IntegrityError, PooledConnection
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Log_Date comes from the MySQL clock, like every other inventory_log
+# writer (NOW()), backdated by how long the event sat in the queue
+INSERT_LOG = "INSERT INTO inventory_log (Product_ID, Log_Date, Quantity_Changed, Remarks) VALUES "
+LOG_ROW = "(%s, NOW() - INTERVAL %s SECOND, %s, %s)"
+
+# Attempts per batch before its events are given up on
+MAX_WRITE_ATTEMPTS = 3
+
+_STOP = object()
+
+
+class InventoryLogWriter:
+    """
+    Buffers inventory_log events in memory and writes them from a
+    background thread in multi-row INSERTs, so request handlers never wait
+    on an audit-log commit.
+
+    - Log_Date is the database's NOW() minus the time the event spent
+      queued, i.e. when it was logged, not when it was written.
+    - The queue is bounded (max_queue). When it is full the event is written
+      synchronously instead, so a burst slows callers down rather than
+      losing audit rows or growing memory without limit.
+    - Pending events are flushed at interpreter exit (atexit) and by flush().
+    - synchronous=True writes every event immediately on the caller's
+      thread (INVENTORY_LOG_ASYNC = False, e.g. for tests and scripts).
+    - Writes go through the writer's own small pool, never the request
+      pool: a sync write happens while the handler still holds g.db, and a
+      second connection from the same bounded pool would let DB_POOL_SIZE
+      concurrent requests wait on each other forever.
+    """
+
+    def __init__(self, db_pool, max_queue, batch_size, flush_interval, synchronous=False):
+        self.db_pool = db_pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.synchronous = synchronous
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"written": 0, "batches": 0, "sync_writes": 0, "dropped": 0}
+
+    # ----------------- producer side -----------------
+    def log(self, product_id, quantity_changed, remarks=None, sync=False):
+        """
+        Record one stock change. sync=True writes it before returning (for
+        callers that are about to delete the product it refers to).
+        """
+        event = (product_id, quantity_changed, remarks, time.monotonic())
+        if sync or self.synchronous:
+            self._write_sync(event)
+            return
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Backpressure: the caller pays for its own write
+            self._write_sync(event)
+
+    def flush(self):
+        """
+        Block until every event queued so far has been written.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+        else:
+            self._drain()
+
+    def close(self, timeout=10):
+        """
+        Stop the background thread after it has written everything queued.
+        Registered with atexit when the thread starts.
+        """
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            self._drain()
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        stats["mode"] = "sync" if self.synchronous else "async"
+        return stats
+
+    # ----------------- background thread -----------------
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="inventory-log-writer", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            batch, stop = self._next_batch()
+            try:
+                if batch:
+                    self._write_batch(batch)
+            except Exception:
+                logger.exception("Dropping %d inventory log event(s)", len(batch))
+                self._count(dropped=len(batch))
+            finally:
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _next_batch(self):
+        """
+        Wait up to flush_interval for the first event, then take whatever
+        else is already queued (up to batch_size).
+        """
+        batch = []
+        try:
+            event = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return batch, False
+
+        while True:
+            if event is _STOP:
+                return batch, True
+            batch.append(event)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+
+    def _drain(self):
+        """
+        Write anything left in the queue on the calling thread.
+        """
+        batch = []
+        while True:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+            if event is not _STOP:
+                batch.append(event)
+        for start in range(0, len(batch), self.batch_size):
+            self._write_batch(batch[start:start + self.batch_size])
+
+    # ----------------- writes -----------------
+    def _insert(self, events):
+        # Not get_db(): on the sync path that is the request's connection, and
+        # this commit / rollback would then end the handler's own transaction
+        conn = PooledConnection(self.db_pool, self.db_pool.acquire())
+        cursor = conn.cursor()
+        now = time.monotonic()
+        params = []
+        for product_id, quantity_changed, remarks, queued_at in events:
+            params += [product_id, round(now - queued_at), quantity_changed, remarks]
+        try:
+            cursor.execute(INSERT_LOG + ", ".join([LOG_ROW] * len(events)), params)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _write_batch(self, events):
+        for attempt in range(1, MAX_WRITE_ATTEMPTS + 1):
+            try:
+                self._insert(events)
+                self._count(written=len(events), batches=1)
+                return
+            except IntegrityError:
+                # One bad row (e.g. its product is gone) must not sink the batch
+                self._write_rows(events)
+                return
+            except DBError as e:
+                if attempt == MAX_WRITE_ATTEMPTS:
+                    logger.error("Dropping %d inventory log event(s): %s", len(events), e)
+                    self._count(dropped=len(events))
+                    return
+                time.sleep(self.flush_interval)
+
+    def _write_rows(self, events):
+        for event in events:
+            try:
+                self._insert([event])
+                self._count(written=1, batches=1)
+            except DBError as e:
+                logger.error("Dropping inventory log event %r: %s", event, e)
+                self._count(dropped=1)
+
+    def _write_sync(self, event):
+        """
+        Write one event on the caller's thread (errors propagate, as the
+        old synchronous helper did).
+        """
+        self._insert([event])
+        self._count(written=1, sync_writes=1)
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for key, delta in deltas.items():
+                self._stats[key] += delta
+
+
+log_pool = ConnectionPool(
+    max_size=Config.INVENTORY_LOG_DB_POOL_SIZE,
+    timeout=Config.DB_POOL_TIMEOUT,
+    max_idle=Config.DB_POOL_MAX_IDLE,
+    ping_after=Config.DB_POOL_PING_AFTER,
+)
+metrics.register("inventory_log_db_pool", log_pool.stats)
+
+inventory_log_writer = InventoryLogWriter(
+    db_pool=log_pool,
+    max_queue=Config.INVENTORY_LOG_QUEUE_SIZE,
+    batch_size=Config.INVENTORY_LOG_BATCH_SIZE,
+    flush_interval=Config.INVENTORY_LOG_FLUSH_INTERVAL,
+    synchronous=not Config.INVENTORY_LOG_ASYNC,
+)
+metrics.register("inventory_log_writer", inventory_log_writer.stats)
@@ -0,0 +1,240 @@
+import heapq
+import math
+import threading
+import time
+
+from config import Config
+from database.connection import get_db
+from services.stock import CHECKOUT_REMARK, add_stock_listener
+
+# ================= LOW-STOCK MONITOR =================
+# Ranks products by days of cover (stock / daily sales velocity) so
+# GET /inventory/alerts can hand purchasing the most urgent items without
+# scanning the catalog.
+#
+# Velocity is units sold over the last LOW_STOCK_VELOCITY_DAYS days, from
+# order_details plus manual outflows in inventory_log (checkout log rows
+# are skipped: they duplicate order_details).
+#
+# A product is on alert when its stock is at or below its reorder
+# threshold (product override, else its category's, else the default) or
+# when it has LOW_STOCK_COVER_DAYS of cover or less.
+
+PRODUCTS_SQL = """
+    SELECT Product_ID, Product_Name, Category, Stock_Quantity, Reorder_Threshold
+    FROM products
+"""
+
+CATEGORY_THRESHOLDS_SQL = "SELECT Category, Reorder_Threshold FROM category_thresholds"
+
+SOLD_SQL = """
+    SELECT od.Product_ID, SUM(od.Quantity) AS units
+    FROM order_details od
+    JOIN orders o ON o.Order_ID = od.Order_ID
+    WHERE o.Order_Date >= NOW() - INTERVAL %s DAY
+    GROUP BY od.Product_ID
+"""
+
+OUTFLOW_SQL = """
+    SELECT Product_ID, -SUM(Quantity_Changed) AS units
+    FROM inventory_log
+    WHERE Log_Date >= NOW() - INTERVAL %s DAY
+      AND Quantity_Changed < 0
+      AND (Remarks IS NULL OR Remarks <> %s)
+    GROUP BY Product_ID
+"""
+
+
+class LowStockMonitor:
+    """
+    In-process priority index of products by days of cover.
+
+    Alerting products sit in a min-heap keyed by (days of cover, stock).
+    Every change pushes a fresh entry and bumps the product's version;
+    entries whose version is out of date are skipped when popped (lazy
+    deletion), so updates are O(log n) and alerts(k) is O(k log n).
+    Like the catalog index it is loaded lazily, updated in place on stock
+    changes and product writes, and rebuilt every LOW_STOCK_REFRESH seconds
+    to pick up writes from other worker processes and slide the window.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._products = {}             # Product_ID -> state dict
+        self._category_thresholds = {}  # Category -> threshold
+        self._heap = []                 # (days_of_cover, stock, Product_ID, version)
+        self._built_at = None
+
+    # ----------------- maintenance -----------------
+    def ensure_built(self):
+        built_at = self._built_at
+        if built_at is not None and time.monotonic() - built_at < Config.LOW_STOCK_REFRESH:
+            return
+
+        window = Config.LOW_STOCK_VELOCITY_DAYS
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute(PRODUCTS_SQL)
+        products = cursor.fetchall()
+        cursor.execute(CATEGORY_THRESHOLDS_SQL)
+        thresholds = cursor.fetchall()
+        units = {}
+        cursor.execute(SOLD_SQL, (window,))
+        for row in cursor.fetchall():
+            units[row["Product_ID"]] = units.get(row["Product_ID"], 0) + int(row["units"])
+        cursor.execute(OUTFLOW_SQL, (window, CHECKOUT_REMARK))
+        for row in cursor.fetchall():
+            units[row["Product_ID"]] = units.get(row["Product_ID"], 0) + int(row["units"])
+        cursor.close()
+        conn.close()
+
+        with self._lock:
+            self._category_thresholds = {r["Category"]: r["Reorder_Threshold"] for r in thresholds}
+            self._products = {}
+            self._heap = []
+            for row in products:
+                self._products[row["Product_ID"]] = {
+                    "Product_ID": row["Product_ID"],
+                    "Product_Name": row["Product_Name"],
+                    "Category": row["Category"],
+                    "Stock_Quantity": int(row["Stock_Quantity"]),
+                    "Reorder_Threshold": row["Reorder_Threshold"],
+                    "velocity": units.get(row["Product_ID"], 0) / window,
+                    "version": 0,
+                }
+            for state in self._products.values():
+                self._push(state)
+            self._built_at = time.monotonic()
+
+    def mark_stale(self):
+        """
+        Force a full rebuild on next use (e.g. after thresholds change in bulk).
+        """
+        self._built_at = None
+
+    def apply_stock_changes(self, changes):
+        """
+        Stock listener: {Product_ID: delta} after a committed transaction.
+        Outflows also count towards the product's velocity until the next
+        rebuild recomputes it from the database.
+        """
+        if self._built_at is None:
+            return
+        with self._lock:
+            for product_id, delta in changes.items():
+                state = self._products.get(product_id)
+                if state is None:
+                    continue
+                state["Stock_Quantity"] += delta
+                if delta < 0:
+                    state["velocity"] += -delta / Config.LOW_STOCK_VELOCITY_DAYS
+                self._touch(state)
+
+    def upsert_product(self, row):
+        """
+        Product created or edited: `row` is the full products row.
+        """
+        if self._built_at is None:
+            return
+        with self._lock:
+            state = self._products.setdefault(row["Product_ID"], {
+                "Product_ID": row["Product_ID"], "velocity": 0.0, "version": 0,
+            })
+            state.update({
+                "Product_Name": row["Product_Name"],
+                "Category": row["Category"],
+                "Stock_Quantity": int(row["Stock_Quantity"]),
+                "Reorder_Threshold": row.get("Reorder_Threshold"),
+            })
+            self._touch(state)
+
+    def remove_product(self, product_id):
+        with self._lock:
+            state = self._products.pop(product_id, None)
+            if state is not None:
+                state["version"] += 1  # orphan its heap entries
+
+    def set_category_threshold(self, category, threshold):
+        if self._built_at is None:
+            return
+        with self._lock:
+            if threshold is None:
+                self._category_thresholds.pop(category, None)
+            else:
+                self._category_thresholds[category] = threshold
+            for state in self._products.values():
+                if state["Category"] == category:
+                    self._touch(state)
+
+    # ----------------- scoring -----------------
+    def threshold_for(self, state):
+        if state["Reorder_Threshold"] is not None:
+            return state["Reorder_Threshold"]
+        return self._category_thresholds.get(state["Category"], Config.LOW_STOCK_DEFAULT_THRESHOLD)
+
+    @staticmethod
+    def days_of_cover(state):
+        if state["Stock_Quantity"] <= 0:
+            return 0.0
+        if state["velocity"] <= 0:
+            return math.inf
+        return state["Stock_Quantity"] / state["velocity"]
+
+    def _is_alert(self, state):
+        return (state["Stock_Quantity"] <= self.threshold_for(state)
+                or self.days_of_cover(state) <= Config.LOW_STOCK_COVER_DAYS)
+
+    def _push(self, state):
+        if self._is_alert(state):
+            heapq.heappush(self._heap, (
+                self.days_of_cover(state), state["Stock_Quantity"], state["Product_ID"], state["version"]
+            ))
+
+    def _touch(self, state):
+        state["version"] += 1
+        self._push(state)
+        # Stale entries pile up under heavy churn; rebuild the heap once
+        # they outnumber live products
+        if len(self._heap) > 2 * len(self._products) + 64:
+            self._heap = [
+                (self.days_of_cover(s), s["Stock_Quantity"], s["Product_ID"], s["version"])
+                for s in self._products.values() if self._is_alert(s)
+            ]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, entry):
+        state = self._products.get(entry[2])
+        return state is not None and state["version"] == entry[3]
+
+    # ----------------- queries -----------------
+    def alerts(self, limit):
+        """
+        The `limit` most urgent products, fewest days of cover first.
+        """
+        self.ensure_built()
+        with self._lock:
+            taken = []
+            while self._heap and len(taken) < limit:
+                entry = heapq.heappop(self._heap)
+                if self._is_current(entry):
+                    taken.append(entry)
+            for entry in taken:
+                heapq.heappush(self._heap, entry)
+
+            result = []
+            for days, stock, product_id, _ in taken:
+                state = self._products[product_id]
+                result.append({
+                    "Product_ID": product_id,
+                    "Product_Name": state["Product_Name"],
+                    "Category": state["Category"],
+                    "Stock_Quantity": stock,
+                    "Reorder_Threshold": self.threshold_for(state),
+                    "daily_velocity": round(state["velocity"], 3),
+                    "days_of_cover": None if math.isinf(days) else round(days, 1),
+                })
+            return result
+
+
+low_stock_monitor = LowStockMonitor()
+add_stock_listener(low_stock_monitor.apply_stock_changes)
@@ -0,0 +1,188 @@
+import random
+from datetime import datetime
+
+from config import Config
+from database.connection import get_db
+
+# ================= SALES ROLLUPS =================
+# Pre-aggregated sales so the /reports endpoints never scan orders or
+# order_details on the request path:
+#
+#   sales_daily          - SALES_ROLLUP_SHARDS rows per day: orders, units,
+#                          revenue (reports SUM the shards)
+#   product_sales_daily  - one row per (day, product): units, revenue and
+#                          the product's Category
+#
+# Every order counts except cancelled ones (COUNTED_STATUS), in both paths:
+#
+#   - Checkout adds the new order inside its own transaction (record_order).
+#   - Cancelling, un-cancelling, re-pricing or deleting an order through
+#     /orders takes its old contribution out and puts the new one back
+#     (remove_order / add_order) in the same transaction as the edit.
+#   - rebuild_rollups() (`flask rebuild-sales-rollups`) recomputes both
+#     tables from orders with the same filter, for anything written any
+#     other way (imports, manual SQL).
+#
+# Each checkout adds to a random sales_daily shard, so concurrent
+# checkouts do not all queue on one row lock for the day.
+
+# SQL condition on orders (alias o) for the orders the rollups include
+COUNTED_STATUS = "o.Order_Status <> 'Cancelled'"
+
+
+def counts_in_rollups(status):
+    """
+    True if an order with this Order_Status is included in the rollups.
+    """
+    return status != "Cancelled"
+
+
+def _apply(cur, day, lines, orders, units, revenue):
+    """
+    Add one contribution (negative values subtract it) to the rollups of
+    `day`. Product rows are written in Product_ID order (the order stock is
+    reserved in), so concurrent checkouts cannot deadlock on them; the
+    sales_daily shard is written last to keep its lock short.
+    """
+    lines = sorted(lines, key=lambda line: line["Product_ID"])
+    if lines:
+        cur.execute("""
+            INSERT INTO product_sales_daily (Sale_Date, Product_ID, Category, Units, Revenue)
+            VALUES {}
+            AS new
+            ON DUPLICATE KEY UPDATE
+                Category = COALESCE(new.Category, product_sales_daily.Category),
+                Units = product_sales_daily.Units + new.Units,
+                Revenue = product_sales_daily.Revenue + new.Revenue
+        """.format(", ".join(["(%s, %s, %s, %s, %s)"] * len(lines))), [
+            value
+            for line in lines
+            for value in (day, line["Product_ID"], line.get("Category"), line["Quantity"], line["Subtotal"])
+        ])
+    cur.execute("""
+        INSERT INTO sales_daily (Sale_Date, Shard, Orders, Units, Revenue)
+        VALUES (%s, %s, %s, %s, %s)
+        AS new
+        ON DUPLICATE KEY UPDATE
+            Orders = sales_daily.Orders + new.Orders,
+            Units = sales_daily.Units + new.Units,
+            Revenue = sales_daily.Revenue + new.Revenue
+    """, (day, random.randrange(Config.SALES_ROLLUP_SHARDS), orders, units, revenue))
+
+
+def record_order(cur, lines, total_amount):
+    """
+    Add one checkout to today's rollup rows. Call inside the checkout
+    transaction, just before COMMIT.
+    """
+    cur.execute("SELECT CURDATE() AS today")
+    today = cur.fetchone()["today"]
+    units = sum(line["Quantity"] for line in lines)
+    _apply(cur, today, lines, 1, units, total_amount)
+
+
+def _order_contribution(cur, order):
+    """
+    (day, product lines, units) an existing order adds to the rollups,
+    read from its order_details. Lines whose product is gone (NULL
+    Product_ID) count towards units only, as in rebuild_rollups().
+    """
+    cur.execute("""
+        SELECT od.Product_ID, MAX(p.Category) AS Category,
+               SUM(od.Quantity) AS Quantity, SUM(od.Subtotal) AS Subtotal
+        FROM order_details od
+        LEFT JOIN products p ON p.Product_ID = od.Product_ID
+        WHERE od.Order_ID = %s
+        GROUP BY od.Product_ID
+    """, (order["Order_ID"],))
+    rows = cur.fetchall()
+    units = sum(int(row["Quantity"]) for row in rows)
+    lines = [row for row in rows if row["Product_ID"] is not None]
+    day = order["Order_Date"]
+    return (day.date() if isinstance(day, datetime) else day), lines, units
+
+
+def add_order(cur, order):
+    """
+    Count an existing order (a row with Order_ID, Order_Date and
+    Total_Amount) in the rollups, e.g. after it is un-cancelled.
+    """
+    if order["Order_Date"] is None:
+        return
+    day, lines, units = _order_contribution(cur, order)
+    _apply(cur, day, lines, 1, units, order["Total_Amount"] or 0)
+
+
+def remove_order(cur, order):
+    """
+    Take an order's contribution back out of the rollups (before it is
+    cancelled, re-priced or deleted). Call before its lines are deleted.
+    """
+    if order["Order_Date"] is None:
+        return
+    day, lines, units = _order_contribution(cur, order)
+    negated = [
+        {**line, "Category": None, "Quantity": -int(line["Quantity"]), "Subtotal": -line["Subtotal"]}
+        for line in lines
+    ]
+    _apply(cur, day, negated, -1, -units, -(order["Total_Amount"] or 0))
+
+
+def rebuild_rollups():
+    """
+    Recompute both rollup tables from the raw order history (one pass
+    each), skipping cancelled orders. Returns the number of days rebuilt.
+    """
+    conn = get_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM product_sales_daily")
+        cursor.execute("DELETE FROM sales_daily")
+        cursor.execute(f"""
+            INSERT INTO sales_daily (Sale_Date, Shard, Orders, Units, Revenue)
+            SELECT DATE(o.Order_Date), 0, COUNT(*), 0, COALESCE(SUM(o.Total_Amount), 0)
+            FROM orders o
+            WHERE o.Order_Date IS NOT NULL AND {COUNTED_STATUS}
+            GROUP BY DATE(o.Order_Date)
+        """)
+        days = cursor.rowcount
+        cursor.execute(f"""
+            UPDATE sales_daily s
+            JOIN (
+                SELECT DATE(o.Order_Date) AS day, SUM(od.Quantity) AS units
+                FROM order_details od
+                JOIN orders o ON o.Order_ID = od.Order_ID
+                WHERE {COUNTED_STATUS}
+                GROUP BY DATE(o.Order_Date)
+            ) u ON u.day = s.Sale_Date
+            SET s.Units = u.units
+        """)
+        cursor.execute(f"""
+            INSERT INTO product_sales_daily (Sale_Date, Product_ID, Category, Units, Revenue)
+            SELECT DATE(o.Order_Date), od.Product_ID, MAX(p.Category),
+                   SUM(od.Quantity), SUM(od.Subtotal)
+            FROM order_details od
+            JOIN orders o ON o.Order_ID = od.Order_ID
+            LEFT JOIN products p ON p.Product_ID = od.Product_ID
+            WHERE o.Order_Date IS NOT NULL AND od.Product_ID IS NOT NULL AND {COUNTED_STATUS}
+            GROUP BY DATE(o.Order_Date), od.Product_ID
+        """)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+    return days
+
+
+def init_app(app):
+    """
+    Register the `flask rebuild-sales-rollups` command.
+    """
+    @app.cli.command("rebuild-sales-rollups")
+    def rebuild_rollups_command():
+        """Recompute the sales rollup tables from order history."""
+        days = rebuild_rollups()
+        print(f"Rebuilt sales rollups for {days} day(s)")
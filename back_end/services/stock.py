@@ -0,0 +1,87 @@
+from collections import defaultdict
+
+# Remarks written to inventory_log for stock taken by an order
+CHECKOUT_REMARK = "Order checkout"
+
+RESERVE_STOCK = """
+    UPDATE products
+    SET Stock_Quantity = Stock_Quantity - %s
+    WHERE Product_ID = %s AND Stock_Quantity >= %s
+"""
+
+INSERT_LOG = """
+    INSERT INTO inventory_log (Product_ID, Log_Date, Quantity_Changed, Remarks)
+    VALUES (%s, NOW(), %s, %s)
+"""
+
+
+# Callbacks run after a transaction that changed stock has committed.
+# Each receives {Product_ID: delta}; see add_stock_listener().
+_stock_listeners = []
+
+
+def add_stock_listener(callback):
+    """
+    Register callback(changes) to be told about committed stock changes,
+    e.g. to refresh in-process caches.
+    """
+    _stock_listeners.append(callback)
+
+
+def notify_stock_changed(changes):
+    """
+    Call after COMMIT with {Product_ID: delta} for every product whose
+    Stock_Quantity changed.
+    """
+    if changes:
+        for callback in _stock_listeners:
+            callback(changes)
+
+
+class InsufficientStock(Exception):
+    """
+    Raised when a product cannot cover the requested quantity.
+    The caller must roll back the surrounding transaction.
+    """
+
+    def __init__(self, product_id, requested):
+        super().__init__(f"Insufficient stock for product {product_id} (requested {requested})")
+        self.product_id = product_id
+        self.requested = requested
+
+
+def reserve_stock(cursor, lines, remarks=CHECKOUT_REMARK):
+    """
+    Atomically take stock for every (product_id, quantity) in `lines`.
+
+    - Quantities for the same product are summed first.
+    - Each product is decremented with a conditional UPDATE
+      (... WHERE Stock_Quantity >= qty), so two concurrent checkouts can
+      never both take the last copy: the row lock serialises them and the
+      loser sees 0 affected rows.
+    - Products are locked in ascending Product_ID order, so two carts that
+      share products always lock them in the same order and cannot deadlock.
+    - Matching inventory_log rows (negative Quantity_Changed) are written in
+      one batched INSERT.
+
+    Runs inside the caller's transaction and does not commit. Raises
+    InsufficientStock on the first product that cannot be covered.
+    Returns {product_id: quantity taken}.
+    """
+    totals = defaultdict(int)
+    for product_id, quantity in lines:
+        if int(quantity) > 0:
+            totals[int(product_id)] += int(quantity)
+
+    for product_id in sorted(totals):
+        quantity = totals[product_id]
+        cursor.execute(RESERVE_STOCK, (quantity, product_id, quantity))
+        if cursor.rowcount != 1:
+            raise InsufficientStock(product_id, quantity)
+
+    if totals:
+        cursor.executemany(INSERT_LOG, [
+            (product_id, -quantity, remarks) for product_id, quantity in sorted(totals.items())
+        ])
+
+    return dict(totals)
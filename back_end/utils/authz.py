@@ -0,0 +1,130 @@
+from functools import wraps
+
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+
+# ================= ROLE-BASED AUTHORIZATION =================
+# Declarative access rules checked against the `role` claim that login
+# already puts in the access token, so no request touches Users for it.
+#
+#   protect_blueprint(bp, "Admin")   every endpoint of `bp` needs one of
+#                                    the roles (blueprint before_request)
+#   @roles_required("Admin", ...)    per-view rule; overrides the
+#                                    blueprint default, or guards a view on
+#                                    an unprotected blueprint
+#   @roles_required()                any signed-in user
+#   @public                          no token needed
+#
+# init_app() compiles every rule into one {(endpoint, method): roles}
+# table after the blueprints are registered; the hot path is a dict lookup,
+# a JWT signature check and a set membership test. No JWT callback reads
+# the database: access tokens are trusted from their claims for their
+# short lifetime (see services/auth.py).
+
+ADMIN_ROLE = "Admin"
+
+ANY_ROLE = frozenset()  # roles value meaning "any valid token"
+
+_protected = {}  # blueprint name -> default roles
+_policy = None   # (endpoint, method) -> roles, or None for public
+
+
+def roles_required(*roles):
+    """
+    Restrict a view to tokens whose role is one of `roles` (any signed-in
+    user when called without roles).
+    """
+    allowed = frozenset(roles)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Already enforced by a protected blueprint's before_request
+            if not g.get("authz_checked"):
+                denied = check_roles(allowed)
+                if denied is not None:
+                    return denied
+            return view(*args, **kwargs)
+
+        wrapper.authz_roles = allowed
+        return wrapper
+
+    return decorator
+
+
+def public(view):
+    """
+    Exempt a view of a protected blueprint (e.g. storefront reads).
+    """
+    view.authz_roles = None
+    return view
+
+
+def check_roles(roles):
+    """
+    Enforce one compiled rule for the current request. Returns a 403
+    response, or None when allowed. A missing / invalid token raises the
+    flask_jwt_extended error, which the JWTManager turns into a 401.
+    """
+    if roles is None:
+        return None
+    verify_jwt_in_request()
+    g.authz_checked = True
+    if roles and get_jwt().get("role") not in roles:
+        return jsonify({"error": "Forbidden: insufficient role"}), 403
+    return None
+
+
+def is_admin():
+    """
+    True if the current (verified) token has the Admin role.
+    """
+    return get_jwt().get("role") == ADMIN_ROLE
+
+
+def is_self_or_admin(user_id):
+    """
+    True if the current token belongs to `user_id` or to an admin.
+    """
+    return is_admin() or get_jwt_identity() == str(user_id)
+
+
+def protect_blueprint(blueprint, *roles):
+    """
+    Require one of `roles` on every endpoint of `blueprint` unless the view
+    carries its own @roles_required / @public rule.
+    """
+    default = _protected[blueprint.name] = frozenset(roles)
+
+    @blueprint.before_request
+    def enforce_policy():
+        if request.method == "OPTIONS":  # CORS preflight carries no token
+            return None
+        policy = _policy if _policy is not None else compile_policy(current_app)
+        roles = policy.get((request.endpoint, request.method), default)
+        return check_roles(roles)
+
+
+def compile_policy(app):
+    """
+    Build the (endpoint, method) -> roles table from the app's URL map.
+    """
+    global _policy
+    policy = {}
+    for rule in app.url_map.iter_rules():
+        blueprint = rule.endpoint.rpartition(".")[0]
+        view = app.view_functions[rule.endpoint]
+        if blueprint not in _protected and not hasattr(view, "authz_roles"):
+            continue
+        roles = getattr(view, "authz_roles", _protected.get(blueprint))
+        for method in rule.methods - {"OPTIONS"}:
+            policy[(rule.endpoint, method)] = roles
+    _policy = policy
+    return policy
+
+
+def init_app(app):
+    """
+    Compile the policy table; call after every blueprint is registered.
+    """
+    compile_policy(app)
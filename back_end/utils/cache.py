@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with per-entry TTL and LRU eviction.
+
+    - Entries expire `ttl` seconds after they were stored.
+    - When more than `maxsize` entries are held, the least recently used is evicted.
+    - hits / misses / evictions are counted so callers can expose them as metrics.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self._stats["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value for `key`, calling loader() and caching its
+        result on a miss.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._stats["invalidations"] += 1
+
+    def invalidate_where(self, predicate):
+        """
+        Drop every entry for which predicate(key, value) is true.
+        """
+        with self._lock:
+            stale = [k for k, (_, v) in self._entries.items() if predicate(k, v)]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidations"] += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._stats["invalidations"] += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+            stats["maxsize"] = self.maxsize
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
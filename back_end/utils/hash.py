@@ -1,9 +1,171 @@
-from flask_bcrypt import Bcrypt
+import atexit
+import multiprocessing
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
 
-bcrypt = Bcrypt()
+import bcrypt as bcrypt_lib
 
-def hash_password(password):
-    return bcrypt.generate_password_hash(password).decode("utf-8")
+from config import Config
+from utils import metrics
+
+# ================= PASSWORD HASHING POOL =================
+# bcrypt is deliberately slow (~100-300 ms of CPU per call) and holds the
+# GIL while it runs, so hashing on the request thread stalls every other
+# request on the worker. Hashes and checks run in a small process pool
+# instead:
+#
+#   - BCRYPT_WORKERS processes (0 = hash inline, e.g. for tests)
+#   - at most BCRYPT_MAX_PENDING calls queued or running; beyond that
+#     HasherSaturated is raised so routes can answer 429 instead of piling
+#     up requests behind the pool. A slot is held until the worker is done,
+#     even when the caller gave up after BCRYPT_TIMEOUT (also a 429)
+#   - workers are started with forkserver / spawn, never fork: forking a
+#     threaded Flask worker would copy its locks and open MySQL sockets
+#   - the cost factor is BCRYPT_LOG_ROUNDS; needs_rehash() tells login when
+#     a stored hash was made with a different cost
+
+# bcrypt only looks at the first 72 bytes of a password (newer releases
+# raise instead of truncating, so truncate here to keep old hashes valid)
+MAX_PASSWORD_BYTES = 72
+
+_COST_RE = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+class HasherSaturated(Exception):
+    """
+    Raised when BCRYPT_MAX_PENDING hash / check calls are already in flight
+    or a call did not finish within BCRYPT_TIMEOUT.
+    """
+
+
+def _encode_password(password):
+    return password.encode("utf-8")[:MAX_PASSWORD_BYTES]
+
+
+# Run in the worker processes (module-level so they can be pickled)
+def _hash_worker(password, rounds):
+    return bcrypt_lib.hashpw(password, bcrypt_lib.gensalt(rounds)).decode("utf-8")
+
+
+def _check_worker(hashed, password):
+    try:
+        return bcrypt_lib.checkpw(password, hashed)
+    except ValueError:  # malformed stored hash
+        return False
+
+
+def _worker_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hash / check calls in a process pool with bounded
+    concurrency, and counts them for GET /metrics.
+    """
+
+    def __init__(self, workers, max_pending, timeout, rounds):
+        self.workers = workers
+        self.timeout = timeout
+        self.rounds = rounds
+        self.max_pending = max_pending
+
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {"hashes": 0, "checks": 0, "rejected": 0, "timeouts": 0, "total_ms": 0.0}
+
+    def hash(self, password):
+        return self._run("hashes", _hash_worker, _encode_password(password), self.rounds)
+
+    def check(self, hashed, password):
+        if not hashed or password is None:
+            return False
+        return self._run("checks", _check_worker, hashed.encode("utf-8"), _encode_password(password))
+
+    def needs_rehash(self, hashed):
+        """
+        True if `hashed` was made with a cost other than BCRYPT_LOG_ROUNDS.
+        """
+        match = _COST_RE.match(hashed or "")
+        return match is not None and int(match.group(1)) != self.rounds
+
+    def try_reserve(self):
+        """
+        Non-blocking check for spare capacity (used for optional work such
+        as rehash-on-login, which is skipped rather than rejected).
+        """
+        with self._lock:
+            return self._in_flight < self.max_pending
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = self._in_flight
+        calls = stats["hashes"] + stats["checks"]
+        stats["avg_ms"] = round(stats.pop("total_ms") / calls, 3) if calls else 0.0
+        stats.update({"workers": self.workers, "max_pending": self.max_pending, "rounds": self.rounds})
+        return stats
+
+    # ----------------- internal helpers -----------------
+    def _run(self, kind, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise HasherSaturated("Password hashing is saturated, retry shortly")
+
+        started = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+
+        def finished(_future=None):
+            # Runs when the work is really done, not when the caller stops waiting
+            with self._lock:
+                self._in_flight -= 1
+                self._stats[kind] += 1
+                self._stats["total_ms"] += (time.perf_counter() - started) * 1000
+            self._slots.release()
+
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                finished()
+
+        try:
+            future = self._pool().submit(fn, *args)
+        except Exception:
+            finished()
+            raise
+        future.add_done_callback(finished)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise HasherSaturated("Password hashing timed out, retry shortly")
+
+    def _pool(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=_worker_context()
+                    )
+                    atexit.register(self._executor.shutdown, wait=False, cancel_futures=True)
+        return self._executor
+
+
+hasher = PasswordHasher(
+    workers=Config.BCRYPT_WORKERS,
+    max_pending=Config.BCRYPT_MAX_PENDING,
+    timeout=Config.BCRYPT_TIMEOUT,
+    rounds=Config.BCRYPT_LOG_ROUNDS,
+)
+metrics.register("password_hasher", hasher.stats)
 
-def check_password(hashed, plain):
-    return bcrypt.check_password_hash(hashed, plain)
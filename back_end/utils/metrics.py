@@ -0,0 +1,20 @@
+# ================= RUNTIME METRICS REGISTRY =================
+# Subsystems (connection pool, caches, worker pools, ...) register a
+# zero-argument function returning a dict of counters. GET /metrics
+# collects a snapshot of all of them.
+
+_providers = {}
+
+
+def register(name, provider):
+    """
+    Register a stats provider under `name`. Re-registering replaces it.
+    """
+    _providers[name] = provider
+
+
+def snapshot():
+    """
+    Return {name: provider()} for every registered provider.
+    """
+    return {name: provider() for name, provider in _providers.items()}
@@ -0,0 +1,35 @@
+import base64
+import json
+
+
+# ================= OPAQUE KEYSET CURSORS =================
+# A cursor records the sort it was issued for and the sort key of the last
+# row on the page. Clients pass it back unchanged (?cursor=...), so the
+# key columns can change without breaking the API.
+
+
+def encode_cursor(sort, key):
+    """
+    Encode the last row's sort key (a list of JSON-serializable values)
+    as a URL-safe token.
+    """
+    payload = json.dumps({"s": sort, "k": key}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, sort):
+    """
+    Return the key stored in `token`. Raises ValueError for malformed
+    tokens or tokens issued for a different sort order.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key = payload["k"]
+        issued_for = payload["s"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Malformed cursor")
+
+    if issued_for != sort or not isinstance(key, list):
+        raise ValueError("Cursor does not match the requested sort")
+    return key
@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """
+    Thread-safe in-memory token buckets, one per key (e.g. an email or IP).
+
+    - Each bucket holds up to `capacity` tokens and regains one token every
+      `refill_seconds`.
+    - allow(key) checks for a token without spending it; consume(key)
+      spends one. Callers typically check before doing expensive work and
+      only consume on failure, so legitimate users are never slowed down.
+    - At most `max_keys` buckets are kept (least recently used evicted);
+      an evicted bucket simply starts full again.
+    """
+
+    def __init__(self, capacity, refill_seconds, max_keys=100000):
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> (tokens, last refill timestamp)
+        self._stats = {"allowed": 0, "limited": 0}
+
+    def _tokens(self, key, now):
+        tokens, updated = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated) / self.refill_seconds)
+
+    def allow(self, key):
+        now = time.monotonic()
+        with self._lock:
+            allowed = self._tokens(key, now) >= 1
+            self._stats["allowed" if allowed else "limited"] += 1
+            return allowed
+
+    def consume(self, key):
+        now = time.monotonic()
+        with self._lock:
+            tokens = max(0.0, self._tokens(key, now) - 1)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+    def retry_after(self, key):
+        """
+        Seconds until `key` has a token again (0 if it has one now).
+        """
+        now = time.monotonic()
+        with self._lock:
+            missing = 1 - self._tokens(key, now)
+        return max(0, int(missing * self.refill_seconds + 0.999))
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["tracked_keys"] = len(self._buckets)
+        return stats
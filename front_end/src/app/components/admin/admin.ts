@@ -56,7 +56,9 @@ export class AdminPage implements OnInit {
   // Data Arrays
   products: Product[] = [];
   orders: Order[] = [];
+  ordersCursor: string | null = null;  // X-Next-Cursor of the last loaded page
   inventoryLogs: InventoryLog[] = [];
+  inventoryLogsCursor: string | null = null;  // X-Next-Cursor of the last loaded page
   users: Users[] = [];
 
   // UI Control
@@ -127,18 +129,32 @@ export class AdminPage implements OnInit {
   }
 
   // ===================== ORDERS =====================
+  // Loads the first page; loadMoreOrders() appends the following ones
   loadOrders(): Promise<void> {
+    this.orders = [];
+    this.ordersCursor = null;
+    return this.fetchOrders();
+  }
+
+  loadMoreOrders(): Promise<void> {
+    return this.ordersCursor ? this.fetchOrders(this.ordersCursor) : Promise.resolve();
+  }
+
+  private fetchOrders(cursor?: string): Promise<void> {
     return new Promise(resolve => {
-      this.adminService.getOrders().subscribe({
-        next: (res: any[]) => {
-          this.orders = res.map(o => ({
+      this.adminService.getOrders(cursor ? { cursor } : {}).subscribe({
+        next: (res: any) => {
+          const page = (res.body || []).map((o: any) => ({
             Order_ID: o.Order_ID ?? o.order_id,
             User_ID: o.User_ID ?? o.user_id,
             Total_Amount: Number(o.Total_Amount ?? o.total_amount),
             Order_Date: o.Order_Date ?? o.order_date,
             Order_Status: o.Order_Status ?? o.order_status
           }));
-          this.totalOrders = this.orders.length;
+          this.orders = [...this.orders, ...page];
+          this.ordersCursor = res.headers.get('X-Next-Cursor');
+          const total = res.headers.get('X-Total-Count');
+          if (total !== null) this.totalOrders = Number(total);
           resolve();
         },
         error: (err) => { console.error('Failed to load orders:', err); resolve(); }
@@ -165,14 +181,27 @@ export class AdminPage implements OnInit {
   }
 
   // ===================== INVENTORY LOGS =====================
+  // Loads the newest page; loadMoreInventoryLogs() appends older ones
   loadInventoryLogs(): Promise<void> {
+    this.inventoryLogs = [];
+    this.inventoryLogsCursor = null;
+    return this.fetchInventoryLogs();
+  }
+
+  loadMoreInventoryLogs(): Promise<void> {
+    return this.inventoryLogsCursor ? this.fetchInventoryLogs(this.inventoryLogsCursor) : Promise.resolve();
+  }
+
+  private fetchInventoryLogs(cursor?: string): Promise<void> {
     return new Promise(resolve => {
-      this.adminService.getInventoryLogs().subscribe({
-        next: (res: InventoryLog[]) => {
-          this.inventoryLogs = res.map(log => ({
+      this.adminService.getInventoryLogs(cursor ? { cursor } : {}).subscribe({
+        next: (res: any) => {
+          const page: InventoryLog[] = (res.body || []).map((log: InventoryLog) => ({
             ...log,
             Log_Date: log.Log_Date
           }));
+          this.inventoryLogs = [...this.inventoryLogs, ...page];
+          this.inventoryLogsCursor = res.headers.get('X-Next-Cursor');
           resolve();
         },
         error: (err) => { console.error('Failed to load inventory logs:', err); resolve(); }
@@ -207,15 +236,16 @@ export class AdminPage implements OnInit {
     this.adminService.getUsers().subscribe({
       next: (res: any) => {
         if (res.status === 'success' && Array.isArray(res.users)) {
-          this.users = res.users.map((u: any[]) => ({
-            User_ID: u[0],
-            Full_Name: u[1],
-            Email: u[2],
-            Username: u[3],
-            Role: u[4],
-            Contact_Number: u[5],
-            Address: u[6],
-            Image: u[7]
+          // Rows come back as objects keyed by column name
+          this.users = res.users.map((u: any) => ({
+            User_ID: u.User_ID,
+            Full_Name: u.Full_Name,
+            Email: u.Email,
+            Username: u.Username,
+            Role: u.Role,
+            Contact_Number: u.Contact_Number,
+            Address: u.Address,
+            Image: u.image_url
           }));
         } else {
           this.users = [];
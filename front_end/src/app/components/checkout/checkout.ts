@@ -19,6 +19,11 @@ export class CheckoutComponent {
   paymentData = { method: 'COD' };
   reviewData: any = null;
   orderSummary: any = null;
+  // Full review fetched when the wizard opens; reused by the review step
+  private wizardState: any = null;
+  // Idempotency key of the order being placed; kept across retries until
+  // one succeeds, so a retried request cannot place a second order
+  private orderKey: string | null = null;
 
   constructor(private checkoutService: CheckoutService) {}
 
@@ -35,8 +40,10 @@ export class CheckoutComponent {
 
   // Load shipping info from backend
   loadShipping() {
+    this.wizardState = null;
     this.checkoutService.reviewOrder().subscribe({
       next: (res: any) => {
+        this.wizardState = res;
         if (res && res.user_info) {
           this.shippingData = {
             full_name: res.user_info.full_name || '',
@@ -71,20 +78,18 @@ export class CheckoutComponent {
     this.step = 3;     // Move to review step
   }
 
-  // Load review/order items from backend
+  // Load review/order items (reuses the state loaded when the wizard opened)
   loadReview() {
+    if (this.wizardState) {
+      this.showReview({
+        ...this.wizardState,
+        user_info: { ...this.wizardState.user_info, ...this.shippingData }
+      });
+      return;
+    }
+
     this.checkoutService.reviewOrder().subscribe({
-      next: (res: any) => {
-        if (res && res.items) {
-          // map backend keys to nicer camelCase
-          res.items = res.items.map((i: any) => ({
-            name: i.Product_Name,
-            price: i.Price,
-            quantity: i.quantity
-          }));
-        }
-        this.reviewData = res;
-      },
+      next: (res: any) => this.showReview(res),
       error: () => Swal.fire({
         title: 'Error!',
         text: 'Failed to load order review.',
@@ -94,11 +99,28 @@ export class CheckoutComponent {
   }
 
 
+  private showReview(res: any) {
+    if (res && res.items) {
+      // map backend keys to nicer camelCase
+      res = {
+        ...res,
+        items: res.items.map((i: any) => ({
+          name: i.Product_Name,
+          price: i.Price,
+          quantity: i.quantity
+        }))
+      };
+    }
+    this.reviewData = res;
+  }
+
   // Place order and display order summary
   confirmOrder() {
-    this.checkoutService.placeOrder().subscribe({
+    this.orderKey ??= crypto.randomUUID();
+    this.checkoutService.placeOrder(this.orderKey).subscribe({
       next: (res) => {
         console.log(res);  // Debug backend response
+        this.orderKey = null;
         this.orderSummary = res;
         this.step = 4;
       },
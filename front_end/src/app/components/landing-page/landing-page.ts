@@ -232,7 +232,7 @@ export class LandingPage implements OnInit, AfterViewInit {
       next: (res: any) => {
         const orders = res?.orders || []; // <-- always use res.orders
         console.log("ORDERS:", orders);
-        this.orderModal?.openModal(orders); // pass orders to modal
+        this.orderModal?.openModal(orders, res?.next_cursor || null); // pass first page + cursor to modal
       },
       error: (err) => {
         console.error("Error loading orders:", err);
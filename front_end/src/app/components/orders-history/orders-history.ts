@@ -12,6 +12,7 @@ interface Order {
   Order_Status: string;
   Total_Amount: string | number;
   User_ID: number;
+  items?: { Product_ID: number; Product_Name: string | null; Quantity: number; Subtotal: string | number }[];
 }
 
 @Component({
@@ -24,19 +25,18 @@ interface Order {
 export class OrdersModalComponent implements OnInit {
   selectedOrder: any[] = [];
   isOpen = false;
+  nextCursor: string | null = null;  // set while older orders remain
+  loadingMore = false;
 
   constructor(private auth: AuthService, private orderService: OrderHistoryService) {}
 
   ngOnInit(): void {}
 
 
-  openModal(ordersData?: Order[]) {
+  openModal(ordersData?: Order[], nextCursor: string | null = null) {
     if (ordersData) {
-      this.selectedOrder = ordersData.map((order: Order) => ({
-        ...order,
-        Order_Date: this.convertToPHTime(order.Order_Date),
-        Total_Amount: parseFloat(order.Total_Amount as string || '0')
-      }));
+      this.selectedOrder = ordersData.map((order: Order) => this.toView(order));
+      this.nextCursor = nextCursor;
       this.isOpen = true;
     } else {
       const token = this.auth.getToken();
@@ -46,21 +46,46 @@ export class OrdersModalComponent implements OnInit {
       this.orderService.getUserOrders(userId).subscribe({
         next: (res: any) => {
           const orders: Order[] = res?.orders || [];
-          this.selectedOrder = orders.map((order: Order) => ({
-            ...order,
-            Order_Date: this.convertToPHTime(order.Order_Date),
-            Total_Amount: parseFloat(order.Total_Amount as string || '0')
-          }));
+          this.selectedOrder = orders.map((order: Order) => this.toView(order));
+          this.nextCursor = res?.next_cursor || null;
           this.isOpen = true;
         },
         error: () => {
           this.selectedOrder = [];
+          this.nextCursor = null;
           this.isOpen = true;
         }
       });
     }
   }
 
+  // Append the next (older) page of orders
+  loadMore() {
+    const userId = this.auth.getUserId();
+    if (!userId || !this.nextCursor || this.loadingMore) return;
+
+    this.loadingMore = true;
+    this.orderService.getUserOrders(userId, this.nextCursor).subscribe({
+      next: (res: any) => {
+        const orders: Order[] = res?.orders || [];
+        this.selectedOrder = [...this.selectedOrder, ...orders.map((order: Order) => this.toView(order))];
+        this.nextCursor = res?.next_cursor || null;
+        this.loadingMore = false;
+      },
+      error: () => {
+        this.loadingMore = false;
+      }
+    });
+  }
+
+  private toView(order: Order) {
+    return {
+      ...order,
+      Order_Date: order.Order_Date ? this.convertToPHTime(order.Order_Date) : '—',
+      Total_Amount: parseFloat(order.Total_Amount as string || '0')
+    };
+  }
+
 
 
   closeModal() {
@@ -0,0 +1,40 @@
+import { HttpClient, HttpErrorResponse, HttpHandlerFn, HttpInterceptorFn, HttpRequest } from '@angular/common/http';
+import { inject } from '@angular/core';
+import { catchError, switchMap, throwError } from 'rxjs';
+
+const REFRESH_URL = 'http://127.0.0.1:5000/auth/refresh';
+
+// Access tokens expire after a few minutes. When an authenticated request
+// comes back 401, trade the stored refresh token for a new access token
+// once and replay the request with it.
+export const authRefreshInterceptor: HttpInterceptorFn = (req: HttpRequest<unknown>, next: HttpHandlerFn) => {
+  const http = inject(HttpClient);
+
+  return next(req).pipe(
+    catchError((err: HttpErrorResponse) => {
+      const refreshToken = localStorage.getItem('refresh_token');
+      const canRefresh = err.status === 401
+        && !!refreshToken
+        && req.headers.has('Authorization')
+        && !req.url.endsWith('/auth/refresh');
+      if (!canRefresh) {
+        return throwError(() => err);
+      }
+
+      return http.post<any>(REFRESH_URL, {}, {
+        headers: { Authorization: `Bearer ${refreshToken}` }
+      }).pipe(
+        switchMap((res) => {
+          localStorage.setItem('access_token', res.token);
+          return next(req.clone({ setHeaders: { Authorization: `Bearer ${res.token}` } }));
+        }),
+        catchError(() => {
+          // Refresh token expired or retired by a profile edit
+          localStorage.removeItem('access_token');
+          localStorage.removeItem('refresh_token');
+          return throwError(() => err);
+        })
+      );
+    })
+  );
+};
@@ -1,5 +1,5 @@
 import { Injectable } from '@angular/core';
-import { HttpClient } from '@angular/common/http';
+import { HttpClient, HttpHeaders, HttpParams } from '@angular/common/http';
 import { Observable } from 'rxjs';
 
 @Injectable({
@@ -10,67 +10,93 @@ export class AdminService {
 
   constructor(private http: HttpClient) {}
 
+  // Admin endpoints check the role claim in the JWT
+  private authHeaders(): HttpHeaders {
+    const token = localStorage.getItem('access_token');
+    return new HttpHeaders({ Authorization: `Bearer ${token}` });
+  }
+
   // ================= PRODUCTS =================
   getProducts(): Observable<any> {
-    return this.http.get(`${this.baseURL}/products/`);
+    return this.http.get(`${this.baseURL}/products/?all=true`, { headers: this.authHeaders() });
   }
 
   getProduct(id: number): Observable<any> {
-    return this.http.get(`${this.baseURL}/products/${id}`);
+    return this.http.get(`${this.baseURL}/products/${id}`, { headers: this.authHeaders() });
   }
 
   addProduct(product: any): Observable<any> {
-    return this.http.post(`${this.baseURL}/products/`, product);
+    return this.http.post(`${this.baseURL}/products/`, product, { headers: this.authHeaders() });
   }
 
   updateProduct(id: number, product: any): Observable<any> {
-    return this.http.put(`${this.baseURL}/products/${id}`, product);
+    return this.http.put(`${this.baseURL}/products/${id}`, product, { headers: this.authHeaders() });
   }
 
   deleteProduct(id: number): Observable<any> {
-    return this.http.delete(`${this.baseURL}/products/${id}`);
+    return this.http.delete(`${this.baseURL}/products/${id}`, { headers: this.authHeaders() });
   }
 
   // ================= ORDERS =================
-  getOrders(): Observable<any> {
-    return this.http.get(`${this.baseURL}/orders/`);
+  // One page of orders; X-Total-Count / X-Next-Cursor are read from the headers.
+  // filters: status, user_id, date_from, date_to, sort, limit, cursor
+  getOrders(filters: { [key: string]: string | number } = {}): Observable<any> {
+    let params = new HttpParams();
+    for (const [key, value] of Object.entries(filters)) {
+      if (value !== null && value !== undefined && value !== '') {
+        params = params.set(key, String(value));
+      }
+    }
+    return this.http.get<any[]>(`${this.baseURL}/orders/`, { headers: this.authHeaders(), params, observe: 'response' });
   }
 
   updateOrderStatus(orderId: number, status: string): Observable<any> {
-    return this.http.put(`${this.baseURL}/orders/${orderId}`, { Order_Status: status });
+    return this.http.put(`${this.baseURL}/orders/${orderId}`, { Order_Status: status }, { headers: this.authHeaders() });
   }
 
   // ================= INVENTORY LOGS =================
-  getInventoryLogs(): Observable<any> {
-    return this.http.get(`${this.baseURL}/inventory_log`);
+  // One page of logs (newest first); the next page's cursor is in X-Next-Cursor.
+  // filters: product_id, date_from, date_to, limit, cursor
+  getInventoryLogs(filters: { [key: string]: string | number } = {}): Observable<any> {
+    let params = new HttpParams();
+    for (const [key, value] of Object.entries(filters)) {
+      if (value !== null && value !== undefined && value !== '') {
+        params = params.set(key, String(value));
+      }
+    }
+    return this.http.get<any[]>(`${this.baseURL}/inventory_log/`, { headers: this.authHeaders(), params, observe: 'response' });
+  }
+
+  getInventoryLogSummary(filters: { [key: string]: string | number } = {}): Observable<any> {
+    return this.http.get(`${this.baseURL}/inventory_log/summary`, { headers: this.authHeaders(), params: filters });
   }
 
   getInventoryLog(id: number): Observable<any> {
-    return this.http.get(`${this.baseURL}/inventory_log/${id}`);
+    return this.http.get(`${this.baseURL}/inventory_log/${id}`, { headers: this.authHeaders() });
   }
 
   createInventoryLog(log: any): Observable<any> {
-    return this.http.post(`${this.baseURL}/inventory_log/`, log);
+    return this.http.post(`${this.baseURL}/inventory_log/`, log, { headers: this.authHeaders() });
   }
 
   updateInventoryLog(id: number, log: any): Observable<any> {
-    return this.http.put(`${this.baseURL}/inventory_log/${id}`, log);
+    return this.http.put(`${this.baseURL}/inventory_log/${id}`, log, { headers: this.authHeaders() });
   }
 
   deleteInventoryLog(id: number): Observable<any> {
-    return this.http.delete(`${this.baseURL}/inventory_log/${id}`);
+    return this.http.delete(`${this.baseURL}/inventory_log/${id}`, { headers: this.authHeaders() });
   }
 
   // ================= USERS =================
   getUsers(): Observable<any> {
-    return this.http.get(`${this.baseURL}/users`);
+    return this.http.get(`${this.baseURL}/users`, { headers: this.authHeaders() });
   }
 
   getUser(id: number): Observable<any> {
-    return this.http.get(`${this.baseURL}/users/${id}`);
+    return this.http.get(`${this.baseURL}/users/${id}`, { headers: this.authHeaders() });
   }
 
   deleteUser(id: number): Observable<any> {
-    return this.http.delete(`${this.baseURL}/users/${id}`);
+    return this.http.delete(`${this.baseURL}/users/${id}`, { headers: this.authHeaders() });
   }
 }
@@ -40,8 +40,16 @@ export class AuthService {
 
   }
 
+  // Access tokens are short-lived; the refresh token gets a new one
+  saveRefreshToken(token?: string) {
+    if (token) {
+      localStorage.setItem('refresh_token', token);
+    }
+  }
+
   logout(): void {
     localStorage.removeItem('access_token');
+    localStorage.removeItem('refresh_token');
     localStorage.removeItem('image');
     this.loggedIn.next(false);
     this.setUserImage('assets/profile.jpg'); // reset image
@@ -61,8 +69,9 @@ export class AuthService {
     return this.http.post(`${this.apiUrl}/auth/login`, credentials, { headers }).pipe(
       tap((res: any) => {
         if (res.token) {
-          // Save JWT token
+          // Save JWT token (+ refresh token)
           this.saveToken(res.token);
+          this.saveRefreshToken(res.refresh_token);
 
           // Save role
           if (res.role) {
@@ -104,6 +113,12 @@ export class AuthService {
       headers: { Authorization: `Bearer ${token}` }
     }).pipe(
       tap((res: any) => {
+        // The edit invalidates the old token (it carries the old profile)
+        if (res.token) {
+          this.saveToken(res.token);
+          this.saveRefreshToken(res.refresh_token);
+        }
+
         const image = res.user?.image || 'assets/profile.jpg';
         this.setUserImage(image);
       })
@@ -35,6 +35,11 @@ export class CartService {
     );
   }
 
+  // ADD many items at once (e.g. a whole wishlist) in one request
+  addManyToCart(items: { product_id: number; quantity: number }[]): Observable<any> {
+    return this.http.post(`${this.apiUrl}/add_many`, { items }, this.authHeaders());
+  }
+
 
   // REMOVE from cart
   removeCartItem(itemId: number): Observable<any> {
@@ -49,9 +54,12 @@ export class CartService {
       this.authHeaders()
     );
   }
-  // CHECKOUT cart
-  checkoutCart(): Observable<any> {
-    return this.http.post(`${this.apiUrl}/checkout`, {}, this.authHeaders());
+  // CHECKOUT cart (the caller keeps one idempotency key per checkout attempt
+  // and sends it again unchanged on every retry of that attempt)
+  checkoutCart(idempotencyKey: string): Observable<any> {
+    const options = this.authHeaders();
+    options.headers = options.headers.set('Idempotency-Key', idempotencyKey);
+    return this.http.post(`${this.apiUrl}/checkout`, {}, options);
   }
 }
 
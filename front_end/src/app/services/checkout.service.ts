@@ -1,5 +1,6 @@
 import { Injectable } from '@angular/core';
 import { HttpClient, HttpHeaders } from '@angular/common/http';
+import { tap } from 'rxjs';
 
 @Injectable({
   providedIn: 'root'
@@ -22,16 +23,31 @@ export class CheckoutService {
 }
 
 
+  // Saving shipping invalidates the old token; keep the fresh one it returns
   saveShipping(data: any) {
-    return this.http.post(`${this.api}/shipping`, data, this.authHeaders());
+    return this.http.post(`${this.api}/shipping`, data, this.authHeaders()).pipe(
+      tap((res: any) => {
+        if (res.token) {
+          localStorage.setItem('access_token', res.token);
+        }
+        if (res.refresh_token) {
+          localStorage.setItem('refresh_token', res.refresh_token);
+        }
+      })
+    );
   }
 
 
+  // Full mode: cart lines, totals, shipping info and stock flags in one call
   reviewOrder() {
-    return this.http.get(`${this.api}/review`, this.authHeaders());
+    return this.http.get(`${this.api}/review?mode=full`, this.authHeaders());
   }
 
-  placeOrder() {
-    return this.http.post(`${this.api}/place_order`, {}, this.authHeaders());
+  // The caller owns the idempotency key: one per checkout attempt, sent
+  // again unchanged on every retry of that attempt
+  placeOrder(idempotencyKey: string) {
+    const options = this.authHeaders();
+    options.headers = options.headers.set('Idempotency-Key', idempotencyKey);
+    return this.http.post(`${this.api}/place_order`, {}, options);
   }
 }
@@ -13,11 +13,14 @@ export class ProductService {
   constructor(private http: HttpClient) {}
 
   getProducts(): Observable<any[]> {
-    return this.http.get<any[]>(this.apiUrl);
+    return this.http.get<any[]>(`${this.apiUrl}/?all=true`);
   }
   deleteProduct(id: number): Observable<void> { //admin only
 
-    return this.http.delete<void>(`${this.apiUrl}/products/${id}`);
+    const token = localStorage.getItem('access_token');
+    return this.http.delete<void>(`${this.apiUrl}/products/${id}`, {
+      headers: { Authorization: `Bearer ${token}` }
+    });
 
   }
   getFilters(): Observable<any> {
@@ -21,9 +21,12 @@ export class OrderHistoryService {
     };
   }
 
-  getUserOrders(userId: number): Observable<any> {
+  // One page of orders with their line items embedded; pass the previous
+  // response's next_cursor to get the following page
+  getUserOrders(userId: number, cursor?: string): Observable<any> {
+    const page = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
     return this.http.get(
-      `${this.apiUrl}/user/${userId}`,
+      `${this.apiUrl}/user/${userId}?include=lines${page}`,
       this.authHeaders()
     );
   }